@@ -0,0 +1,181 @@
+"""Cold-storage archive of closed years in attached SQLite files"""
+
+import logging
+import os
+import re
+import sqlite3
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+from urllib.parse import quote
+from sqlalchemy import Column, MetaData, Table
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.metrics import CACHE_REQUESTS
+from app.models.expense import Expense
+
+logger = logging.getLogger(__name__)
+
+# Archive file names: expenses_2023.db
+ARCHIVE_FILE_PATTERN = re.compile(r"^expenses_(\d{4})\.db$")
+
+# Most archive files a connection can attach (SQLite's default SQLITE_MAX_ATTACHED)
+MAX_ATTACHED_ARCHIVES = 10
+
+# Temporary view (per connection) over the hot table and every attached archive
+UNION_VIEW = "expenses_all"
+
+EXPENSE_COLUMNS = "id, date, month, category, amount, memo, created_at"
+
+# Directory listing cache: (directory, mtime_ns) -> years
+_years_cache: Tuple[Optional[Tuple[str, int]], List[int]] = (None, [])
+
+# Table object describing the union view, so the ORM can map Expense onto it
+_union_view_table = Table(
+    UNION_VIEW,
+    MetaData(),
+    *[
+        Column(column.name, column.type, primary_key=column.primary_key)
+        for column in Expense.__table__.columns
+    ]
+)
+
+
+def archive_path(year: int, archive_dir: Optional[str] = None) -> Path:
+    """
+    Get the archive file path for a year.
+
+    Args:
+        year: Archived year
+        archive_dir: Archive directory (default: settings.archive_dir)
+
+    Returns:
+        Path of the per-year SQLite file
+    """
+    return Path(archive_dir or settings.archive_dir) / f"expenses_{year}.db"
+
+
+def schema_name(year: int) -> str:
+    """Get the schema name under which a year's archive is attached"""
+    return f"archive_{year}"
+
+
+def archived_years(archive_dir: Optional[str] = None) -> List[int]:
+    """
+    List the years that have an archive file.
+    The directory listing is cached until the directory changes.
+
+    Args:
+        archive_dir: Archive directory (default: settings.archive_dir)
+
+    Returns:
+        Sorted list of archived years (empty if the directory does not exist)
+    """
+    global _years_cache
+    directory = archive_dir or settings.archive_dir
+    try:
+        key = (directory, os.stat(directory).st_mtime_ns)
+    except FileNotFoundError:
+        return []
+
+    if _years_cache[0] == key:
+        CACHE_REQUESTS.inc("archive_years", "hit")
+        return _years_cache[1]
+    CACHE_REQUESTS.inc("archive_years", "miss")
+
+    years = sorted(
+        int(match.group(1))
+        for match in (ARCHIVE_FILE_PATTERN.match(name) for name in os.listdir(directory))
+        if match
+    )
+    _years_cache = (key, years)
+    return years
+
+
+def same_expense_sql(archived: str, hot: str) -> str:
+    """
+    Get an SQL condition matching an archived row to an identical hot row.
+
+    Args:
+        archived: Table reference of the archived row (e.g. "cold.expenses")
+        hot: Table reference of the hot row (e.g. "main.expenses")
+
+    Returns:
+        Condition comparing the ID and every other column
+    """
+    columns = EXPENSE_COLUMNS.split(", ")
+    return f"{archived}.id = {hot}.id" + "".join(
+        f" AND {archived}.{column} IS {hot}.{column}" for column in columns[1:]
+    )
+
+
+def max_archived_id(archive_dir: Optional[str] = None) -> int:
+    """
+    Get the highest expense ID stored in any archive file.
+
+    Args:
+        archive_dir: Archive directory (default: settings.archive_dir)
+
+    Returns:
+        Highest archived ID (0 if nothing is archived)
+    """
+    highest = 0
+    for year in archived_years(archive_dir):
+        connection = sqlite3.connect(f"file:{quote(str(archive_path(year, archive_dir)))}?mode=ro", uri=True)
+        try:
+            highest = max(highest, connection.execute("SELECT COALESCE(MAX(id), 0) FROM expenses").fetchone()[0])
+        finally:
+            connection.close()
+    return highest
+
+
+def union_view_table() -> Table:
+    """Get the Table describing the per-connection union view"""
+    return _union_view_table
+
+
+def ensure_attached(db: Session, years: Iterable[int]) -> bool:
+    """
+    Attach archive files read-only to the session's connection on demand
+    and (re)create the temporary union view over hot and archived expenses.
+
+    Attachments live on the pooled DBAPI connection, so each connection pays
+    the ATTACH cost once per archive file.
+
+    Args:
+        db: Database session
+        years: Archived years that must be reachable through the view
+
+    Returns:
+        True if the union view covers every requested year on this connection
+    """
+    dbapi_connection = db.connection().connection.dbapi_connection
+    info = db.connection().connection.info
+    attached = info.setdefault("archive_years", set())
+
+    missing = [year for year in years if year not in attached]
+    if not missing:
+        return bool(attached)
+
+    if dbapi_connection.in_transaction:
+        # ATTACH is not allowed inside a transaction; serve hot data only
+        logger.warning(f"Cannot attach archives {missing} inside a transaction")
+        return False
+
+    if len(attached) + len(missing) > MAX_ATTACHED_ARCHIVES:
+        logger.error(
+            f"Cannot attach archives {missing}: at most {MAX_ATTACHED_ARCHIVES} archive files "
+            f"can be attached to a connection"
+        )
+        return False
+
+    for year in missing:
+        uri = f"file:{quote(str(archive_path(year)))}?mode=ro"
+        dbapi_connection.execute(f"ATTACH DATABASE ? AS {schema_name(year)}", (uri,))
+        attached.add(year)
+
+    selects = [f"SELECT {EXPENSE_COLUMNS} FROM main.expenses"]
+    selects += [f"SELECT {EXPENSE_COLUMNS} FROM {schema_name(year)}.expenses" for year in sorted(attached)]
+    dbapi_connection.execute(f"DROP VIEW IF EXISTS temp.{UNION_VIEW}")
+    dbapi_connection.execute(f"CREATE TEMP VIEW {UNION_VIEW} AS " + " UNION ALL ".join(selects))
+    return True
@@ -0,0 +1,176 @@
+"""Opt-in capture of live traffic to rotating JSONL files for later replay"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Never captured: credentials (admin API), diagnostics and the capture's own noise
+EXCLUDED_PREFIXES = ("/api/admin", "/debug", "/metrics", "/health", "/docs", "/openapi.json", "/redoc")
+
+# Request headers needed to replay a request faithfully
+REPLAYED_HEADERS = (b"content-type", b"idempotency-key")
+
+# Dedicated logger whose only handler is the rotating capture file
+_capture_log = logging.getLogger("app.capture.records")
+_capture_log.propagate = False
+_capture_log.setLevel(logging.INFO)
+_handler_lock = threading.Lock()
+
+# Records waiting for the writer thread, so file I/O never runs on the event loop
+# (bounded: records are dropped rather than piling up if the disk stalls)
+_records: "queue.Queue[str]" = queue.Queue(maxsize=10000)
+_writer: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+
+
+def _capture_logger() -> logging.Logger:
+    """Get the capture logger, (re)opening the file if settings.capture_path changed"""
+    path = os.path.abspath(settings.capture_path)
+    with _handler_lock:
+        handlers = _capture_log.handlers
+        if handlers and getattr(handlers[0], "baseFilename", None) == path:
+            return _capture_log
+        for handler in list(handlers):
+            _capture_log.removeHandler(handler)
+            handler.close()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handler = RotatingFileHandler(
+            path,
+            maxBytes=settings.capture_max_bytes,
+            backupCount=settings.capture_backups,
+            encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _capture_log.addHandler(handler)
+        logger.info(f"Capturing traffic to {path}")
+        return _capture_log
+
+
+def _write_records() -> None:
+    """Writer thread body: append queued records to the capture file"""
+    while True:
+        line = _records.get()
+        try:
+            _capture_logger().info(line)
+        except OSError as e:
+            logger.warning(f"Could not write capture record: {e}")
+        finally:
+            _records.task_done()
+
+
+def _enqueue(line: str) -> None:
+    """Hand a record to the writer thread, starting it on first use"""
+    global _writer
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_write_records, name="capture-writer", daemon=True)
+            _writer.start()
+    try:
+        _records.put_nowait(line)
+    except queue.Full:
+        logger.warning("Capture queue is full, dropping record")
+
+
+def close_capture() -> None:
+    """Write the queued records and close the capture file (it is reopened on the next captured request)"""
+    _records.join()
+    with _handler_lock:
+        for handler in list(_capture_log.handlers):
+            _capture_log.removeHandler(handler)
+            handler.close()
+
+
+class CaptureMiddleware:
+    """
+    ASGI middleware appending one JSON line per request to settings.capture_path
+    when settings.capture_enabled is set.
+
+    Each record holds the start time, method, path, query string, route,
+    replay headers, body (its first settings.capture_max_body_bytes bytes),
+    status, duration and response size; GET records also carry a SHA-256 of
+    the response body so a replay can check that reads return the same bytes.
+    Records are written by a background thread. Files rotate at
+    settings.capture_max_bytes, keeping settings.capture_backups.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.capture_enabled
+            or scope["path"].startswith(EXCLUDED_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.time()
+        started = time.perf_counter()
+        body = bytearray()
+        state = {"truncated": False, "status": None, "size": 0}
+        digest = hashlib.sha256() if scope["method"] == "GET" else None
+
+        async def capture_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                room = settings.capture_max_body_bytes - len(body)
+                if not state["truncated"]:
+                    # Keep a prefix of the body: nothing is appended after the first cut
+                    body.extend(chunk[:room])
+                    state["truncated"] = len(chunk) > room
+            return message
+
+        async def capture_send(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                chunk = message.get("body", b"")
+                state["size"] += len(chunk)
+                if digest is not None:
+                    digest.update(chunk)
+            await send(message)
+
+        try:
+            await self.app(scope, capture_receive, capture_send)
+        finally:
+            self._write(scope, started_at, time.perf_counter() - started, bytes(body), state, digest)
+
+    def _write(self, scope, started_at: float, duration: float, body: bytes, state: dict, digest) -> None:
+        route = scope.get("route")
+        record = {
+            "ts": round(started_at, 6),
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope["query_string"].decode("latin-1"),
+            "route": route.path_format if route is not None else None,
+            "headers": {
+                name.decode("latin-1"): value.decode("latin-1")
+                for name, value in scope["headers"] if name in REPLAYED_HEADERS
+            },
+            "status": state["status"],
+            "duration_ms": round(duration * 1000, 3),
+            "response_bytes": state["size"],
+        }
+        if body:
+            try:
+                record["body"] = body.decode("utf-8")
+            except UnicodeDecodeError:
+                record["body_b64"] = base64.b64encode(body).decode("ascii")
+        if state["truncated"]:
+            record["body_truncated"] = True
+        if digest is not None:
+            record["response_sha256"] = digest.hexdigest()
+        _enqueue(json.dumps(record, ensure_ascii=False))
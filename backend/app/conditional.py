@@ -0,0 +1,146 @@
+"""Conditional GETs (ETag / If-None-Match) and poll interval hints for polling clients"""
+
+import hashlib
+import time
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.config import settings
+
+# Only API reads are tagged; admin endpoints may stream large downloads
+CONDITIONAL_PREFIXES = ("/api/",)
+EXCLUDED_PREFIXES = ("/api/admin",)
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class WriteActivity:
+    """Time of the last successful API write in this process"""
+
+    def __init__(self):
+        self.last_write: Optional[float] = None
+
+    def touch(self) -> None:
+        self.last_write = time.monotonic()
+
+    def reset(self) -> None:
+        self.last_write = None
+
+    def poll_interval(self) -> Optional[int]:
+        """
+        Get the poll interval to suggest to clients.
+
+        Returns:
+            settings.poll_hint_interval while a write happened within the last
+            settings.poll_hint_window seconds, otherwise None (clients back off freely)
+        """
+        if not settings.poll_hint_interval or self.last_write is None:
+            return None
+        if time.monotonic() - self.last_write > settings.poll_hint_window:
+            return None
+        return settings.poll_hint_interval
+
+
+# Process-wide write activity
+write_activity = WriteActivity()
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag of a response body"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag (weak comparison, as RFC 9110 requires for GET).
+
+    Args:
+        if_none_match: Header value, e.g. '"abc", W/"def"' or '*'
+        etag: Current ETag
+
+    Returns:
+        True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+class ConditionalGetMiddleware:
+    """
+    ASGI middleware adding an ETag to successful API GET responses and
+    answering 304 Not Modified when the request's If-None-Match matches.
+
+    Successful API writes are recorded in write_activity; while one is recent,
+    GET responses carry an X-Poll-Interval header asking polling clients to
+    refresh at settings.poll_hint_interval seconds.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if (
+            scope["type"] != "http"
+            or not path.startswith(CONDITIONAL_PREFIXES)
+            or path.startswith(EXCLUDED_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] not in READ_METHODS:
+            async def send_tracking_writes(message):
+                if message["type"] == "http.response.start" and message["status"] < 400:
+                    write_activity.touch()
+                await send(message)
+
+            await self.app(scope, receive, send_tracking_writes)
+            return
+
+        if scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        # Buffer the response: the ETag header must precede a body it is computed from
+        start: Optional[dict] = None
+        chunks: List[bytes] = []
+
+        async def send_buffered(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                if message["status"] != 200:
+                    await send(message)
+                return
+            if start is None or start["status"] != 200:
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            etag = make_etag(body)
+            headers = MutableHeaders(scope=start)
+            headers["ETag"] = etag
+            headers["Cache-Control"] = "no-cache"
+            interval = write_activity.poll_interval()
+            if interval is not None:
+                headers["X-Poll-Interval"] = str(interval)
+
+            if etag_matches(Headers(scope=scope).get("if-none-match"), etag):
+                del headers["content-length"]
+                if "content-type" in headers:
+                    del headers["content-type"]
+                await send({**start, "status": 304})
+                await send({"type": "http.response.body", "body": b""})
+            else:
+                await send(start)
+                await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_buffered)
@@ -1,7 +1,7 @@
 """Configuration management for the backend application"""
 
 import os
-from typing import List
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
 
@@ -13,6 +13,15 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = "sqlite:////data/home_finance.db"
+    sqlite_busy_timeout: float = 5.0  # seconds a connection waits for the write lock
+    
+    # Write queue (group commit of expense inserts, SQLite only)
+    write_queue_enabled: bool = True
+    write_queue_max_batch: int = 100  # rows per group commit
+    write_queue_max_delay: float = 0.002  # seconds to wait for more rows after the first
+    write_queue_max_retries: int = 5  # retries of a batch on "database is locked"
+    write_queue_retry_backoff: float = 0.01  # first retry delay, doubled per attempt
+    write_queue_idle_timeout: float = 30.0  # seconds without work before the writer thread exits
     
     # Timezone
     timezone: str = "Asia/Tokyo"
@@ -25,6 +34,65 @@ class Settings(BaseSettings):
     
     # API
     api_prefix: str = "/api"
+    
+    # Admin endpoints (disabled unless a token is set; sent as X-Admin-Token)
+    admin_token: Optional[str] = None
+    
+    # SQL profiler (per-request statement stats, Server-Timing header, N+1 warnings)
+    sql_profiler_enabled: bool = False
+    sql_profiler_slow_request_ms: float = 500.0  # requests slower than this are logged
+    sql_profiler_repeat_threshold: int = 10  # warn when a statement shape repeats more often in one request
+    
+    # CPU profiling (admin-only ?__profile=1 and the stack sampler)
+    profiling_enabled: bool = False
+    profiling_top_n: int = 50  # functions returned by ?__profile=1
+    profiling_sampler_interval: float = 0.005  # seconds between stack samples
+    profiling_sampler_max_seconds: float = 300.0  # longest sampler run accepted
+    
+    # Memory introspection (admin tracemalloc endpoints)
+    memory_trace_frames: int = 1  # traceback depth stored per allocation (1 is enough for file:line grouping)
+    memory_max_snapshots: int = 5  # named snapshots kept, oldest dropped first
+    
+    # Tracing (W3C traceparent propagation, spans kept in memory and viewed at /debug/traces)
+    tracing_enabled: bool = False
+    tracing_buffer_size: int = 2000  # finished spans kept in the ring buffer
+    tracing_jsonl_path: Optional[str] = None  # also append spans to this JSONL file
+    
+    # Traffic capture (rotating JSONL of requests for benchmarks/replay.py)
+    capture_enabled: bool = False
+    capture_path: str = "/data/capture/requests.jsonl"
+    capture_max_bytes: int = 50 * 1024 * 1024  # file size before rotating
+    capture_backups: int = 5  # rotated files kept (requests.jsonl.1 is the newest)
+    capture_max_body_bytes: int = 64 * 1024  # request bodies longer than this are recorded truncated
+
+    # Polling hints (X-Poll-Interval on API reads shortly after a write)
+    poll_hint_interval: int = 5  # seconds suggested to polling clients; 0 disables the header
+    poll_hint_window: float = 120.0  # seconds after the last write during which the hint is sent
+
+    # Idempotency keys for write endpoints
+    idempotency_ttl_seconds: int = 24 * 60 * 60
+    idempotency_max_entries: int = 10000
+    
+    # Anomaly detection
+    anomaly_window_days: int = 28  # trailing window for rolling median/MAD
+    anomaly_threshold: float = 3.5  # robust z-score above which a value is flagged
+    anomaly_min_history: int = 5  # minimum samples before scoring
+    anomaly_history_size: int = 100  # recent expenses compared on insert
+    
+    # CSV import
+    import_chunk_size: int = 500  # rows per executemany commit
+    import_spool_max_bytes: int = 1024 * 1024  # upload kept in memory up to this size, then spilled to disk
+    
+    # Backup
+    backup_dir: str = "/data/backups"
+    backup_keep: int = 7  # number of snapshots kept after rotation
+    backup_pages_per_step: int = 256  # pages copied per online backup step
+    backup_step_sleep: float = 0.005  # seconds yielded to writers between steps
+    
+    # Archive (cold storage of closed years)
+    archive_dir: str = "/data/archive"
+    archive_keep_years: int = 2  # years before (current year - this) are moved to per-year files
+    archive_vacuum: bool = True  # VACUUM the hot database after archiving
 
 
 # Global settings instance
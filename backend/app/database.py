@@ -2,22 +2,35 @@
 
 import logging
 from datetime import datetime
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError, OperationalError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import Generator, Optional, Tuple
 
 from app.config import settings
+from app.startup import startup_profile
 
 logger = logging.getLogger(__name__)
 
+# Version of the table definitions; bump when models change so init_db runs create_all again
+# 2: expenses uses AUTOINCREMENT (IDs of archived expenses are never reused)
+# 3: idempotency_keys table (Idempotency-Key responses survive restarts)
+SCHEMA_VERSION = 3
+
 # Create Base class for models FIRST (before importing models)
 Base = declarative_base()
 
 # Create SQLAlchemy engine
+# uri=True lets archive files be ATTACHed read-only with "file:...?mode=ro" (see app.archive)
+# timeout is SQLite's busy timeout: how long a connection waits for the write lock
 engine = create_engine(
     settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {},
+    connect_args={
+        "check_same_thread": False,
+        "uri": True,
+        "timeout": settings.sqlite_busy_timeout
+    } if "sqlite" in settings.database_url else {},
     echo=settings.log_level == "DEBUG"
 )
 
@@ -26,7 +39,7 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Import all models to register them with SQLAlchemy
 # This must be done after Base is created
-from app.models import Budget, Expense, Category, MonthlyBudget  # noqa: F401
+from app.models import Budget, Expense, Category, MonthlyBudget, SchemaVersion, IdempotencyRecord  # noqa: F401
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -41,12 +54,134 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def sqlite_database_path(db: Session) -> str:
+    """
+    Get the SQLite file path behind a session.
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        Path of the SQLite database file
+        
+    Raises:
+        ValueError: If the database is not a file-based SQLite database
+    """
+    url = db.get_bind().url
+    if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+        raise ValueError("Only file-based SQLite databases are supported")
+    return url.database
+
+
+def is_sqlite_busy(exc: Exception) -> bool:
+    """
+    Check whether an error is SQLite lock contention ("database is locked").
+    
+    Args:
+        exc: Exception raised by a database operation
+        
+    Returns:
+        True if the operation failed because the database was busy or locked
+    """
+    if not isinstance(exc, OperationalError):
+        return False
+    code = getattr(exc.orig, "sqlite_errorcode", None)
+    if code is not None:
+        # SQLITE_BUSY (5) and SQLITE_LOCKED (6), including extended codes
+        return code & 0xFF in (5, 6)
+    message = str(exc.orig).lower()
+    return "database is locked" in message or "database is busy" in message
+
+
+def _read_schema_state() -> Optional[Tuple[int, Optional[str]]]:
+    """
+    Read the schema version row with a single query.
+    
+    Returns:
+        (version, seeded_month), or None if the database has not been initialized yet
+    """
+    try:
+        with engine.connect() as connection:
+            row = connection.execute(
+                text("SELECT version, seeded_month FROM schema_version WHERE id = 1")
+            ).first()
+    except DBAPIError:
+        # Table does not exist yet
+        return None
+    return (row[0], row[1]) if row else None
+
+
+def migrate_expenses_autoincrement(bind=None) -> bool:
+    """
+    Rebuild an expenses table created before SCHEMA_VERSION 2 with AUTOINCREMENT.
+    
+    Without AUTOINCREMENT SQLite hands out max(id) + 1, so the ID of an archived
+    expense could be given to a new one and the union view would hold two rows
+    with the same primary key. The rebuilt table's sequence starts above the
+    highest ID in the hot table and in every archive file.
+    
+    Args:
+        bind: Engine to migrate (default: the application engine)
+        
+    Returns:
+        True if the table was rebuilt
+    """
+    from app import archive
+    from app.models.expense import Expense
+    
+    bind = bind or engine
+    if bind.dialect.name != "sqlite":
+        return False
+    with bind.begin() as connection:
+        row = connection.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'expenses'")
+        ).first()
+        if row is None or "AUTOINCREMENT" in row[0].upper():
+            return False
+        
+        connection.execute(text("ALTER TABLE expenses RENAME TO expenses_before_autoincrement"))
+        for index in Expense.__table__.indexes:
+            connection.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+        Expense.__table__.create(connection)
+        connection.execute(text(
+            f"INSERT INTO expenses ({archive.EXPENSE_COLUMNS}) "
+            f"SELECT {archive.EXPENSE_COLUMNS} FROM expenses_before_autoincrement"
+        ))
+        connection.execute(text("DROP TABLE expenses_before_autoincrement"))
+        
+        # Inserting explicit IDs already moved the sequence past the hot table's highest ID
+        connection.execute(text("INSERT OR IGNORE INTO sqlite_sequence (name, seq) VALUES ('expenses', 0)"))
+        connection.execute(
+            text("UPDATE sqlite_sequence SET seq = MAX(seq, :highest) WHERE name = 'expenses'"),
+            {"highest": archive.max_archived_id()}
+        )
+    logger.info("Rebuilt the expenses table with AUTOINCREMENT")
+    return True
+
+
 def init_db() -> None:
     """
-    Initialize database by creating all tables.
+    Initialize database by creating all tables and seeding default data.
     Should be called on application startup.
+    
+    The schema_version row records the schema version and the last month whose
+    default budgets were seeded, so a warm restart with an up-to-date schema in
+    the same month only costs a single read. Bump SCHEMA_VERSION when models change.
     """
-    Base.metadata.create_all(bind=engine)
+    current_month = datetime.now().strftime("%Y-%m")
+    with startup_profile.phase("init_db.schema_check"):
+        state = _read_schema_state()
+    
+    schema_current = state is not None and state[0] == SCHEMA_VERSION
+    if schema_current and state[1] == current_month:
+        logger.info(f"Schema version {SCHEMA_VERSION} is up to date, skipping initialization")
+        return
+    
+    if not schema_current:
+        with startup_profile.phase("init_db.create_all"):
+            Base.metadata.create_all(bind=engine)
+        with startup_profile.phase("init_db.migrate"):
+            migrate_expenses_autoincrement()
     
     # Initialize default categories and budgets
     db = SessionLocal()
@@ -55,20 +190,22 @@ def init_db() -> None:
         from app.services.monthly_budget import MonthlyBudgetService
         
         # Initialize default categories
-        category_service = CategoryService(db)
-        category_service.initialize_default_categories()
-        logger.info("Default categories initialized")
+        if not schema_current:
+            with startup_profile.phase("init_db.seed_categories"):
+                category_service = CategoryService(db)
+                category_service.initialize_default_categories()
+            logger.info("Default categories initialized")
         
         # Initialize default budgets for current month
-        current_month = datetime.now().strftime("%Y-%m")
-        monthly_budget_service = MonthlyBudgetService(db)
-        monthly_budget_service.initialize_default_budgets(current_month)
+        with startup_profile.phase("init_db.seed_budgets"):
+            monthly_budget_service = MonthlyBudgetService(db)
+            monthly_budget_service.initialize_default_budgets(current_month)
         logger.info(f"Default budgets initialized for month {current_month}")
         
+        db.merge(SchemaVersion(id=1, version=SCHEMA_VERSION, seeded_month=current_month))
         db.commit()
     except Exception as e:
         logger.error(f"Error initializing default data: {e}", exc_info=True)
         db.rollback()
     finally:
         db.close()
-
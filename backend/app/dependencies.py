@@ -0,0 +1,37 @@
+"""Shared FastAPI dependencies"""
+
+import hmac
+from typing import Optional
+from fastapi import Header, HTTPException
+
+from app.config import settings
+
+
+def verify_admin_token(token: Optional[str]) -> None:
+    """
+    Check an X-Admin-Token value against settings.admin_token.
+    Shared by the require_admin dependency and middleware-level admin features.
+    
+    Args:
+        token: Header value, or None if the header is missing
+        
+    Raises:
+        HTTPException: 403 if admin endpoints are disabled, 401 if the token is wrong
+    """
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    
+    if token is None or not hmac.compare_digest(token, settings.admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Dependency guarding admin endpoints.
+    Admin endpoints are disabled unless settings.admin_token is configured,
+    and the request must carry the same value in the X-Admin-Token header.
+    
+    Raises:
+        HTTPException: 403 if admin endpoints are disabled, 401 if the token is wrong
+    """
+    verify_admin_token(x_admin_token)
@@ -0,0 +1,269 @@
+"""Idempotency-Key support for write endpoints"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# Seconds between deletions of expired records from the idempotency_keys table
+PURGE_INTERVAL = 60.0
+
+# Marker for a key whose first request is still being processed
+_IN_FLIGHT = None
+
+
+class IdempotencyStore:
+    """
+    In-memory store of responses keyed by Idempotency-Key.
+
+    Entries are kept compact (a 16-byte request fingerprint and the JSON-encoded
+    response body) in insertion order, so expired entries are evicted from the
+    front and the oldest entries are dropped first when the store is full.
+    """
+
+    def __init__(self, ttl_seconds: Optional[int] = None, max_entries: Optional[int] = None):
+        """
+        Initialize the store.
+
+        Args:
+            ttl_seconds: Time a stored response is replayed (default: settings.idempotency_ttl_seconds)
+            max_entries: Maximum number of stored keys (default: settings.idempotency_max_entries)
+        """
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.idempotency_ttl_seconds
+        self.max_entries = max_entries if max_entries is not None else settings.idempotency_max_entries
+        # (scope, key) -> (expires_at, fingerprint, (status_code, body) or _IN_FLIGHT)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, bytes, Optional[Tuple[int, bytes]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def begin(self, scope: str, key: str, fingerprint: bytes) -> Optional[Tuple[int, bytes]]:
+        """
+        Claim a key before processing a request.
+
+        Args:
+            scope: Endpoint scope (e.g. "POST /api/expenses")
+            key: Idempotency-Key header value
+            fingerprint: Digest of the request payload
+
+        Returns:
+            (status_code, body) of the original response on replay, or None if the
+            caller owns the key and must process the request
+
+        Raises:
+            HTTPException: 409 if the original request is still in progress,
+                422 if the key was used with a different payload
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._entries.get((scope, key))
+            if entry is None:
+                CACHE_REQUESTS.inc("idempotency", "miss")
+                self._entries[(scope, key)] = (now + self.ttl_seconds, fingerprint, _IN_FLIGHT)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                return None
+
+            _, stored_fingerprint, response = entry
+            if stored_fingerprint != fingerprint:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency-Key was already used with a different request"
+                )
+            if response is _IN_FLIGHT:
+                raise HTTPException(
+                    status_code=409,
+                    detail="A request with this Idempotency-Key is already in progress"
+                )
+            CACHE_REQUESTS.inc("idempotency", "hit")
+            return response
+
+    def complete(self, scope: str, key: str, status_code: int, body: bytes) -> None:
+        """Store the response of a processed request"""
+        with self._lock:
+            entry = self._entries.get((scope, key))
+            if entry is not None:
+                self._entries[(scope, key)] = (entry[0], entry[1], (status_code, body))
+
+    def abort(self, scope: str, key: str) -> None:
+        """Release a key whose request failed, so that a retry is processed again"""
+        with self._lock:
+            self._entries.pop((scope, key), None)
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries from the front (entries are in expiry order)"""
+        while self._entries:
+            expires_at = next(iter(self._entries.values()))[0]
+            if expires_at > now:
+                break
+            self._entries.popitem(last=False)
+
+
+# Global store instance
+idempotency_store = IdempotencyStore()
+
+# time.monotonic() of the last deletion of expired records
+_last_purge = 0.0
+
+
+def load_record(db: Session, scope: str, key: str) -> Optional[Tuple[bytes, int, bytes]]:
+    """
+    Read a stored response from the idempotency_keys table.
+
+    Args:
+        db: Database session of the request
+        scope: Endpoint scope
+        key: Idempotency-Key header value
+
+    Returns:
+        (fingerprint, status_code, body), or None if there is no unexpired record
+        (or the table cannot be read)
+    """
+    # Imported here: app.models must be loaded through app.database
+    from app.models.idempotency import IdempotencyRecord
+
+    try:
+        with Session(bind=db.get_bind()) as session:
+            record = session.get(IdempotencyRecord, (scope, key))
+            if record is None or record.expires_at <= time.time():
+                return None
+            return record.fingerprint, record.status_code, record.body
+    except SQLAlchemyError as e:
+        logger.warning(f"Could not read Idempotency-Key record {scope} {key}: {e}")
+        return None
+
+
+def save_record(db: Session, scope: str, key: str, fingerprint: bytes, status_code: int, body: bytes) -> None:
+    """
+    Store a response in the idempotency_keys table so replays survive a restart.
+
+    Uses its own session, so the objects returned by the request's handler are
+    not expired by the commit. Expired records are deleted at most every
+    PURGE_INTERVAL seconds. A failure is logged: the response is still kept in
+    memory.
+
+    Args:
+        db: Database session of the request
+        scope: Endpoint scope
+        key: Idempotency-Key header value
+        fingerprint: Digest of the request payload
+        status_code: Status code of the response
+        body: JSON-encoded response body
+    """
+    global _last_purge
+    from app.models.idempotency import IdempotencyRecord
+
+    now = time.time()
+    try:
+        with Session(bind=db.get_bind()) as session:
+            session.merge(IdempotencyRecord(
+                scope=scope,
+                key=key,
+                fingerprint=fingerprint,
+                status_code=status_code,
+                body=body,
+                expires_at=now + idempotency_store.ttl_seconds
+            ))
+            if time.monotonic() - _last_purge >= PURGE_INTERVAL:
+                _last_purge = time.monotonic()
+                session.query(IdempotencyRecord).filter(IdempotencyRecord.expires_at <= now).delete()
+            session.commit()
+    except SQLAlchemyError as e:
+        logger.warning(f"Could not store Idempotency-Key record {scope} {key}: {e}")
+
+
+def fingerprint(payload: BaseModel) -> bytes:
+    """Get a compact digest of a request payload"""
+    data = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).digest()
+
+
+def run_idempotent(
+    key: Optional[str],
+    scope: str,
+    payload: BaseModel,
+    handler: Callable[[], Any],
+    status_code: int = 201,
+    db: Optional[Session] = None
+) -> Any:
+    """
+    Run a write handler at most once per Idempotency-Key.
+
+    Without a key the handler simply runs. With a key, the first request runs
+    the handler and stores its response; replays within the TTL get the stored
+    response back (with an Idempotent-Replayed header) without running it again.
+
+    With a database session the response is also stored in the idempotency_keys
+    table, so a retry after a backend restart (e.g. from the frontend's outbox)
+    is still replayed instead of writing the same expense twice.
+
+    Args:
+        key: Idempotency-Key header value (None if absent)
+        scope: Endpoint scope (e.g. "POST /api/expenses")
+        payload: Request payload, used to detect key reuse with different data
+        handler: Callable performing the write and returning the response model
+        status_code: Status code of the original response
+        db: Database session of the request (None keeps the response in memory only)
+
+    Returns:
+        The handler result, or a JSONResponse with the stored response on replay
+    """
+    if not key:
+        return handler()
+
+    payload_fingerprint = fingerprint(payload)
+    stored = idempotency_store.begin(scope, key, payload_fingerprint)
+    if stored is None and db is not None:
+        # Not in memory (e.g. after a restart): look for the response of an earlier process
+        record = load_record(db, scope, key)
+        if record is not None:
+            stored_fingerprint, stored_status, body = record
+            if stored_fingerprint != payload_fingerprint:
+                idempotency_store.abort(scope, key)
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency-Key was already used with a different request"
+                )
+            idempotency_store.complete(scope, key, stored_status, body)
+            stored = (stored_status, body)
+    if stored is not None:
+        stored_status, body = stored
+        return JSONResponse(
+            status_code=stored_status,
+            content=json.loads(body),
+            headers={"Idempotent-Replayed": "true"}
+        )
+
+    try:
+        result = handler()
+    except Exception:
+        idempotency_store.abort(scope, key)
+        raise
+
+    body = json.dumps(jsonable_encoder(result), separators=(",", ":")).encode("utf-8")
+    idempotency_store.complete(scope, key, status_code, body)
+    if db is not None:
+        save_record(db, scope, key, payload_fingerprint, status_code, body)
+    return result
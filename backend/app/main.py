@@ -1,13 +1,27 @@
 """FastAPI application entry point"""
 
+# Imported first so the profile's clock starts before the heavy imports below
+from app.startup import startup_profile
+
 import logging
+import time
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import ValidationError
+from sqlalchemy.exc import OperationalError
 from app.config import settings
-from app.routers import health, budgets, expenses, summary, categories, monthly_budgets
-from app.database import init_db
+from app.routers import health, metrics, budgets, expenses, summary, categories, monthly_budgets, anomalies, imports, backups, archive, profiling, memory, debug
+from app.database import init_db, is_sqlite_busy
+from app.metrics import MetricsMiddleware, instrument_engines
+from app.sql_profiler import SqlProfilerMiddleware, install_statement_listeners
+from app.profiling import ProfilingMiddleware
+from app.memory import install_session_tracking
+from app.tracing import TracingMiddleware, install_db_tracing
+from app.capture import CaptureMiddleware
+from app.conditional import ConditionalGetMiddleware
+
+startup_profile.record("imports", time.perf_counter() - startup_profile.started)
 
 # Configure logging
 logging.basicConfig(
@@ -34,6 +48,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Traffic capture for benchmarks/replay.py (opt-in with CAPTURE_ENABLED); added first so
+# it runs inside the diagnostics middleware below and their overhead is not recorded
+app.add_middleware(CaptureMiddleware)
+
+# ETag / 304 Not Modified for API reads and X-Poll-Interval hints after writes (outside the
+# capture, so captured reads keep their full bodies)
+app.add_middleware(ConditionalGetMiddleware)
+
+# Metrics: request middleware plus SQL and pool events of every engine
+app.add_middleware(MetricsMiddleware)
+instrument_engines()
+
+# SQL profiler (opt-in with SQL_PROFILER_ENABLED)
+app.add_middleware(SqlProfilerMiddleware)
+install_statement_listeners()
+
+# CPU profiling of single requests with ?__profile=1 (opt-in with PROFILING_ENABLED, admin only)
+app.add_middleware(ProfilingMiddleware)
+
+# Live session tracking for the memory admin endpoints
+install_session_tracking()
+
+# Tracing: server span per request, db.query spans from engine events (opt-in with TRACING_ENABLED)
+app.add_middleware(TracingMiddleware)
+install_db_tracing()
+
 
 # Exception handlers
 @app.exception_handler(ValidationError)
@@ -56,6 +96,19 @@ async def value_error_handler(request: Request, exc: ValueError):
     )
 
 
+@app.exception_handler(OperationalError)
+async def operational_error_handler(request: Request, exc: OperationalError):
+    """Handle database errors, reporting lock contention as retryable"""
+    if is_sqlite_busy(exc):
+        logger.warning(f"Database busy: {exc}")
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Database is busy, please retry", "error_code": "DATABASE_BUSY"},
+            headers={"Retry-After": "1"}
+        )
+    return await general_exception_handler(request, exc)
+
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle all other exceptions"""
@@ -68,11 +121,19 @@ async def general_exception_handler(request: Request, exc: Exception):
 
 # Include routers
 app.include_router(health.router, tags=["health"])
+app.include_router(metrics.router, tags=["health"])
 app.include_router(budgets.router, tags=["budgets"])
 app.include_router(expenses.router, tags=["expenses"])
 app.include_router(summary.router, tags=["summary"])
 app.include_router(categories.router, tags=["categories"])
 app.include_router(monthly_budgets.router, tags=["monthly_budgets"])
+app.include_router(anomalies.router, tags=["anomalies"])
+app.include_router(imports.router, tags=["import"])
+app.include_router(backups.router, tags=["admin"])
+app.include_router(archive.router, tags=["admin"])
+app.include_router(profiling.router, tags=["admin"])
+app.include_router(memory.router, tags=["admin"])
+app.include_router(debug.router, tags=["admin"])
 
 
 # Startup event
@@ -84,8 +145,10 @@ async def startup_event():
     logger.info(f"Timezone: {settings.timezone}")
     
     # Initialize database
-    init_db()
+    with startup_profile.phase("init_db"):
+        init_db()
     logger.info("Database initialized")
+    startup_profile.log()
 
 
 @app.get("/")
@@ -0,0 +1,301 @@
+"""Memory introspection: tracemalloc snapshots, RSS, live session identity maps and GC stats"""
+
+import gc
+import logging
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.metrics import LabelValues, registry
+
+logger = logging.getLogger(__name__)
+
+# Allocations made by tracemalloc itself and by the import machinery are noise
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def read_rss() -> Dict[str, Optional[int]]:
+    """
+    Get the resident set size of this process.
+
+    Returns:
+        Dictionary with current and peak RSS in bytes (current is None where /proc is unavailable)
+    """
+    current = None
+    peak = None
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    current = int(line.split()[1]) * 1024
+                elif line.startswith("VmHWM:"):
+                    peak = int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if peak is None:
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = maxrss if sys.platform == "darwin" else maxrss * 1024
+    return {"rss_bytes": current, "peak_rss_bytes": peak}
+
+
+def _rss_gauge() -> Dict[LabelValues, float]:
+    rss = read_rss()["rss_bytes"]
+    return {(): float(rss)} if rss is not None else {}
+
+
+PROCESS_RSS = registry.gauge(
+    "process_resident_memory_bytes", "Resident memory size in bytes", function=_rss_gauge
+)
+
+
+# Sessions that have started a transaction and are still referenced somewhere
+_live_sessions: "weakref.WeakSet[Session]" = weakref.WeakSet()
+
+
+def _track_session(session, transaction) -> None:
+    _live_sessions.add(session)
+
+
+def install_session_tracking() -> None:
+    """Track live sessions through a Session event (idempotent)"""
+    if not event.contains(Session, "after_transaction_create", _track_session):
+        event.listen(Session, "after_transaction_create", _track_session)
+
+
+def session_stats() -> List[Dict[str, Any]]:
+    """
+    Get the identity map size of every live session.
+    A session that stays here with a growing identity map is holding ORM objects.
+
+    Returns:
+        List of dictionaries with session id, identity map size and pending object counts,
+        largest identity map first
+    """
+    sessions = [
+        {
+            "session_id": id(session),
+            "identity_map_size": len(session.identity_map),
+            "new": len(session.new),
+            "dirty": len(session.dirty),
+            "in_transaction": session.in_transaction(),
+        }
+        for session in list(_live_sessions)
+    ]
+    return sorted(sessions, key=lambda item: item["identity_map_size"], reverse=True)
+
+
+def gc_stats() -> Dict[str, Any]:
+    """
+    Get garbage collector statistics.
+
+    Returns:
+        Dictionary with per-generation counts, thresholds, collection stats,
+        uncollectable objects and the number of tracked objects
+    """
+    return {
+        "counts": list(gc.get_count()),
+        "thresholds": list(gc.get_threshold()),
+        "generations": gc.get_stats(),
+        "garbage": len(gc.garbage),
+        "tracked_objects": len(gc.get_objects()),
+    }
+
+
+def _format_stat(stat) -> Dict[str, Any]:
+    frame = stat.traceback[0]
+    return {
+        "location": f"{frame.filename}:{frame.lineno}",
+        "size_bytes": stat.size,
+        "count": stat.count,
+    }
+
+
+def _format_diff(stat) -> Dict[str, Any]:
+    frame = stat.traceback[0]
+    return {
+        "location": f"{frame.filename}:{frame.lineno}",
+        "size_bytes": stat.size,
+        "size_diff_bytes": stat.size_diff,
+        "count": stat.count,
+        "count_diff": stat.count_diff,
+    }
+
+
+class MemoryTracker:
+    """
+    tracemalloc session with named snapshots.
+
+    Tracing is off until start() is called, since it slows allocations down
+    and adds memory per traced block. Snapshots are kept by name, oldest
+    dropped beyond settings.memory_max_snapshots.
+    """
+
+    def __init__(self, max_snapshots: Optional[int] = None):
+        """
+        Initialize the tracker.
+
+        Args:
+            max_snapshots: Snapshots kept (default: settings.memory_max_snapshots)
+        """
+        self.max_snapshots = max_snapshots if max_snapshots is not None else settings.memory_max_snapshots
+        self._snapshots: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: Optional[int] = None) -> None:
+        """
+        Start tracing allocations (no-op if already tracing).
+
+        Args:
+            frames: Traceback depth stored per allocation (default: settings.memory_trace_frames)
+        """
+        if tracemalloc.is_tracing():
+            return
+        tracemalloc.start(frames if frames is not None else settings.memory_trace_frames)
+        logger.info("tracemalloc started")
+
+    def stop(self) -> None:
+        """Stop tracing and drop all snapshots"""
+        tracemalloc.stop()
+        with self._lock:
+            self._snapshots.clear()
+        logger.info("tracemalloc stopped")
+
+    def _take(self) -> tracemalloc.Snapshot:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not running")
+        return tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+    def snapshot(self, name: str) -> Dict[str, Any]:
+        """
+        Take a named snapshot, replacing any snapshot with the same name.
+
+        Args:
+            name: Snapshot name
+
+        Returns:
+            Snapshot summary
+
+        Raises:
+            RuntimeError: If tracing is not running
+        """
+        snapshot = self._take()
+        taken_at = time.time()
+        with self._lock:
+            self._snapshots.pop(name, None)
+            self._snapshots[name] = (snapshot, taken_at)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return self._summary(name, snapshot, taken_at)
+
+    def _summary(self, name: str, snapshot: tracemalloc.Snapshot, taken_at: float) -> Dict[str, Any]:
+        stats = snapshot.statistics("filename")
+        return {
+            "name": name,
+            "taken_at": taken_at,
+            "traced_bytes": sum(stat.size for stat in stats),
+            "traced_blocks": sum(stat.count for stat in stats),
+        }
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        """
+        List stored snapshots, oldest first.
+
+        Returns:
+            List of snapshot summaries
+        """
+        with self._lock:
+            snapshots = list(self._snapshots.items())
+        return [self._summary(name, snapshot, taken_at) for name, (snapshot, taken_at) in snapshots]
+
+    def _get(self, name: Optional[str]) -> tracemalloc.Snapshot:
+        if name is None:
+            return self._take()
+        with self._lock:
+            stored = self._snapshots.get(name)
+        if stored is None:
+            raise ValueError(f"Snapshot not found: {name}")
+        return stored[0]
+
+    def top(self, name: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Get the allocation sites holding the most memory, grouped by file and line.
+
+        Args:
+            name: Snapshot name (None: take a fresh, unstored snapshot)
+            limit: Number of sites returned
+
+        Returns:
+            List of dictionaries with location, bytes and block count
+
+        Raises:
+            ValueError: If the snapshot does not exist
+            RuntimeError: If a fresh snapshot is needed and tracing is not running
+        """
+        return [_format_stat(stat) for stat in self._get(name).statistics("lineno")[:limit]]
+
+    def diff(self, base: str, target: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Compare two snapshots, grouped by file and line, largest growth first.
+
+        Args:
+            base: Name of the older snapshot
+            target: Name of the newer snapshot (None: take a fresh, unstored snapshot)
+            limit: Number of sites returned
+
+        Returns:
+            List of dictionaries with location, size/count and their change since base
+
+        Raises:
+            ValueError: If a snapshot does not exist
+            RuntimeError: If a fresh snapshot is needed and tracing is not running
+        """
+        base_snapshot = self._get(base)
+        target_snapshot = self._get(target)
+        return [_format_diff(stat) for stat in target_snapshot.compare_to(base_snapshot, "lineno")[:limit]]
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Get process memory state.
+
+        Returns:
+            Dictionary with RSS, tracemalloc state, live sessions and GC stats
+        """
+        traced, traced_peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            names = list(self._snapshots)
+        return {
+            **read_rss(),
+            "tracemalloc": {
+                "tracing": tracemalloc.is_tracing(),
+                "frames": tracemalloc.get_traceback_limit(),
+                "traced_bytes": traced,
+                "traced_peak_bytes": traced_peak,
+                "overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+                "snapshots": names,
+            },
+            "sessions": session_stats(),
+            "gc": gc_stats(),
+        }
+
+
+# Process-wide tracker driven by the admin memory endpoints
+memory_tracker = MemoryTracker()
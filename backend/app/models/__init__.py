@@ -4,5 +4,7 @@ from app.models.budget import Budget
 from app.models.expense import Expense
 from app.models.category import Category
 from app.models.monthly_budget import MonthlyBudget
+from app.models.schema_version import SchemaVersion
+from app.models.idempotency import IdempotencyRecord
 
-__all__ = ["Budget", "Expense", "Category", "MonthlyBudget"]
+__all__ = ["Budget", "Expense", "Category", "MonthlyBudget", "SchemaVersion", "IdempotencyRecord"]
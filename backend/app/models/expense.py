@@ -24,6 +24,8 @@ class Expense(Base):
         Index('ix_expenses_month', 'month'),
         Index('ix_expenses_category', 'category'),
         Index('ix_expenses_date', 'date'),
+        # Never reuse the ID of a deleted or archived expense (archived rows keep their IDs)
+        {'sqlite_autoincrement': True},
     )
     
     def __repr__(self):
@@ -0,0 +1,20 @@
+"""IdempotencyRecord model definition"""
+
+from sqlalchemy import Column, Float, Integer, LargeBinary, String
+from app.database import Base
+
+
+class IdempotencyRecord(Base):
+    """Stored response of a write request, keyed by endpoint scope and Idempotency-Key"""
+    
+    __tablename__ = "idempotency_keys"
+    
+    scope = Column(String(100), primary_key=True, comment="Endpoint scope (e.g. POST /api/expenses)")
+    key = Column(String(255), primary_key=True, comment="Idempotency-Key header value")
+    fingerprint = Column(LargeBinary(16), nullable=False, comment="Digest of the request payload")
+    status_code = Column(Integer, nullable=False)
+    body = Column(LargeBinary, nullable=False, comment="JSON-encoded response body")
+    expires_at = Column(Float, nullable=False, index=True, comment="Unix time the record stops being replayed")
+    
+    def __repr__(self):
+        return f"<IdempotencyRecord(scope={self.scope}, key={self.key}, status_code={self.status_code})>"
@@ -0,0 +1,19 @@
+"""SchemaVersion model definition"""
+
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class SchemaVersion(Base):
+    """Single-row table recording the schema version and the last seeded month"""
+    
+    __tablename__ = "schema_version"
+    
+    id = Column(Integer, primary_key=True, default=1)
+    version = Column(Integer, nullable=False, comment="Schema version (app.database.SCHEMA_VERSION)")
+    seeded_month = Column(String(7), nullable=True, comment="YYYY-MM of the last default budget seeding")
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<SchemaVersion(version={self.version}, seeded_month={self.seeded_month})>"
@@ -0,0 +1,384 @@
+"""On-demand CPU profiling: admin-only ?__profile=1 requests and a periodic stack sampler"""
+
+import cProfile
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.config import settings
+from app.dependencies import verify_admin_token
+
+logger = logging.getLogger(__name__)
+
+# Key of a function in pstats: (filename, first line, name)
+FunctionKey = Tuple[str, int, str]
+
+# Frames deeper than this are not expanded when collapsing a cProfile call graph
+MAX_STACK_DEPTH = 64
+
+# Leaf frames of threads that are waiting rather than working
+IDLE_LEAVES = {("threading.py", "wait"), ("selectors.py", "select")}
+
+
+def _short_path(filename: str) -> str:
+    """Strip the interpreter and site-packages prefixes from a source path"""
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    for prefix in (os.getcwd(), sys.prefix):
+        if filename.startswith(prefix + os.sep):
+            return filename[len(prefix) + 1:]
+    return filename
+
+
+def function_label(filename: str, line: int, name: str) -> str:
+    """
+    Format a function for profile output.
+
+    Args:
+        filename: Source file ("~" for built-ins in pstats)
+        line: First line of the function
+        name: Function name
+
+    Returns:
+        "name (path:line)", or the bare name for built-ins; never contains ";"
+    """
+    if filename == "~":
+        label = name
+    else:
+        label = f"{name} ({_short_path(filename)}:{line})"
+    return label.replace(";", ",")
+
+
+def top_functions(stats: Dict[FunctionKey, tuple], limit: int) -> List[Dict[str, Any]]:
+    """
+    Rank cProfile functions by cumulative time.
+
+    Args:
+        stats: pstats.Stats(...).stats mapping
+        limit: Number of functions returned
+
+    Returns:
+        List of dictionaries with call counts and own/cumulative milliseconds
+    """
+    ranked = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+    return [
+        {
+            "function": function_label(*key),
+            "ncalls": ncalls,
+            "primitive_calls": primitive_calls,
+            "tottime_ms": round(tottime * 1000, 3),
+            "cumtime_ms": round(cumtime * 1000, 3),
+        }
+        for key, (primitive_calls, ncalls, tottime, cumtime, _) in ranked[:limit]
+    ]
+
+
+def collapse_stats(stats: Dict[FunctionKey, tuple]) -> Counter:
+    """
+    Turn a cProfile call graph into collapsed stacks for flamegraph tools.
+
+    cProfile only records caller/callee edges, so stacks are rebuilt from the
+    roots down, splitting each function's own time across the paths leading
+    to it in proportion to the cumulative time of each edge. Recursive edges
+    are not followed and negligible branches are pruned.
+
+    Args:
+        stats: pstats.Stats(...).stats mapping
+
+    Returns:
+        Counter with "root;...;leaf" as key and own time in seconds as value
+    """
+    callees: Dict[FunctionKey, List[Tuple[FunctionKey, float]]] = defaultdict(list)
+    for function, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees[caller].append((function, edge[3]))
+
+    roots = [function for function, entry in stats.items() if not entry[4]]
+    total = sum(stats[root][3] for root in roots)
+    threshold = max(total * 1e-4, 1e-6)
+    stacks: Counter = Counter()
+
+    def walk(function: FunctionKey, path: List[FunctionKey], weight: float) -> None:
+        _, _, tottime, cumtime, _ = stats[function]
+        if cumtime <= 0:
+            return
+        scale = weight / cumtime
+        key = ";".join(function_label(*frame) for frame in path)
+        stacks[key] += tottime * scale
+        if len(path) >= MAX_STACK_DEPTH:
+            return
+        for callee, edge_time in callees.get(function, ()):
+            child_weight = edge_time * scale
+            if callee in path or child_weight < threshold:
+                continue
+            walk(callee, path + [callee], child_weight)
+
+    for root in roots:
+        walk(root, [root], stats[root][3])
+    return stacks
+
+
+def format_collapsed(stacks: Counter, scale: float = 1.0) -> str:
+    """
+    Render collapsed stacks, one "stack count" line each, largest first.
+
+    Args:
+        stacks: Counter of stack to value
+        scale: Multiplier applied before rounding to integers (e.g. 1e6 for seconds to microseconds)
+
+    Returns:
+        Text accepted by flamegraph.pl, speedscope and similar tools
+    """
+    lines = []
+    for stack, value in stacks.most_common():
+        count = int(round(value * scale))
+        if count > 0:
+            lines.append(f"{stack} {count}")
+    return "\n".join(lines) + "\n"
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware running a request under cProfile when it carries ?__profile=1.
+
+    Only active when settings.profiling_enabled is set, and only for requests
+    with a valid X-Admin-Token. The endpoint's response is replaced by the
+    profile: top functions by cumulative time as JSON, or collapsed stacks
+    with ?__profile_format=collapsed. cProfile follows the event-loop thread,
+    so async endpoints are profiled in full; for def endpoints, which run in
+    the threadpool, use the stack sampler instead.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.profiling_enabled or b"__profile=" not in scope["query_string"]:
+            await self.app(scope, receive, send)
+            return
+
+        params = parse_qs(scope["query_string"].decode("latin-1"))
+        if params.get("__profile", [""])[0] not in ("1", "true"):
+            await self.app(scope, receive, send)
+            return
+
+        headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]}
+        try:
+            verify_admin_token(headers.get("x-admin-token"))
+        except HTTPException as e:
+            response = JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+            await response(scope, receive, send)
+            return
+
+        status = {"code": None}
+
+        async def capture_send(message):
+            # The profiled response is discarded; only its status is reported
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, capture_send)
+        finally:
+            profiler.disable()
+        elapsed = time.perf_counter() - started
+
+        stats = pstats.Stats(profiler)
+        request = f"{scope['method']} {scope['path']}"
+        logger.info(f"Profiled {request}: {elapsed * 1000:.1f} ms, {stats.total_calls} calls")
+        profiled_headers = {"X-Profiled-Status": str(status["code"]), "Cache-Control": "no-store"}
+
+        if params.get("__profile_format", ["json"])[0] == "collapsed":
+            response = PlainTextResponse(format_collapsed(collapse_stats(stats.stats), 1e6), headers=profiled_headers)
+        else:
+            response = JSONResponse(
+                content={
+                    "request": request,
+                    "status_code": status["code"],
+                    "duration_ms": round(elapsed * 1000, 3),
+                    "total_calls": stats.total_calls,
+                    "functions": top_functions(stats.stats, settings.profiling_top_n),
+                },
+                headers=profiled_headers
+            )
+        await response(scope, receive, send)
+
+
+class StackSampler:
+    """
+    Low-overhead sampling profiler covering every thread of the process.
+
+    A daemon thread wakes every interval, reads the Python stack of all other
+    threads with sys._current_frames() and counts identical stacks. Nothing is
+    hooked into the profiled code, so requests run at full speed; idle threads
+    (waiting on a lock or in the event loop's select) are counted separately.
+    """
+
+    def __init__(self):
+        """Initialize an idle sampler"""
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._labels: Dict[Any, str] = {}
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.idle_samples = 0
+        self.interval = settings.profiling_sampler_interval
+        self.seconds = 0.0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float, interval: Optional[float] = None) -> None:
+        """
+        Start sampling for a fixed time, discarding the previous profile.
+
+        Args:
+            seconds: Sampling duration
+            interval: Seconds between samples (default: settings.profiling_sampler_interval)
+
+        Raises:
+            ValueError: If seconds or interval is out of range
+            RuntimeError: If the sampler is already running
+        """
+        interval = interval if interval is not None else settings.profiling_sampler_interval
+        if not 0 < seconds <= settings.profiling_sampler_max_seconds:
+            raise ValueError(f"seconds must be between 0 and {settings.profiling_sampler_max_seconds}")
+        if not 0.001 <= interval <= seconds:
+            raise ValueError("interval must be at least 0.001 and at most seconds")
+
+        with self._lock:
+            if self.running:
+                raise RuntimeError("Sampler is already running")
+            self.samples = Counter()
+            self.sample_count = 0
+            self.idle_samples = 0
+            self.interval = interval
+            self.seconds = seconds
+            self.started_at = time.time()
+            self.finished_at = None
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+            self._thread.start()
+        logger.info(f"Stack sampler started for {seconds}s every {interval * 1000:.1f} ms")
+
+    def stop(self) -> None:
+        """Stop sampling early and wait for the sampler thread"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def _run(self) -> None:
+        deadline = time.monotonic() + self.seconds
+        own = threading.get_ident()
+        while time.monotonic() < deadline and not self._stop.wait(self.interval):
+            self._sample(own)
+        self.finished_at = time.time()
+        logger.info(f"Stack sampler finished: {self.sample_count} samples")
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = function_label(code.co_filename, code.co_firstlineno, code.co_name)
+        return label
+
+    def _sample(self, own: int) -> None:
+        """Record the current stack of every other thread"""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks: List[str] = []
+        idle = 0
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            leaf = frame.f_code
+            if (os.path.basename(leaf.co_filename), leaf.co_name) in IDLE_LEAVES:
+                idle += 1
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(f"thread:{names.get(ident, ident)}".replace(";", ","))
+            stacks.append(";".join(reversed(stack)))
+
+        # Readers copy the counters under the same lock
+        with self._lock:
+            self.samples.update(stacks)
+            self.sample_count += len(stacks)
+            self.idle_samples += idle
+
+    def _snapshot(self) -> Tuple[Counter, int, int]:
+        """Copy the counters so they can be aggregated while sampling continues"""
+        with self._lock:
+            return Counter(self.samples), self.sample_count, self.idle_samples
+
+    def collapsed(self) -> str:
+        """
+        Get the aggregated profile as collapsed stacks.
+
+        Returns:
+            One "thread;root;...;leaf count" line per distinct stack
+        """
+        samples, _, _ = self._snapshot()
+        return format_collapsed(samples)
+
+    def as_dict(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get the sampler state and the busiest functions.
+
+        Args:
+            limit: Number of functions returned (default: settings.profiling_top_n)
+
+        Returns:
+            Dictionary with run state, sample counts and per-function own/total samples
+        """
+        limit = limit if limit is not None else settings.profiling_top_n
+        stacks, sample_count, idle_samples = self._snapshot()
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in stacks.items():
+            frames = stack.split(";")[1:]  # first frame is the thread
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+
+        samples = sample_count or 1
+        return {
+            "running": self.running,
+            "seconds": self.seconds,
+            "interval": self.interval,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "samples": sample_count,
+            "idle_samples": idle_samples,
+            "functions": [
+                {
+                    "function": function,
+                    "own_samples": own[function],
+                    "total_samples": count,
+                    "total_pct": round(count * 100 / samples, 2),
+                }
+                for function, count in total.most_common(limit)
+            ],
+        }
+
+
+# Process-wide sampler driven by the admin profiler endpoints
+stack_sampler = StackSampler()
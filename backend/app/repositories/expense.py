@@ -1,10 +1,12 @@
 """Expense repository for database operations"""
 
-from typing import Optional, List
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from typing import Optional, List, Tuple, Dict, Any, Iterable
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import and_, func, insert
 from datetime import date
 
+from app import archive
+from app.write_queue import get_write_queue
 from app.models.expense import Expense
 from app.repositories.base import BaseRepository
 
@@ -21,6 +23,48 @@ class ExpenseRepository(BaseRepository[Expense]):
         """
         super().__init__(Expense, db)
     
+    def _source(self, years: Optional[Iterable[int]] = None):
+        """
+        Get the entity to query: the hot table, or the union view over the
+        hot table and the archived years when the query touches them.
+        
+        Args:
+            years: Years covered by the query (None for all years)
+            
+        Returns:
+            Expense, or Expense aliased onto the union view
+        """
+        archived = archive.archived_years()
+        if not archived:
+            return Expense
+        if years is not None and not set(years) & set(archived):
+            return Expense
+        if not archive.ensure_attached(self.db, archived):
+            return Expense
+        return aliased(Expense, archive.union_view_table(), adapt_on_names=True)
+    
+    @staticmethod
+    def _month_years(month: str) -> List[int]:
+        """Get the year of a YYYY-MM month as a list (empty if malformed)"""
+        return [int(month[:4])] if month[:4].isdigit() else []
+    
+    def get_by_id(self, id: int) -> Optional[Expense]:
+        """
+        Get an expense by ID, looking into archived years if needed.
+        
+        Args:
+            id: Expense ID
+            
+        Returns:
+            Expense instance or None if not found
+        """
+        expense = super().get_by_id(id)
+        if expense is None and archive.archived_years():
+            source = self._source()
+            if source is not Expense:
+                expense = self.db.query(source).filter(source.id == id).first()
+        return expense
+    
     def create_expense(
         self,
         date: date,
@@ -30,6 +74,8 @@ class ExpenseRepository(BaseRepository[Expense]):
     ) -> Expense:
         """
         Create a new expense with automatic month derivation.
+        On SQLite the insert goes through the engine's write queue, which
+        commits concurrent inserts together (see app.write_queue).
         
         Args:
             date: Expense date
@@ -43,6 +89,17 @@ class ExpenseRepository(BaseRepository[Expense]):
         # Automatically derive month from date (YYYY-MM format)
         month = date.strftime("%Y-%m")
         
+        write_queue = get_write_queue(self.db.get_bind())
+        if write_queue is not None:
+            expense_id = write_queue.submit({
+                "date": date,
+                "month": month,
+                "category": category,
+                "amount": amount,
+                "memo": memo
+            })
+            return self.db.get(Expense, expense_id)
+        
         new_expense = Expense(
             date=date,
             month=month,
@@ -52,6 +109,51 @@ class ExpenseRepository(BaseRepository[Expense]):
         )
         return self.create(new_expense)
     
+    def bulk_create(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Insert many expenses in a single executemany and commit.
+        
+        Args:
+            rows: Dictionaries with date, month, category, amount and memo keys
+            
+        Returns:
+            Number of inserted rows
+        """
+        if not rows:
+            return 0
+        self.db.execute(insert(Expense), rows)
+        self.db.commit()
+        return len(rows)
+    
+    def count_by_dates(self, dates: Iterable[date]) -> Dict[Tuple[date, int, str], int]:
+        """
+        Count existing expenses per (date, amount, memo) for the given dates.
+        
+        Args:
+            dates: Dates to look up
+            
+        Returns:
+            Dictionary with (date, amount, memo) as key and the number of rows as value.
+            A missing memo is reported as an empty string.
+        """
+        dates = list(dates)
+        if not dates:
+            return {}
+        source = self._source({d.year for d in dates})
+        rows = self.db.query(
+            source.date,
+            source.amount,
+            func.coalesce(source.memo, ""),
+            func.count(source.id)
+        ).filter(
+            source.date.in_(dates)
+        ).group_by(
+            source.date,
+            source.amount,
+            func.coalesce(source.memo, "")
+        ).all()
+        return {(row[0], row[1], row[2]): row[3] for row in rows}
+    
     def get_by_month(self, month: str) -> List[Expense]:
         """
         Get all expenses for a specific month.
@@ -62,7 +164,8 @@ class ExpenseRepository(BaseRepository[Expense]):
         Returns:
             List of Expense instances for the specified month
         """
-        return self.db.query(Expense).filter(Expense.month == month).all()
+        source = self._source(self._month_years(month))
+        return self.db.query(source).filter(source.month == month).all()
     
     def get_by_category(self, category: str) -> List[Expense]:
         """
@@ -74,7 +177,8 @@ class ExpenseRepository(BaseRepository[Expense]):
         Returns:
             List of Expense instances for the specified category
         """
-        return self.db.query(Expense).filter(Expense.category == category).all()
+        source = self._source()
+        return self.db.query(source).filter(source.category == category).all()
     
     def get_by_month_and_category(self, month: str, category: str) -> List[Expense]:
         """
@@ -87,21 +191,163 @@ class ExpenseRepository(BaseRepository[Expense]):
         Returns:
             List of Expense instances for the specified month and category
         """
-        return self.db.query(Expense).filter(
+        source = self._source(self._month_years(month))
+        return self.db.query(source).filter(
             and_(
-                Expense.month == month,
-                Expense.category == category
+                source.month == month,
+                source.category == category
             )
         ).all()
     
+    def get_page(
+        self,
+        month: Optional[str] = None,
+        category: Optional[str] = None,
+        sort: str = "date",
+        descending: bool = True,
+        offset: int = 0,
+        limit: int = 50
+    ) -> Tuple[List[Expense], int]:
+        """
+        Get one page of expenses, optionally filtered by month and/or category.
+        Ties in the sort column are broken by ID, so pages never overlap.
+        
+        Args:
+            month: Optional month filter in YYYY-MM format
+            category: Optional category filter
+            sort: Column to sort by (date, amount, category, created_at or id)
+            descending: Sort in descending order
+            offset: Number of expenses to skip
+            limit: Maximum number of expenses to return
+            
+        Returns:
+            Tuple of (expenses of the page, number of expenses matching the filters)
+        """
+        source = self._source(self._month_years(month) if month else None)
+        query = self.db.query(source)
+        if month:
+            query = query.filter(source.month == month)
+        if category:
+            query = query.filter(source.category == category)
+        
+        total = query.count()
+        column = getattr(source, sort)
+        if descending:
+            query = query.order_by(column.desc(), source.id.desc())
+        else:
+            query = query.order_by(column.asc(), source.id.asc())
+        return query.offset(offset).limit(limit).all(), total
+    
+    def get_daily_totals(self, start: date, end: date) -> List[Tuple[date, str, int]]:
+        """
+        Get total spent per day and category within a date range.
+        
+        Args:
+            start: First date of the range (inclusive)
+            end: Last date of the range (inclusive)
+            
+        Returns:
+            List of (date, category, total) tuples ordered by date
+        """
+        source = self._source(range(start.year, end.year + 1))
+        rows = self.db.query(
+            source.date,
+            source.category,
+            func.sum(source.amount)
+        ).filter(
+            and_(
+                source.date >= start,
+                source.date <= end
+            )
+        ).group_by(
+            source.date,
+            source.category
+        ).order_by(source.date).all()
+        return [(row[0], row[1], int(row[2])) for row in rows]
+    
+    def get_recent_amounts(
+        self,
+        category: str,
+        limit: int,
+        exclude_id: Optional[int] = None
+    ) -> List[int]:
+        """
+        Get the amounts of the most recent expenses in a category.
+        Uses the category index so the cost is bounded by the limit,
+        not by the size of the history.
+        
+        Args:
+            category: Expense category
+            limit: Maximum number of amounts to return
+            exclude_id: Optional expense ID to leave out (e.g. the one being checked)
+            
+        Returns:
+            List of amounts, most recent first
+        """
+        query = self.db.query(Expense.amount).filter(Expense.category == category)
+        if exclude_id is not None:
+            query = query.filter(Expense.id != exclude_id)
+        rows = query.order_by(Expense.id.desc()).limit(limit).all()
+        return [row[0] for row in rows]
+    
+    def get_years_before(self, year: int) -> List[int]:
+        """
+        Get the years before the given year that have expenses in the hot table.
+        
+        Args:
+            year: Exclusive upper bound
+            
+        Returns:
+            Sorted list of years
+        """
+        rows = self.db.query(
+            func.distinct(func.substr(Expense.month, 1, 4))
+        ).filter(
+            Expense.month < f"{year:04d}-01"
+        ).all()
+        return sorted(int(row[0]) for row in rows)
+    
+    def delete_by_ids(self, ids: Iterable[int]) -> Tuple[List[int], List[int], List[int]]:
+        """
+        Delete several expenses in a single statement and commit.
+        Archived expenses are read-only and are left in place.
+        
+        Args:
+            ids: Expense IDs
+            
+        Returns:
+            Tuple of (deleted IDs, IDs not found, archived IDs), each sorted
+        """
+        ids = sorted(set(ids))
+        found = {row[0] for row in self.db.query(Expense.id).filter(Expense.id.in_(ids)).all()}
+        if found:
+            self.db.query(Expense).filter(Expense.id.in_(found)).delete(synchronize_session=False)
+            self.db.commit()
+        
+        missing = [id for id in ids if id not in found]
+        archived = [id for id in missing if archive.archived_years() and self.get_by_id(id) is not None]
+        not_found = [id for id in missing if id not in archived]
+        return sorted(found), not_found, archived
+    
     def delete_by_id(self, id: int) -> bool:
         """
         Delete an expense by ID.
+        Archived expenses are read-only.
         
         Args:
             id: Expense ID
             
         Returns:
             True if deleted, False if not found
+            
+        Raises:
+            ValueError: If the expense is archived
         """
-        return self.delete(id)
+        expense = super().get_by_id(id)
+        if expense is None:
+            if self.get_by_id(id) is not None:
+                raise ValueError(f"Expense {id} is archived and cannot be deleted")
+            return False
+        self.db.delete(expense)
+        self.db.commit()
+        return True
@@ -1,6 +1,6 @@
 """MonthlyBudget repository for database operations"""
 
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, func
 from datetime import datetime
@@ -52,6 +52,30 @@ class MonthlyBudgetRepository(BaseRepository[MonthlyBudget]):
             )
         ).first()
     
+    def get_with_categories_by_month(
+        self,
+        month: str,
+        category_type: Optional[str] = None
+    ) -> List[Tuple[MonthlyBudget, Category]]:
+        """
+        Get monthly budgets for a month together with their categories in one query.
+        
+        Args:
+            month: Month in YYYY-MM format
+            category_type: Optional category type filter (fixed, variable, lifestyle, event)
+            
+        Returns:
+            List of (MonthlyBudget, Category) pairs ordered by budget ID;
+            budgets whose category does not exist are skipped
+        """
+        query = self.db.query(MonthlyBudget, Category).join(
+            Category,
+            MonthlyBudget.category_id == Category.id
+        ).filter(MonthlyBudget.month == month)
+        if category_type is not None:
+            query = query.filter(Category.type == category_type)
+        return query.order_by(MonthlyBudget.id).all()
+    
     def get_by_month_and_type(self, month: str, category_type: str) -> List[MonthlyBudget]:
         """
         Get all monthly budgets for a specific month and category type.
@@ -0,0 +1,32 @@
+"""Anomaly API router"""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.schemas.anomaly import AnomalyReport
+from app.services.anomaly import AnomalyService
+from app.config import settings
+
+router = APIRouter()
+
+
+@router.get("/api/anomalies", response_model=AnomalyReport)
+async def get_anomalies(
+    month: Optional[str] = Query(None, description="Month in YYYY-MM format (default: current month)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get unusual spending days for a month.
+    Each category's daily totals are scored against a trailing rolling median/MAD.
+    
+    Args:
+        month: Optional month in YYYY-MM format
+        db: Database session
+        
+    Returns:
+        Anomaly report with the flagged days
+    """
+    service = AnomalyService(db, timezone=settings.timezone)
+    return service.detect_anomalies(month)
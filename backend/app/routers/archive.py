@@ -0,0 +1,46 @@
+"""Archive admin API router"""
+
+from typing import List
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.dependencies import require_admin
+from app.schemas.archive import ArchivedYear, ArchiveResult
+from app.config import settings
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.post("/api/admin/archive", response_model=ArchiveResult)
+def run_archive(db: Session = Depends(get_db)):
+    """
+    Move expenses of closed years into per-year archive files.
+    Archived months remain readable through the regular expense endpoints.
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        Years moved and hot database size before/after
+    """
+    # Imported on first use to keep the subsystem off the startup path
+    from app.services.archive import ArchiveService
+    service = ArchiveService(db, timezone=settings.timezone)
+    return service.archive_closed_years()
+
+
+@router.get("/api/admin/archive", response_model=List[ArchivedYear])
+def get_archives(db: Session = Depends(get_db)):
+    """
+    List archived years.
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        List of archived years with row counts and file sizes
+    """
+    from app.services.archive import ArchiveService
+    service = ArchiveService(db, timezone=settings.timezone)
+    return service.list_archives()
@@ -0,0 +1,63 @@
+"""Backup admin API router"""
+
+from typing import List
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.dependencies import require_admin
+from app.schemas.backup import BackupInfo, BackupResult, RestoreResult
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.post("/api/admin/backups", response_model=BackupResult, status_code=201)
+def create_backup(db: Session = Depends(get_db)):
+    """
+    Take a compressed online snapshot of the database.
+    Pages are copied in steps so writers are not blocked.
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        Snapshot details with duration and bytes copied
+    """
+    # Imported on first use to keep the subsystem off the startup path
+    from app.services.backup import BackupService
+    service = BackupService(db)
+    return service.create_backup()
+
+
+@router.get("/api/admin/backups", response_model=List[BackupInfo])
+def get_backups(db: Session = Depends(get_db)):
+    """
+    List stored snapshots, newest first.
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        List of snapshots
+    """
+    from app.services.backup import BackupService
+    service = BackupService(db)
+    return service.list_backups()
+
+
+@router.post("/api/admin/backups/{name}/restore", response_model=RestoreResult)
+def restore_backup(name: str, db: Session = Depends(get_db)):
+    """
+    Restore the database from a snapshot.
+    A safety snapshot of the current database is taken first.
+    
+    Args:
+        name: Snapshot file name
+        db: Database session
+        
+    Returns:
+        Restore details with duration and bytes copied
+    """
+    from app.services.backup import BackupService
+    service = BackupService(db)
+    return service.restore_backup(name)
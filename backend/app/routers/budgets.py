@@ -1,10 +1,11 @@
 """Budget API router"""
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.database import get_db
+from app.idempotency import run_idempotent
 from app.schemas.budget import Budget, BudgetCreate
 from app.services.budget import BudgetService
 
@@ -14,21 +15,30 @@ router = APIRouter()
 @router.post("/api/budgets", response_model=Budget, status_code=201)
 async def create_or_update_budget(
     budget_data: BudgetCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db)
 ):
     """
     Register or update a budget.
     If a budget with the same month and category exists, it will be updated.
+    Retries carrying the same Idempotency-Key get the original response back.
     
     Args:
         budget_data: Budget creation data
+        idempotency_key: Optional client-generated key making retries safe
         db: Database session
         
     Returns:
         Created or updated budget
     """
     service = BudgetService(db)
-    return service.register_or_update_budget(budget_data)
+    return run_idempotent(
+        idempotency_key,
+        "POST /api/budgets",
+        budget_data,
+        lambda: service.register_or_update_budget(budget_data),
+        db=db
+    )
 
 
 @router.get("/api/budgets", response_model=List[Budget])
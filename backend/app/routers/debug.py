@@ -0,0 +1,66 @@
+"""Trace viewer router"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.config import settings
+from app.dependencies import require_admin
+from app.tracing import format_waterfall, tracer
+
+
+async def require_tracing() -> None:
+    """
+    Dependency rejecting trace viewer requests unless settings.tracing_enabled is set.
+
+    Raises:
+        HTTPException: 403 if tracing is disabled
+    """
+    if not settings.tracing_enabled:
+        raise HTTPException(status_code=403, detail="Tracing is disabled")
+
+
+router = APIRouter(dependencies=[Depends(require_admin), Depends(require_tracing)])
+
+
+@router.get("/debug/traces")
+async def get_traces(
+    limit: int = Query(20, ge=1, le=500),
+    format: str = Query("json", pattern="^(json|text)$", description="json or text (waterfall)")
+):
+    """
+    Get the most recent traces from the in-memory buffer.
+
+    Args:
+        limit: Number of traces returned
+        format: "json" for spans, "text" for an indented waterfall per trace
+
+    Returns:
+        List of traces with their spans, newest first
+    """
+    traces = tracer.buffer.traces(limit)
+    if format == "text":
+        return PlainTextResponse("\n".join(format_waterfall(trace) for trace in traces))
+    return traces
+
+
+@router.get("/debug/traces/{trace_id}")
+async def get_trace(
+    trace_id: str,
+    format: str = Query("json", pattern="^(json|text)$", description="json or text (waterfall)")
+):
+    """
+    Get one trace from the in-memory buffer.
+
+    Args:
+        trace_id: Trace ID (32 hex characters, as sent in traceparent)
+        format: "json" for spans, "text" for an indented waterfall
+
+    Returns:
+        Trace with its spans
+    """
+    trace = tracer.buffer.trace(trace_id.lower())
+    if trace is None:
+        raise HTTPException(status_code=404, detail=f"Trace not found: {trace_id}")
+    if format == "text":
+        return PlainTextResponse(format_waterfall(trace))
+    return trace
@@ -1,35 +1,55 @@
 """Expense API router"""
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.schemas.expense import Expense, ExpenseCreate
+from app.idempotency import run_idempotent
+from app.schemas.expense import (
+    Expense,
+    ExpenseCreate,
+    ExpenseCreated,
+    ExpensePage,
+    ExpenseBulkDelete,
+    ExpenseBulkDeleteResult
+)
 from app.services.expense import ExpenseService
 from app.config import settings
 
 router = APIRouter()
 
 
-@router.post("/api/expenses", response_model=Expense, status_code=201)
-async def create_expense(
+@router.post("/api/expenses", response_model=ExpenseCreated, status_code=201)
+def create_expense(
     expense_data: ExpenseCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db)
 ):
     """
     Register a new expense.
     The month is automatically derived from the date.
+    Retries carrying the same Idempotency-Key get the original response back.
+    
+    Runs in the threadpool (not on the event loop) so that concurrent
+    requests can wait on the write queue together and share a group commit.
     
     Args:
         expense_data: Expense creation data
+        idempotency_key: Optional client-generated key making retries safe
         db: Database session
         
     Returns:
-        Created expense
+        Created expense, flagged if the amount is unusual for the category
     """
     service = ExpenseService(db, timezone=settings.timezone)
-    return service.register_expense(expense_data)
+    return run_idempotent(
+        idempotency_key,
+        "POST /api/expenses",
+        expense_data,
+        lambda: service.register_expense(expense_data),
+        db=db
+    )
 
 
 @router.get("/api/expenses", response_model=List[Expense])
@@ -63,6 +83,56 @@ async def get_expenses(
     return []
 
 
+@router.get("/api/expenses/page", response_model=ExpensePage)
+async def get_expense_page(
+    month: Optional[str] = Query(None, description="Filter by month (YYYY-MM)"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    sort: Literal["date", "amount", "category", "created_at", "id"] = Query("date", description="Sort column"),
+    order: Literal["asc", "desc"] = Query("desc", description="Sort order"),
+    offset: int = Query(0, ge=0, description="Number of expenses to skip"),
+    limit: int = Query(50, ge=1, le=500, description="Page size"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get one page of expenses, optionally filtered by month and/or category.
+    Lets clients show large months a page at a time instead of loading every expense.
+    
+    Args:
+        month: Optional month filter in YYYY-MM format
+        category: Optional category filter
+        sort: Column to sort by (ties are broken by ID)
+        order: Sort order
+        offset: Number of expenses to skip
+        limit: Page size
+        db: Database session
+        
+    Returns:
+        Expenses of the page and the total number of matching expenses
+    """
+    service = ExpenseService(db, timezone=settings.timezone)
+    return service.get_expense_page(month, category, sort, order == "desc", offset, limit)
+
+
+@router.post("/api/expenses/bulk-delete", response_model=ExpenseBulkDeleteResult)
+async def delete_expenses(
+    request: ExpenseBulkDelete,
+    db: Session = Depends(get_db)
+):
+    """
+    Delete several expenses in one request.
+    Missing IDs are reported instead of failing the request, so a retry is harmless.
+    
+    Args:
+        request: IDs to delete
+        db: Database session
+        
+    Returns:
+        Deleted IDs, IDs not found and archived (read-only) IDs
+    """
+    service = ExpenseService(db, timezone=settings.timezone)
+    return service.delete_expenses(request.ids)
+
+
 @router.get("/api/expenses/{expense_id}", response_model=Expense)
 async def get_expense(
     expense_id: int,
@@ -0,0 +1,60 @@
+"""Import API router"""
+
+import tempfile
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.database import get_db
+from app.schemas.csv_import import ImportReport
+from app.config import settings
+
+router = APIRouter()
+
+
+@router.post("/api/import/csv", response_model=ImportReport)
+async def import_csv(
+    request: Request,
+    profile: str = Query("default", description="Column mapping profile (default, card_jp, bank_jp)"),
+    dry_run: bool = Query(False, description="Validate every row without writing"),
+    encoding: Optional[str] = Query(None, description="Text encoding (default: detect UTF-8 / Shift_JIS)"),
+    default_category: Optional[str] = Query(None, description="Category for rows that no rule matches"),
+    db: Session = Depends(get_db)
+):
+    """
+    Import expenses from a CSV bank or card statement.
+    The request body is the raw CSV file (Content-Type: text/csv).
+    It is streamed to a spooled temporary file and then processed row by row,
+    so large statements are imported with constant memory.
+    
+    Only reading the body runs on the event loop; parsing and the chunked
+    commits run in the threadpool, so other requests are served meanwhile.
+    
+    Args:
+        request: Incoming request carrying the CSV body
+        profile: Column mapping profile name
+        dry_run: If true, nothing is written
+        encoding: Optional text encoding
+        default_category: Optional fallback category
+        db: Database session
+        
+    Returns:
+        Import report with per-row errors
+    """
+    with tempfile.SpooledTemporaryFile(max_size=settings.import_spool_max_bytes) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        
+        # Imported on first use to keep the subsystem off the startup path
+        from app.services.csv_import import CsvImportService
+        service = CsvImportService(db, chunk_size=settings.import_chunk_size)
+        return await run_in_threadpool(
+            service.import_csv,
+            spool,
+            profile=profile,
+            dry_run=dry_run,
+            encoding=encoding,
+            default_category=default_category
+        )
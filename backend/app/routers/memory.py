@@ -0,0 +1,125 @@
+"""Memory introspection admin API router"""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.dependencies import require_admin
+from app.memory import memory_tracker
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+def _not_tracing(e: RuntimeError) -> HTTPException:
+    return HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/api/admin/memory")
+def get_memory_status():
+    """
+    Get process memory state.
+
+    Returns:
+        RSS, tracemalloc state, identity map size of live sessions and GC stats
+    """
+    return memory_tracker.status()
+
+
+@router.post("/api/admin/memory/tracemalloc/start")
+def start_tracemalloc(
+    frames: Optional[int] = Query(None, ge=1, le=100, description="Traceback depth stored per allocation")
+):
+    """
+    Start tracing allocations. Tracing slows allocations down until stopped.
+
+    Args:
+        frames: Traceback depth (default: settings.memory_trace_frames)
+
+    Returns:
+        Process memory state
+    """
+    memory_tracker.start(frames)
+    return memory_tracker.status()
+
+
+@router.post("/api/admin/memory/tracemalloc/stop")
+def stop_tracemalloc():
+    """
+    Stop tracing allocations and drop all snapshots.
+
+    Returns:
+        Process memory state
+    """
+    memory_tracker.stop()
+    return memory_tracker.status()
+
+
+@router.post("/api/admin/memory/snapshots", status_code=201)
+def take_snapshot(name: str = Query(..., min_length=1, max_length=64, description="Snapshot name")):
+    """
+    Take a named snapshot of traced allocations.
+
+    Args:
+        name: Snapshot name (an existing snapshot with the same name is replaced)
+
+    Returns:
+        Snapshot summary
+    """
+    try:
+        return memory_tracker.snapshot(name)
+    except RuntimeError as e:
+        raise _not_tracing(e)
+
+
+@router.get("/api/admin/memory/snapshots")
+def get_snapshots():
+    """
+    List stored snapshots, oldest first.
+
+    Returns:
+        List of snapshot summaries
+    """
+    return memory_tracker.list_snapshots()
+
+
+@router.get("/api/admin/memory/top")
+def get_top_allocations(
+    snapshot: Optional[str] = Query(None, description="Snapshot name (default: current allocations)"),
+    limit: int = Query(20, ge=1, le=500)
+):
+    """
+    Get the allocation sites holding the most memory, grouped by file and line.
+
+    Args:
+        snapshot: Snapshot name, or None for current allocations
+        limit: Number of sites returned
+
+    Returns:
+        List of allocation sites with bytes and block counts
+    """
+    try:
+        return memory_tracker.top(snapshot, limit)
+    except RuntimeError as e:
+        raise _not_tracing(e)
+
+
+@router.get("/api/admin/memory/diff")
+def get_snapshot_diff(
+    base: str = Query(..., description="Older snapshot name"),
+    target: Optional[str] = Query(None, description="Newer snapshot name (default: current allocations)"),
+    limit: int = Query(20, ge=1, le=500)
+):
+    """
+    Compare two snapshots, grouped by file and line, largest growth first.
+
+    Args:
+        base: Older snapshot name
+        target: Newer snapshot name, or None for current allocations
+        limit: Number of sites returned
+
+    Returns:
+        List of allocation sites with their growth since base
+    """
+    try:
+        return memory_tracker.diff(base, target, limit)
+    except RuntimeError as e:
+        raise _not_tracing(e)
@@ -0,0 +1,22 @@
+"""Metrics router"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.metrics import registry
+
+router = APIRouter()
+
+# Content type of the Prometheus text exposition format
+EXPOSITION_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Metrics in Prometheus text exposition format.
+    
+    Returns:
+        Request, database, pool and cache metrics of this process
+    """
+    return PlainTextResponse(registry.render(), media_type=EXPOSITION_CONTENT_TYPE)
@@ -1,10 +1,11 @@
 """Monthly Budget API router"""
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.database import get_db
+from app.idempotency import run_idempotent
 from app.schemas.category import MonthlyBudgetSchema, MonthlyBudgetCreateSchema, MonthlyBudgetDetailSchema
 from app.services.monthly_budget import MonthlyBudgetService
 
@@ -14,21 +15,30 @@ router = APIRouter()
 @router.post("/api/monthly-budgets", response_model=MonthlyBudgetSchema, status_code=201)
 async def create_or_update_monthly_budget(
     budget_data: MonthlyBudgetCreateSchema,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db)
 ):
     """
     Register or update a monthly budget.
     If a budget with the same month and category exists, it will be updated.
+    Retries carrying the same Idempotency-Key get the original response back.
     
     Args:
         budget_data: Monthly budget creation data
+        idempotency_key: Optional client-generated key making retries safe
         db: Database session
         
     Returns:
         Created or updated monthly budget
     """
     service = MonthlyBudgetService(db)
-    return service.register_budget(budget_data)
+    return run_idempotent(
+        idempotency_key,
+        "POST /api/monthly-budgets",
+        budget_data,
+        lambda: service.register_budget(budget_data),
+        db=db
+    )
 
 
 @router.get("/api/monthly-budgets", response_model=List[MonthlyBudgetDetailSchema])
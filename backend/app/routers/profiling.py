@@ -0,0 +1,76 @@
+"""Profiler admin API router"""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.config import settings
+from app.dependencies import require_admin
+from app.profiling import stack_sampler
+
+
+async def require_profiling() -> None:
+    """
+    Dependency rejecting profiler requests unless settings.profiling_enabled is set.
+
+    Raises:
+        HTTPException: 403 if profiling is disabled
+    """
+    if not settings.profiling_enabled:
+        raise HTTPException(status_code=403, detail="Profiling is disabled")
+
+
+router = APIRouter(dependencies=[Depends(require_admin), Depends(require_profiling)])
+
+
+@router.post("/api/admin/profiler/sampler", status_code=202)
+async def start_sampler(
+    seconds: float = Query(30.0, description="Sampling duration in seconds"),
+    interval: Optional[float] = Query(None, description="Seconds between samples")
+):
+    """
+    Start the stack sampler across all requests for a fixed time.
+    The previous profile is discarded.
+
+    Args:
+        seconds: Sampling duration
+        interval: Seconds between samples (default: settings.profiling_sampler_interval)
+
+    Returns:
+        Sampler state
+    """
+    try:
+        stack_sampler.start(seconds, interval)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return stack_sampler.as_dict()
+
+
+@router.delete("/api/admin/profiler/sampler")
+def stop_sampler():
+    """
+    Stop the stack sampler before its time is up.
+
+    Returns:
+        Sampler state with the profile collected so far
+    """
+    stack_sampler.stop()
+    return stack_sampler.as_dict()
+
+
+@router.get("/api/admin/profiler/sampler")
+async def get_sampler_profile(
+    format: str = Query("json", pattern="^(json|collapsed)$", description="json or collapsed")
+):
+    """
+    Get the aggregated profile of the current or last sampler run.
+
+    Args:
+        format: "json" for busiest functions, "collapsed" for flamegraph input
+
+    Returns:
+        Sampler state and top functions, or collapsed stacks as text
+    """
+    if format == "collapsed":
+        return PlainTextResponse(stack_sampler.collapsed())
+    return stack_sampler.as_dict()
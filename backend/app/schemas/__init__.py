@@ -1,7 +1,7 @@
 """Pydantic schemas"""
 
 from app.schemas.budget import Budget, BudgetCreate
-from app.schemas.expense import Expense, ExpenseCreate
+from app.schemas.expense import Expense, ExpenseCreate, ExpenseCreated
 from app.schemas.summary import Summary
 from app.schemas.category import (
     CategorySchema,
@@ -9,15 +9,30 @@ from app.schemas.category import (
     MonthlyBudgetCreateSchema,
     MonthlyBudgetDetailSchema,
 )
+from app.schemas.anomaly import AnomalyCheck, Anomaly, AnomalyReport
+from app.schemas.csv_import import ImportRowError, ImportReport
+from app.schemas.backup import BackupInfo, BackupResult, RestoreResult
+from app.schemas.archive import ArchivedYear, ArchiveResult
 
 __all__ = [
     "Budget",
     "BudgetCreate",
     "Expense",
     "ExpenseCreate",
+    "ExpenseCreated",
     "Summary",
     "CategorySchema",
     "MonthlyBudgetSchema",
     "MonthlyBudgetCreateSchema",
     "MonthlyBudgetDetailSchema",
+    "AnomalyCheck",
+    "Anomaly",
+    "AnomalyReport",
+    "ImportRowError",
+    "ImportReport",
+    "BackupInfo",
+    "BackupResult",
+    "RestoreResult",
+    "ArchivedYear",
+    "ArchiveResult",
 ]
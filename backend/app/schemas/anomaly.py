@@ -0,0 +1,34 @@
+"""Anomaly detection Pydantic schemas"""
+
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class AnomalyCheck(BaseModel):
+    """Schema for the anomaly check of a single expense"""
+    
+    is_anomaly: bool = Field(..., description="True if the amount is unusual for the category")
+    score: Optional[float] = Field(None, description="Robust z-score (None if not enough history)")
+    median: Optional[float] = Field(None, description="Median of the category history")
+    mad: Optional[float] = Field(None, description="Median absolute deviation of the category history")
+    sample_size: int = Field(..., ge=0, description="Number of historical samples used")
+
+
+class Anomaly(BaseModel):
+    """Schema for an unusual spending day in a category"""
+    
+    date: str = Field(..., description="Date in YYYY-MM-DD format")
+    category: str = Field(..., description="Expense category")
+    amount: int = Field(..., description="Total spent in the category on that day in yen")
+    median: float = Field(..., description="Rolling median of the trailing window")
+    mad: float = Field(..., description="Rolling median absolute deviation of the trailing window")
+    score: float = Field(..., description="Robust z-score")
+
+
+class AnomalyReport(BaseModel):
+    """Schema for the anomaly report of a month"""
+    
+    month: str = Field(..., description="Month in YYYY-MM format")
+    window_days: int = Field(..., description="Trailing window size in days")
+    threshold: float = Field(..., description="Robust z-score threshold")
+    anomalies: List[Anomaly] = Field(default_factory=list, description="Flagged days, ordered by date")
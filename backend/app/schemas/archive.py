@@ -0,0 +1,26 @@
+"""Archive Pydantic schemas"""
+
+from typing import List
+from pydantic import BaseModel, Field
+
+
+class ArchivedYear(BaseModel):
+    """Schema for a year stored in cold storage"""
+    
+    year: int = Field(..., description="Archived year")
+    rows: int = Field(..., ge=0, description="Number of expenses in the archive file (or moved in this run)")
+    size_bytes: int = Field(..., ge=0, description="Archive file size in bytes")
+    conflicts: List[int] = Field(
+        default_factory=list,
+        description="IDs left in the hot database because the archive file holds a different expense with the same ID"
+    )
+
+
+class ArchiveResult(BaseModel):
+    """Schema for the result of an archival run"""
+    
+    cutoff_year: int = Field(..., description="Expenses before this year are archived")
+    archived: List[ArchivedYear] = Field(default_factory=list, description="Years moved in this run")
+    duration_seconds: float = Field(..., ge=0, description="Time spent archiving")
+    hot_size_bytes_before: int = Field(..., ge=0, description="Hot database size before archiving")
+    hot_size_bytes_after: int = Field(..., ge=0, description="Hot database size after archiving")
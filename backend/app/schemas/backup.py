@@ -0,0 +1,33 @@
+"""Backup Pydantic schemas"""
+
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class BackupInfo(BaseModel):
+    """Schema for a stored backup snapshot"""
+    
+    name: str = Field(..., description="Snapshot file name")
+    created_at: datetime = Field(..., description="Snapshot creation time")
+    size_bytes: int = Field(..., ge=0, description="Compressed snapshot size in bytes")
+
+
+class BackupResult(BackupInfo):
+    """Schema for the result of taking a backup"""
+    
+    duration_seconds: float = Field(..., ge=0, description="Time spent copying and compressing")
+    pages_copied: int = Field(..., ge=0, description="Database pages copied")
+    bytes_copied: int = Field(..., ge=0, description="Uncompressed bytes copied")
+
+
+class RestoreResult(BaseModel):
+    """Schema for the result of restoring a backup"""
+    
+    name: str = Field(..., description="Restored snapshot file name")
+    duration_seconds: float = Field(..., ge=0, description="Time spent restoring")
+    bytes_copied: int = Field(..., ge=0, description="Uncompressed bytes written to the live database")
+    safety_backup: Optional[str] = Field(None, description="Snapshot of the live database taken before restoring")
+    archived_rows_removed: int = Field(
+        0, ge=0, description="Expenses of the snapshot left out because the archive files hold them"
+    )
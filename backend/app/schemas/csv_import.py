@@ -0,0 +1,23 @@
+"""CSV import Pydantic schemas"""
+
+from typing import List
+from pydantic import BaseModel, Field
+
+
+class ImportRowError(BaseModel):
+    """Schema for an error on a single CSV row"""
+    
+    line: int = Field(..., description="Line number in the CSV file (1-based, header is line 1)")
+    message: str = Field(..., description="Human-readable error message")
+
+
+class ImportReport(BaseModel):
+    """Schema for the result of a CSV import"""
+    
+    profile: str = Field(..., description="Column mapping profile used")
+    dry_run: bool = Field(..., description="True if rows were validated but not written")
+    total_rows: int = Field(..., ge=0, description="Number of data rows read")
+    imported: int = Field(..., ge=0, description="Rows written (or that would be written in dry-run mode)")
+    duplicates: int = Field(..., ge=0, description="Rows skipped because the expense already exists")
+    error_count: int = Field(..., ge=0, description="Number of rows rejected")
+    errors: List[ImportRowError] = Field(default_factory=list, description="Per-row errors (truncated to the first entries)")
@@ -1,7 +1,7 @@
 """Expense Pydantic schemas"""
 
 from datetime import datetime, date as date_type
-from typing import Optional, Any
+from typing import List, Optional, Any
 from pydantic import BaseModel, Field, field_serializer, model_validator
 
 
@@ -46,3 +46,33 @@ class Expense(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class ExpenseCreated(Expense):
+    """Schema for the response of a newly registered expense"""
+    
+    is_anomaly: bool = Field(False, description="True if the amount is unusual for the category")
+    anomaly_score: Optional[float] = Field(None, description="Robust z-score against the category history")
+
+
+class ExpensePage(BaseModel):
+    """Schema for one page of expenses"""
+    
+    items: List[Expense]
+    total: int = Field(..., description="Number of expenses matching the filters")
+    offset: int
+    limit: int
+
+
+class ExpenseBulkDelete(BaseModel):
+    """Schema for deleting several expenses at once"""
+    
+    ids: List[int] = Field(..., min_length=1, max_length=500, description="Expense IDs to delete")
+
+
+class ExpenseBulkDeleteResult(BaseModel):
+    """Schema for the result of a bulk delete"""
+    
+    deleted: List[int] = Field(..., description="IDs that were deleted")
+    not_found: List[int] = Field(..., description="IDs that do not exist")
+    archived: List[int] = Field(..., description="IDs of archived (read-only) expenses that were kept")
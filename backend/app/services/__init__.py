@@ -1,10 +1,28 @@
 """Business logic services"""
 
+from importlib import import_module
+
 from app.services.budget import BudgetService
 from app.services.expense import ExpenseService
 from app.services.summary import SummaryService
 from app.services.category import CategoryService
 from app.services.monthly_budget import MonthlyBudgetService
+from app.services.anomaly import AnomalyService
+
+# Optional subsystems (CSV import, admin) are imported on first use
+# to keep them off the startup path
+_LAZY_SERVICES = {
+    "CsvImportService": "app.services.csv_import",
+    "BackupService": "app.services.backup",
+    "ArchiveService": "app.services.archive",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_SERVICES:
+        return getattr(import_module(_LAZY_SERVICES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "BudgetService",
@@ -12,4 +30,8 @@ __all__ = [
     "SummaryService",
     "CategoryService",
     "MonthlyBudgetService",
+    "AnomalyService",
+    "CsvImportService",
+    "BackupService",
+    "ArchiveService",
 ]
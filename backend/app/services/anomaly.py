@@ -0,0 +1,202 @@
+"""Anomaly service for detecting unusual spending"""
+
+from bisect import bisect_left, insort
+from calendar import monthrange
+from collections import defaultdict, deque
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session
+import pytz
+
+from app.config import settings
+from app.repositories.expense import ExpenseRepository
+from app.schemas.anomaly import Anomaly, AnomalyCheck, AnomalyReport
+from app.models.expense import Expense as ExpenseModel
+
+# Makes the MAD a consistent estimator of the standard deviation for normal data
+MAD_SCALE = 1.4826
+
+# Lower bound for the deviation scale, relative to the median.
+# Perfectly regular spending (subscriptions, fixed costs) has a MAD of 0,
+# which would otherwise turn any change into an infinite score.
+MAD_FLOOR_RATIO = 0.1
+
+
+def _median(sorted_values: Sequence[float]) -> float:
+    """
+    Get the median of an already sorted sequence.
+
+    Args:
+        sorted_values: Non-empty sorted sequence
+
+    Returns:
+        Median value
+    """
+    n = len(sorted_values)
+    mid = n // 2
+    if n % 2:
+        return float(sorted_values[mid])
+    return (sorted_values[mid - 1] + sorted_values[mid]) / 2
+
+
+def robust_score(value: float, sorted_values: Sequence[float]) -> Tuple[float, float, float]:
+    """
+    Score a value against a distribution using the median and MAD.
+    Only spending above the median produces a positive score.
+
+    Args:
+        value: Value to score
+        sorted_values: Non-empty sorted history
+
+    Returns:
+        Tuple of (score, median, mad)
+    """
+    median = _median(sorted_values)
+    mad = _median(sorted(abs(v - median) for v in sorted_values))
+    scale = max(MAD_SCALE * mad, MAD_FLOOR_RATIO * median, 1.0)
+    return (value - median) / scale, median, mad
+
+
+class AnomalyService:
+    """Service for spending anomaly detection"""
+
+    def __init__(
+        self,
+        db: Session,
+        timezone: str = "Asia/Tokyo",
+        window_days: Optional[int] = None,
+        threshold: Optional[float] = None,
+        min_history: Optional[int] = None,
+        history_size: Optional[int] = None
+    ):
+        """
+        Initialize Anomaly service.
+
+        Args:
+            db: Database session
+            timezone: Timezone for date calculations (default: Asia/Tokyo)
+            window_days: Trailing window in days (default: settings.anomaly_window_days)
+            threshold: Robust z-score threshold (default: settings.anomaly_threshold)
+            min_history: Minimum samples before scoring (default: settings.anomaly_min_history)
+            history_size: Recent expenses compared on insert (default: settings.anomaly_history_size)
+        """
+        self.repository = ExpenseRepository(db)
+        self.timezone = pytz.timezone(timezone)
+        self.window_days = window_days if window_days is not None else settings.anomaly_window_days
+        self.threshold = threshold if threshold is not None else settings.anomaly_threshold
+        self.min_history = min_history if min_history is not None else settings.anomaly_min_history
+        self.history_size = history_size if history_size is not None else settings.anomaly_history_size
+
+    def detect_anomalies(self, month: Optional[str] = None) -> AnomalyReport:
+        """
+        Detect unusual spending days in a month.
+
+        Per-category daily totals are loaded with a single grouped query covering
+        the month plus the trailing window, then scored in one pass with a
+        rolling median/MAD over the days that had spending.
+
+        Args:
+            month: Month in YYYY-MM format (default: current month in configured timezone)
+
+        Returns:
+            AnomalyReport with the flagged days
+        """
+        if month is None:
+            month = datetime.now(self.timezone).strftime("%Y-%m")
+
+        year, month_num = map(int, month.split('-'))
+        month_start = date(year, month_num, 1)
+        month_end = date(year, month_num, monthrange(year, month_num)[1])
+        window = timedelta(days=self.window_days)
+
+        series: Dict[str, List[Tuple[date, int]]] = defaultdict(list)
+        for day, category, total in self.repository.get_daily_totals(month_start - window, month_end):
+            series[category].append((day, total))
+
+        anomalies = []
+        for category, points in series.items():
+            anomalies.extend(self._score_series(category, points, month_start))
+
+        anomalies.sort(key=lambda a: (a.date, a.category))
+        return AnomalyReport(
+            month=month,
+            window_days=self.window_days,
+            threshold=self.threshold,
+            anomalies=anomalies
+        )
+
+    def check_expense(self, expense: ExpenseModel) -> AnomalyCheck:
+        """
+        Check a newly registered expense against its category history.
+
+        Only the most recent expenses of the category are read (bounded by
+        history_size), so the check does not rescan the whole history.
+
+        Args:
+            expense: Expense model instance (already persisted)
+
+        Returns:
+            AnomalyCheck result
+        """
+        history = sorted(self.repository.get_recent_amounts(
+            expense.category,
+            limit=self.history_size,
+            exclude_id=expense.id
+        ))
+
+        if len(history) < self.min_history:
+            return AnomalyCheck(is_anomaly=False, sample_size=len(history))
+
+        score, median, mad = robust_score(expense.amount, history)
+        return AnomalyCheck(
+            is_anomaly=score > self.threshold,
+            score=score,
+            median=median,
+            mad=mad,
+            sample_size=len(history)
+        )
+
+    def _score_series(
+        self,
+        category: str,
+        points: List[Tuple[date, int]],
+        month_start: date
+    ) -> List[Anomaly]:
+        """
+        Score a category's daily totals with a trailing rolling median/MAD.
+
+        Args:
+            category: Expense category
+            points: (date, total) pairs ordered by date
+            month_start: First day of the reported month; earlier points only fill the window
+
+        Returns:
+            List of flagged days within the reported month
+        """
+        window = timedelta(days=self.window_days)
+        in_window: deque = deque()
+        sorted_values: List[int] = []
+        flagged = []
+
+        for day, total in points:
+            # Evict days that fell out of the trailing window
+            while in_window and in_window[0][0] < day - window:
+                _, old = in_window.popleft()
+                del sorted_values[bisect_left(sorted_values, old)]
+
+            if day >= month_start and len(sorted_values) >= self.min_history:
+                score, median, mad = robust_score(total, sorted_values)
+                if score > self.threshold:
+                    flagged.append(Anomaly(
+                        date=day.strftime("%Y-%m-%d"),
+                        category=category,
+                        amount=total,
+                        median=median,
+                        mad=mad,
+                        score=score
+                    ))
+
+            in_window.append((day, total))
+            insort(sorted_values, total)
+
+        return flagged
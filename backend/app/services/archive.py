@@ -0,0 +1,192 @@
+"""Archive service for moving closed years to cold storage"""
+
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import List, Optional
+from urllib.parse import quote
+from sqlalchemy.orm import Session
+import pytz
+
+from app import archive
+from app.config import settings
+from app.database import sqlite_database_path
+from app.repositories.expense import ExpenseRepository
+from app.schemas.archive import ArchivedYear, ArchiveResult
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveService:
+    """Service for archiving expenses of closed years into per-year SQLite files"""
+
+    def __init__(
+        self,
+        db: Session,
+        timezone: str = "Asia/Tokyo",
+        archive_dir: Optional[str] = None,
+        keep_years: Optional[int] = None,
+        vacuum: Optional[bool] = None
+    ):
+        """
+        Initialize Archive service.
+
+        Args:
+            db: Database session
+            timezone: Timezone used to determine the current year (default: Asia/Tokyo)
+            archive_dir: Directory for archive files (default: settings.archive_dir)
+            keep_years: Years kept in the hot database besides the current one (default: settings.archive_keep_years)
+            vacuum: VACUUM the hot database after archiving (default: settings.archive_vacuum)
+        """
+        self.db = db
+        self.repository = ExpenseRepository(db)
+        self.database_path = sqlite_database_path(db)
+        self.timezone = pytz.timezone(timezone)
+        self.archive_dir = archive_dir or settings.archive_dir
+        self.keep_years = keep_years if keep_years is not None else settings.archive_keep_years
+        self.vacuum = vacuum if vacuum is not None else settings.archive_vacuum
+
+    def archive_closed_years(self) -> ArchiveResult:
+        """
+        Move expenses of every year before the cutoff into per-year archive files.
+
+        Each year is copied and deleted in a single transaction spanning the hot
+        database and the attached archive file, so a crash never loses or
+        duplicates rows. Years that already have an archive file (e.g. late,
+        back-dated entries) are appended to it.
+
+        Returns:
+            ArchiveResult with the years moved and the hot database size
+
+        Raises:
+            ValueError: If the new archive files would exceed archive.MAX_ATTACHED_ARCHIVES
+        """
+        started = time.perf_counter()
+        cutoff_year = datetime.now(self.timezone).year - self.keep_years
+        size_before = os.path.getsize(self.database_path)
+
+        years = self.repository.get_years_before(cutoff_year)
+        # Release the session's connection so the move is not blocked by it
+        self.db.rollback()
+
+        existing = archive.archived_years(self.archive_dir)
+        new_files = [year for year in years if year not in existing]
+        if len(existing) + len(new_files) > archive.MAX_ATTACHED_ARCHIVES:
+            raise ValueError(
+                f"Archiving {new_files} would exceed {archive.MAX_ATTACHED_ARCHIVES} archive files, "
+                f"the most SQLite can attach to one connection; raise archive_keep_years or "
+                f"merge old archive files first"
+            )
+
+        moved = []
+        if years:
+            os.makedirs(self.archive_dir, exist_ok=True)
+            connection = sqlite3.connect(self.database_path, isolation_level=None)
+            try:
+                for year in years:
+                    moved.append(self._archive_year(connection, year))
+                if self.vacuum:
+                    connection.execute("VACUUM")
+            finally:
+                connection.close()
+
+        result = ArchiveResult(
+            cutoff_year=cutoff_year,
+            archived=moved,
+            duration_seconds=time.perf_counter() - started,
+            hot_size_bytes_before=size_before,
+            hot_size_bytes_after=os.path.getsize(self.database_path)
+        )
+        logger.info(
+            f"Archived years {[m.year for m in moved]} before {cutoff_year} "
+            f"in {result.duration_seconds:.3f}s "
+            f"(hot database {size_before} -> {result.hot_size_bytes_after} bytes)"
+        )
+        return result
+
+    def list_archives(self) -> List[ArchivedYear]:
+        """
+        List archived years with their row counts.
+
+        Returns:
+            List of ArchivedYear ordered by year
+        """
+        result = []
+        for year in archive.archived_years(self.archive_dir):
+            path = archive.archive_path(year, self.archive_dir)
+            connection = sqlite3.connect(f"file:{quote(str(path))}?mode=ro", uri=True)
+            try:
+                rows = connection.execute("SELECT COUNT(*) FROM expenses").fetchone()[0]
+            finally:
+                connection.close()
+            result.append(ArchivedYear(year=year, rows=rows, size_bytes=os.path.getsize(path)))
+        return result
+
+    def _archive_year(self, connection: sqlite3.Connection, year: int) -> ArchivedYear:
+        """
+        Move one year of expenses into its archive file.
+
+        Args:
+            connection: Autocommit connection to the hot database
+            year: Year to archive
+
+        Returns:
+            ArchivedYear with the number of rows moved and the IDs that
+            conflict with different rows already in the archive file
+        """
+        path = archive.archive_path(year, self.archive_dir)
+        connection.execute("ATTACH DATABASE ? AS cold", (str(path),))
+        try:
+            table_sql = connection.execute(
+                "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = 'expenses'"
+            ).fetchone()[0]
+            connection.execute(table_sql.replace("CREATE TABLE expenses", "CREATE TABLE IF NOT EXISTS cold.expenses", 1))
+            connection.execute("CREATE INDEX IF NOT EXISTS cold.ix_expenses_month ON expenses (month)")
+            connection.execute("CREATE INDEX IF NOT EXISTS cold.ix_expenses_category ON expenses (category)")
+            connection.execute("CREATE INDEX IF NOT EXISTS cold.ix_expenses_date ON expenses (date)")
+
+            bounds = (f"{year:04d}-01", f"{year:04d}-12")
+            # A row the archive file already holds unchanged (e.g. after a restored
+            # snapshot or an interrupted run) only needs to be removed from the hot table
+            same_row = archive.same_expense_sql("cold.expenses", "main.expenses")
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    f"INSERT OR IGNORE INTO cold.expenses ({archive.EXPENSE_COLUMNS}) "
+                    f"SELECT {archive.EXPENSE_COLUMNS} FROM main.expenses WHERE month BETWEEN ? AND ?",
+                    bounds
+                )
+                conflicts = [
+                    row[0] for row in connection.execute(
+                        f"SELECT id FROM main.expenses WHERE month BETWEEN ? AND ? "
+                        f"AND NOT EXISTS (SELECT 1 FROM cold.expenses WHERE {same_row}) ORDER BY id",
+                        bounds
+                    )
+                ]
+                # IDs must stay unique across the union view: keep the hot table's
+                # AUTOINCREMENT sequence above every ID in the archive file
+                connection.execute(
+                    "UPDATE main.sqlite_sequence SET seq = MAX(seq, (SELECT COALESCE(MAX(id), 0) FROM cold.expenses)) "
+                    "WHERE name = 'expenses'"
+                )
+                rows = connection.execute(
+                    f"DELETE FROM main.expenses WHERE month BETWEEN ? AND ? "
+                    f"AND EXISTS (SELECT 1 FROM cold.expenses WHERE {same_row})",
+                    bounds
+                ).rowcount
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+        finally:
+            connection.execute("DETACH DATABASE cold")
+
+        logger.info(f"Archived {rows} expenses of {year} to {path}")
+        if conflicts:
+            logger.warning(
+                f"Kept expenses {conflicts} of {year} in the hot database: "
+                f"{path} holds different expenses with the same IDs"
+            )
+        return ArchivedYear(year=year, rows=rows, size_bytes=os.path.getsize(path), conflicts=conflicts)
@@ -0,0 +1,268 @@
+"""Backup service for online SQLite snapshots"""
+
+import gzip
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+from sqlalchemy.orm import Session
+
+from app import archive
+from app.config import settings
+from app.database import sqlite_database_path
+from app.schemas.backup import BackupInfo, BackupResult, RestoreResult
+
+logger = logging.getLogger(__name__)
+
+# Snapshot file names: home_finance-20251225T103000123456.db.gz
+SNAPSHOT_PATTERN = re.compile(r"^home_finance-(\d{8}T\d{12})\.db\.gz$")
+SNAPSHOT_TIME_FORMAT = "%Y%m%dT%H%M%S%f"
+
+
+class BackupService:
+    """Service for taking, listing and restoring database snapshots"""
+
+    def __init__(
+        self,
+        db: Session,
+        backup_dir: Optional[str] = None,
+        keep: Optional[int] = None,
+        pages_per_step: Optional[int] = None,
+        step_sleep: Optional[float] = None,
+        archive_dir: Optional[str] = None
+    ):
+        """
+        Initialize Backup service.
+
+        Args:
+            db: Database session (only used to locate the SQLite file)
+            backup_dir: Directory for snapshots (default: settings.backup_dir)
+            keep: Number of snapshots kept after rotation (default: settings.backup_keep)
+            pages_per_step: Pages copied per backup step (default: settings.backup_pages_per_step)
+            step_sleep: Seconds yielded to writers between steps (default: settings.backup_step_sleep)
+            archive_dir: Directory of the archive files a restore is reconciled with (default: settings.archive_dir)
+        """
+        self.database_path = sqlite_database_path(db)
+        self.backup_dir = Path(backup_dir or settings.backup_dir)
+        self.keep = keep if keep is not None else settings.backup_keep
+        self.pages_per_step = pages_per_step if pages_per_step is not None else settings.backup_pages_per_step
+        self.step_sleep = step_sleep if step_sleep is not None else settings.backup_step_sleep
+        self.archive_dir = archive_dir or settings.archive_dir
+
+    def create_backup(self) -> BackupResult:
+        """
+        Take a compressed snapshot of the live database.
+
+        Uses the SQLite online backup API, copying pages_per_step pages at a time
+        and sleeping between steps so that writers are not blocked for the whole copy.
+        Older snapshots beyond `keep` are deleted afterwards.
+
+        Returns:
+            BackupResult with the snapshot name, duration and bytes copied
+        """
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
+        created_at = datetime.now()
+        name = f"home_finance-{created_at.strftime(SNAPSHOT_TIME_FORMAT)}.db.gz"
+        tmp_path = self.backup_dir / f".{name}.tmp"
+
+        progress = {"total": 0}
+
+        def on_progress(status: int, remaining: int, total: int) -> None:
+            progress["total"] = total
+
+        try:
+            source = sqlite3.connect(self.database_path)
+            target = sqlite3.connect(tmp_path)
+            try:
+                page_size = source.execute("PRAGMA page_size").fetchone()[0]
+                source.backup(
+                    target,
+                    pages=self.pages_per_step,
+                    progress=on_progress,
+                    sleep=self.step_sleep
+                )
+            finally:
+                target.close()
+                source.close()
+
+            final_path = self.backup_dir / name
+            with open(tmp_path, "rb") as raw, gzip.open(final_path, "wb") as compressed:
+                shutil.copyfileobj(raw, compressed)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+        self._rotate()
+
+        duration = time.perf_counter() - started
+        result = BackupResult(
+            name=name,
+            created_at=created_at,
+            size_bytes=final_path.stat().st_size,
+            duration_seconds=duration,
+            pages_copied=progress["total"],
+            bytes_copied=progress["total"] * page_size
+        )
+        logger.info(
+            f"Backup {name} created: {result.bytes_copied} bytes copied "
+            f"in {duration:.3f}s ({result.size_bytes} bytes compressed)"
+        )
+        return result
+
+    def list_backups(self) -> List[BackupInfo]:
+        """
+        List stored snapshots, newest first.
+
+        Returns:
+            List of BackupInfo
+        """
+        if not self.backup_dir.is_dir():
+            return []
+
+        backups = []
+        for entry in os.scandir(self.backup_dir):
+            match = SNAPSHOT_PATTERN.match(entry.name)
+            if match and entry.is_file():
+                backups.append(BackupInfo(
+                    name=entry.name,
+                    created_at=datetime.strptime(match.group(1), SNAPSHOT_TIME_FORMAT),
+                    size_bytes=entry.stat().st_size
+                ))
+        backups.sort(key=lambda b: b.created_at, reverse=True)
+        return backups
+
+    def restore_backup(self, name: str) -> RestoreResult:
+        """
+        Restore the live database from a snapshot.
+
+        The snapshot is decompressed and integrity-checked first, a safety
+        snapshot of the current database is taken, and the content is then
+        copied into the live database with the online backup API in a single
+        step so readers never observe a half-restored database.
+
+        Snapshots only hold the hot database. Expenses of a snapshot taken
+        before an archive run that the archive files now hold are removed from
+        the restored content, so the union view does not count them twice and
+        the next archive run does not meet them again.
+
+        Args:
+            name: Snapshot file name (as returned by list_backups)
+
+        Returns:
+            RestoreResult with the duration and bytes copied
+
+        Raises:
+            ValueError: If the snapshot does not exist, is corrupt, or holds
+                expenses whose IDs belong to different archived expenses
+        """
+        if not SNAPSHOT_PATTERN.match(name) or not (self.backup_dir / name).is_file():
+            raise ValueError(f"Backup {name} not found")
+
+        started = time.perf_counter()
+        tmp_path = self.backup_dir / f".restore-{name}.tmp"
+        try:
+            with gzip.open(self.backup_dir / name, "rb") as compressed, open(tmp_path, "wb") as raw:
+                shutil.copyfileobj(compressed, raw)
+
+            source = sqlite3.connect(tmp_path)
+            try:
+                try:
+                    check = source.execute("PRAGMA integrity_check").fetchone()[0]
+                except sqlite3.DatabaseError as e:
+                    raise ValueError(f"Backup {name} is not a valid database: {e}")
+                if check != "ok":
+                    raise ValueError(f"Backup {name} failed integrity check: {check}")
+
+                archived_rows_removed = self._reconcile_with_archives(source, name)
+                safety = self.create_backup()
+
+                page_count = source.execute("PRAGMA page_count").fetchone()[0]
+                page_size = source.execute("PRAGMA page_size").fetchone()[0]
+                target = sqlite3.connect(self.database_path)
+                try:
+                    source.backup(target, pages=-1)
+                finally:
+                    target.close()
+            finally:
+                source.close()
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+        duration = time.perf_counter() - started
+        logger.info(f"Backup {name} restored in {duration:.3f}s (safety snapshot: {safety.name})")
+        return RestoreResult(
+            name=name,
+            duration_seconds=duration,
+            bytes_copied=page_count * page_size,
+            safety_backup=safety.name,
+            archived_rows_removed=archived_rows_removed
+        )
+
+    def _reconcile_with_archives(self, connection: sqlite3.Connection, name: str) -> int:
+        """
+        Remove expenses the archive files hold from a decompressed snapshot.
+
+        Also moves the snapshot's AUTOINCREMENT sequence above the archived IDs,
+        which may have been handed out after the snapshot was taken.
+
+        Args:
+            connection: Connection to the decompressed snapshot
+            name: Snapshot file name (for error messages)
+
+        Returns:
+            Number of expenses removed
+
+        Raises:
+            ValueError: If the snapshot holds a different expense with an archived ID
+        """
+        removed = 0
+        has_sequence = connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_sequence'"
+        ).fetchone() is not None
+        for year in archive.archived_years(self.archive_dir):
+            connection.execute("ATTACH DATABASE ? AS cold", (str(archive.archive_path(year, self.archive_dir)),))
+            try:
+                conflicts = [
+                    row[0] for row in connection.execute(
+                        "SELECT id FROM main.expenses "
+                        "WHERE EXISTS (SELECT 1 FROM cold.expenses WHERE cold.expenses.id = main.expenses.id) "
+                        f"AND NOT EXISTS (SELECT 1 FROM cold.expenses WHERE "
+                        f"{archive.same_expense_sql('cold.expenses', 'main.expenses')}) ORDER BY id"
+                    )
+                ]
+                if conflicts:
+                    raise ValueError(
+                        f"Backup {name} holds expenses {conflicts} whose IDs belong to "
+                        f"different archived expenses of {year}"
+                    )
+                removed += connection.execute(
+                    "DELETE FROM main.expenses WHERE EXISTS (SELECT 1 FROM cold.expenses WHERE "
+                    f"{archive.same_expense_sql('cold.expenses', 'main.expenses')})"
+                ).rowcount
+                if has_sequence:
+                    connection.execute(
+                        "UPDATE main.sqlite_sequence SET seq = MAX(seq, (SELECT COALESCE(MAX(id), 0) FROM cold.expenses)) "
+                        "WHERE name = 'expenses'"
+                    )
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            finally:
+                connection.execute("DETACH DATABASE cold")
+        if removed:
+            logger.info(f"Removed {removed} expenses of backup {name} that are held by archive files")
+        return removed
+
+    def _rotate(self) -> None:
+        """Delete the oldest snapshots beyond `keep`"""
+        for backup in self.list_backups()[self.keep:]:
+            (self.backup_dir / backup.name).unlink()
+            logger.info(f"Backup {backup.name} removed by rotation")
@@ -0,0 +1,384 @@
+"""CSV import service for bank and card statements"""
+
+import codecs
+import csv
+import io
+import unicodedata
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, TextIO, Tuple
+from sqlalchemy.orm import Session
+
+from app.repositories.expense import ExpenseRepository
+from app.repositories.category import CategoryRepository
+from app.schemas.csv_import import ImportReport, ImportRowError
+
+# A parsed row travelling through the pipeline: (line number, fields)
+Row = Tuple[int, Dict[str, Any]]
+
+
+class CsvImportService:
+    """Service for streaming CSV statement imports"""
+
+    # Column mapping profiles.
+    # Each field lists the accepted header names; date and amount are required.
+    PROFILES = {
+        "default": {
+            "date": ["date", "日付"],
+            "amount": ["amount", "金額"],
+            "category": ["category", "カテゴリ"],
+            "memo": ["memo", "メモ"],
+            "date_formats": ["%Y-%m-%d", "%Y/%m/%d"],
+        },
+        "card_jp": {
+            "date": ["利用日", "ご利用日"],
+            "amount": ["利用金額", "ご利用金額", "支払金額"],
+            "category": [],
+            "memo": ["利用店名・商品名", "ご利用店名", "利用店名", "摘要"],
+            "date_formats": ["%Y/%m/%d", "%Y-%m-%d", "%Y年%m月%d日"],
+        },
+        "bank_jp": {
+            "date": ["取引日", "日付"],
+            "amount": ["お引出し", "出金金額", "支払"],
+            "category": [],
+            "memo": ["摘要", "内容", "お取引内容"],
+            "date_formats": ["%Y/%m/%d", "%Y-%m-%d", "%Y年%m月%d日"],
+        },
+    }
+
+    # Keyword rules applied to the memo when a row has no category.
+    # The memo is NFKC-normalized (full-width letters become ASCII) and the
+    # first matching keyword wins (case-insensitive).
+    CATEGORY_RULES = [
+        ("電力", "utilities"),
+        ("ガス", "utilities"),
+        ("水道", "utilities"),
+        ("ドコモ", "communication"),
+        ("ソフトバンク", "communication"),
+        ("KDDI", "communication"),
+        ("楽天モバイル", "communication"),
+        ("保険", "insurance"),
+        ("住民税", "taxes"),
+        ("固定資産税", "taxes"),
+        ("自動車税", "taxes"),
+        ("スーパー", "food"),
+        ("コンビニ", "food"),
+        ("セブン", "food"),
+        ("ローソン", "food"),
+        ("ファミリーマート", "food"),
+        ("イオン", "food"),
+        ("ドラッグ", "daily_goods"),
+        ("ニトリ", "daily_goods"),
+        ("JR", "transportation"),
+        ("ETC", "transportation"),
+        ("ENEOS", "transportation"),
+        ("ガソリン", "transportation"),
+        ("病院", "medical"),
+        ("クリニック", "medical"),
+        ("薬局", "medical"),
+        ("NETFLIX", "entertainment"),
+        ("SPOTIFY", "entertainment"),
+        ("ユニクロ", "clothing"),
+    ]
+
+    # Maximum number of per-row errors returned in the report
+    MAX_REPORTED_ERRORS = 1000
+
+    # Largest amount SQLite can store in an INTEGER column (int64)
+    MAX_AMOUNT = 2 ** 63 - 1
+
+    def __init__(self, db: Session, chunk_size: int = 500):
+        """
+        Initialize CSV import service.
+
+        Args:
+            db: Database session
+            chunk_size: Number of rows written per executemany commit
+        """
+        self.repository = ExpenseRepository(db)
+        self.category_repository = CategoryRepository(db)
+        self.chunk_size = chunk_size
+
+    def import_csv(
+        self,
+        stream: BinaryIO,
+        profile: str = "default",
+        dry_run: bool = False,
+        encoding: Optional[str] = None,
+        default_category: Optional[str] = None
+    ) -> ImportReport:
+        """
+        Import expenses from a CSV statement.
+
+        The file is streamed through a pipeline of generators
+        (decode -> column mapping -> parsing -> categorization -> chunking -> dedup),
+        so memory use does not depend on the size of the file.
+        Each chunk is written with a single executemany and committed.
+
+        Args:
+            stream: Binary file object positioned at the start of the CSV
+            profile: Column mapping profile name (see PROFILES)
+            dry_run: If True, validate every row without writing
+            encoding: Text encoding (default: detected, UTF-8 or Shift_JIS)
+            default_category: Category for rows that no rule matches
+
+        Returns:
+            ImportReport with counters and per-row errors
+
+        Raises:
+            ValueError: If the profile, default category or header is invalid
+        """
+        if profile not in self.PROFILES:
+            raise ValueError(f"Unknown import profile: {profile}")
+        mapping = self.PROFILES[profile]
+
+        categories = self._load_category_lookup()
+        if default_category is not None:
+            if default_category not in categories:
+                raise ValueError(f"Unknown default category: {default_category}")
+            default_category = categories[default_category]
+
+        report = ImportReport(
+            profile=profile,
+            dry_run=dry_run,
+            total_rows=0,
+            imported=0,
+            duplicates=0,
+            error_count=0
+        )
+
+        rows = self._read_rows(self._decode(stream, encoding), report)
+        rows = self._map_columns(rows, mapping)
+        rows = self._parse(rows, mapping, report)
+        rows = self._categorize(rows, categories, default_category, report)
+
+        for chunk in self._dedup(self._chunk(rows), report):
+            if not dry_run:
+                self.repository.bulk_create(chunk)
+            report.imported += len(chunk)
+
+        return report
+
+    # Pipeline stages
+
+    def _decode(self, stream: BinaryIO, encoding: Optional[str]) -> TextIO:
+        """
+        Wrap the binary stream in a text stream.
+        Without an explicit encoding, a UTF-8 BOM selects utf-8-sig, valid UTF-8
+        in the first 64 KiB selects utf-8, and anything else falls back to cp932
+        (Shift_JIS, used by most Japanese bank exports).
+        """
+        if encoding is None:
+            head = stream.read(65536)
+            stream.seek(0)
+            if head.startswith(codecs.BOM_UTF8):
+                encoding = "utf-8-sig"
+            else:
+                try:
+                    codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+                    encoding = "utf-8"
+                except UnicodeDecodeError:
+                    encoding = "cp932"
+        else:
+            try:
+                codecs.lookup(encoding)
+            except LookupError:
+                raise ValueError(f"Unknown encoding: {encoding}")
+        return io.TextIOWrapper(stream, encoding=encoding, errors="replace", newline="")
+
+    def _read_rows(self, text: TextIO, report: ImportReport) -> Iterator[Tuple[int, List[str]]]:
+        """Yield (line number, cells) for every non-blank row, header included"""
+        reader = csv.reader(text)
+        is_header = True
+        for cells in reader:
+            if not any(cell.strip() for cell in cells):
+                continue
+            if not is_header:
+                report.total_rows += 1
+            is_header = False
+            yield reader.line_num, cells
+
+    def _map_columns(
+        self,
+        rows: Iterator[Tuple[int, List[str]]],
+        mapping: Dict[str, Any]
+    ) -> Iterator[Row]:
+        """Resolve the header against the profile and yield rows keyed by field name"""
+        try:
+            _, header = next(rows)
+        except StopIteration:
+            raise ValueError("CSV file is empty")
+
+        header = [name.strip() for name in header]
+        indices = {}
+        for field in ("date", "amount", "category", "memo"):
+            for candidate in mapping[field]:
+                if candidate in header:
+                    indices[field] = header.index(candidate)
+                    break
+
+        missing = [field for field in ("date", "amount") if field not in indices]
+        if missing:
+            raise ValueError(f"CSV header is missing required columns: {', '.join(missing)}")
+
+        for line, cells in rows:
+            yield line, {
+                field: cells[index].strip() if index < len(cells) else ""
+                for field, index in indices.items()
+            }
+
+    def _parse(
+        self,
+        rows: Iterator[Row],
+        mapping: Dict[str, Any],
+        report: ImportReport
+    ) -> Iterator[Row]:
+        """Parse dates and amounts, rejecting rows that cannot be parsed"""
+        date_formats = mapping["date_formats"]
+        for line, fields in rows:
+            expense_date = self._parse_date(fields["date"], date_formats)
+            if expense_date is None:
+                self._reject(report, line, f"Invalid date: {fields['date']!r}")
+                continue
+
+            amount = self._parse_amount(fields["amount"])
+            if amount is None:
+                self._reject(report, line, f"Invalid amount: {fields['amount']!r}")
+                continue
+            if amount < 0:
+                self._reject(report, line, f"Negative amounts (refunds) are not supported: {fields['amount']!r}")
+                continue
+            if amount > self.MAX_AMOUNT:
+                self._reject(report, line, f"Amount out of range: {fields['amount']!r}")
+                continue
+
+            yield line, {
+                "date": expense_date,
+                "amount": amount,
+                "category": fields.get("category") or None,
+                "memo": fields.get("memo") or None,
+            }
+
+    def _categorize(
+        self,
+        rows: Iterator[Row],
+        categories: Dict[str, str],
+        default_category: Optional[str],
+        report: ImportReport
+    ) -> Iterator[Row]:
+        """Resolve the category from the category column, the keyword rules or the default"""
+        for line, fields in rows:
+            value = fields["category"]
+            if value is not None:
+                category = categories.get(value)
+                if category is None:
+                    self._reject(report, line, f"Unknown category: {value!r}")
+                    continue
+            else:
+                category = self._match_rule(fields["memo"]) or default_category
+                if category is None:
+                    self._reject(report, line, "Category could not be determined (no rule matched the memo)")
+                    continue
+
+            fields["category"] = category
+            yield line, fields
+
+    def _chunk(self, rows: Iterator[Row]) -> Iterator[List[Row]]:
+        """Group rows into lists of chunk_size"""
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _dedup(self, chunks: Iterator[List[Row]], report: ImportReport) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Drop rows that already exist and yield insertable dictionaries.
+
+        A row is identified by (date, amount, memo). Counts are compared rather
+        than mere presence, so a statement with two identical purchases on the
+        same day imports both the first time and neither on re-import.
+        Existing counts are loaded once per date, before any row of that date
+        is written, with one query per chunk.
+        """
+        existing: Dict[Tuple[date, int, str], int] = {}
+        loaded_dates = set()
+        seen: Dict[Tuple[date, int, str], int] = defaultdict(int)
+
+        for chunk in chunks:
+            new_dates = {fields["date"] for _, fields in chunk} - loaded_dates
+            if new_dates:
+                existing.update(self.repository.count_by_dates(new_dates))
+                loaded_dates |= new_dates
+
+            insertable = []
+            for _, fields in chunk:
+                key = (fields["date"], fields["amount"], fields["memo"] or "")
+                seen[key] += 1
+                if seen[key] <= existing.get(key, 0):
+                    report.duplicates += 1
+                    continue
+                insertable.append({
+                    "date": fields["date"],
+                    "month": fields["date"].strftime("%Y-%m"),
+                    "category": fields["category"],
+                    "amount": fields["amount"],
+                    "memo": fields["memo"],
+                })
+
+            if insertable:
+                yield insertable
+
+    # Helpers
+
+    def _load_category_lookup(self) -> Dict[str, str]:
+        """Map both category IDs and display names to category IDs"""
+        lookup = {}
+        for category in self.category_repository.get_all():
+            lookup[category.id] = category.id
+            lookup[category.name] = category.id
+        return lookup
+
+    def _match_rule(self, memo: Optional[str]) -> Optional[str]:
+        """Return the category of the first keyword rule found in the memo"""
+        if not memo:
+            return None
+        memo_upper = unicodedata.normalize("NFKC", memo).upper()
+        for keyword, category in self.CATEGORY_RULES:
+            if keyword.upper() in memo_upper:
+                return category
+        return None
+
+    def _parse_date(self, value: str, date_formats: List[str]) -> Optional[date]:
+        """Parse a date with the first matching format"""
+        for date_format in date_formats:
+            try:
+                return datetime.strptime(value, date_format).date()
+            except ValueError:
+                continue
+        return None
+
+    def _parse_amount(self, value: str) -> Optional[int]:
+        """Parse a yen amount such as '¥1,234', '1234円' or '-500'"""
+        cleaned = value
+        for symbol in ("¥", "￥", "円", ",", " ", "　"):
+            cleaned = cleaned.replace(symbol, "")
+        if not cleaned:
+            return None
+        try:
+            amount = Decimal(cleaned)
+        except InvalidOperation:
+            return None
+        if not amount.is_finite() or amount != amount.to_integral_value():
+            return None
+        return int(amount)
+
+    def _reject(self, report: ImportReport, line: int, message: str) -> None:
+        """Record a rejected row, keeping at most MAX_REPORTED_ERRORS messages"""
+        report.error_count += 1
+        if len(report.errors) < self.MAX_REPORTED_ERRORS:
+            report.errors.append(ImportRowError(line=line, message=message))
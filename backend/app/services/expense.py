@@ -6,8 +6,9 @@ from sqlalchemy.orm import Session
 import pytz
 
 from app.repositories.expense import ExpenseRepository
-from app.schemas.expense import Expense, ExpenseCreate
+from app.schemas.expense import Expense, ExpenseCreate, ExpenseCreated, ExpensePage, ExpenseBulkDeleteResult
 from app.models.expense import Expense as ExpenseModel
+from app.services.anomaly import AnomalyService
 
 
 class ExpenseService:
@@ -22,18 +23,20 @@ class ExpenseService:
             timezone: Timezone for date processing (default: Asia/Tokyo)
         """
         self.repository = ExpenseRepository(db)
+        self.anomaly_service = AnomalyService(db, timezone=timezone)
         self.timezone = pytz.timezone(timezone)
     
-    def register_expense(self, expense_data: ExpenseCreate) -> Expense:
+    def register_expense(self, expense_data: ExpenseCreate) -> ExpenseCreated:
         """
         Register a new expense with timezone-aware processing.
-        The month is automatically derived from the date.
+        The month is automatically derived from the date, and the amount
+        is checked against the category's recent history.
         
         Args:
             expense_data: Expense creation data
             
         Returns:
-            Created Expense schema
+            Created Expense schema with the anomaly flag
         """
         # Convert string date to date object
         if isinstance(expense_data.date, str):
@@ -47,7 +50,12 @@ class ExpenseService:
             amount=expense_data.amount,
             memo=expense_data.memo
         )
-        return Expense.model_validate(expense_model)
+        check = self.anomaly_service.check_expense(expense_model)
+        return ExpenseCreated(
+            **Expense.model_validate(expense_model).model_dump(),
+            is_anomaly=check.is_anomaly,
+            anomaly_score=check.score
+        )
     
     def get_expense_by_id(self, expense_id: int) -> Optional[Expense]:
         """
@@ -106,6 +114,50 @@ class ExpenseService:
         expense_models = self.repository.get_by_month_and_category(month, category)
         return [Expense.model_validate(model) for model in expense_models]
     
+    def get_expense_page(
+        self,
+        month: Optional[str] = None,
+        category: Optional[str] = None,
+        sort: str = "date",
+        descending: bool = True,
+        offset: int = 0,
+        limit: int = 50
+    ) -> ExpensePage:
+        """
+        Get one page of expenses, optionally filtered by month and/or category.
+        
+        Args:
+            month: Optional month filter in YYYY-MM format
+            category: Optional category filter
+            sort: Column to sort by (date, amount, category, created_at or id)
+            descending: Sort in descending order
+            offset: Number of expenses to skip
+            limit: Maximum number of expenses to return
+            
+        Returns:
+            ExpensePage schema with the expenses and the total number of matches
+        """
+        expense_models, total = self.repository.get_page(month, category, sort, descending, offset, limit)
+        return ExpensePage(
+            items=[Expense.model_validate(model) for model in expense_models],
+            total=total,
+            offset=offset,
+            limit=limit
+        )
+    
+    def delete_expenses(self, expense_ids: List[int]) -> ExpenseBulkDeleteResult:
+        """
+        Delete several expenses at once.
+        
+        Args:
+            expense_ids: Expense IDs
+            
+        Returns:
+            ExpenseBulkDeleteResult schema with the deleted, missing and archived IDs
+        """
+        deleted, not_found, archived = self.repository.delete_by_ids(expense_ids)
+        return ExpenseBulkDeleteResult(deleted=deleted, not_found=not_found, archived=archived)
+    
     def delete_expense(self, expense_id: int) -> bool:
         """
         Delete an expense by ID.
@@ -71,22 +71,17 @@ class MonthlyBudgetService:
         Returns:
             List of MonthlyBudgetDetailSchema instances
         """
-        budget_models = self.repository.get_by_month(month)
-        
-        result = []
-        for budget in budget_models:
-            category = self.category_repository.get_by_id(budget.category_id)
-            if category:
-                detail = MonthlyBudgetDetailSchema(
-                    id=budget.id,
-                    category_id=budget.category_id,
-                    category_name=category.name,
-                    category_type=category.type,
-                    amount=budget.amount
-                )
-                result.append(detail)
-        
-        return result
+        rows = self.repository.get_with_categories_by_month(month)
+        return [
+            MonthlyBudgetDetailSchema(
+                id=budget.id,
+                category_id=budget.category_id,
+                category_name=category.name,
+                category_type=category.type,
+                amount=budget.amount
+            )
+            for budget, category in rows
+        ]
     
     def get_budgets_by_month_and_type(
         self, month: str, category_type: str
@@ -101,22 +96,17 @@ class MonthlyBudgetService:
         Returns:
             List of MonthlyBudgetDetailSchema instances
         """
-        budget_models = self.repository.get_by_month_and_type(month, category_type)
-        
-        result = []
-        for budget in budget_models:
-            category = self.category_repository.get_by_id(budget.category_id)
-            if category:
-                detail = MonthlyBudgetDetailSchema(
-                    id=budget.id,
-                    category_id=budget.category_id,
-                    category_name=category.name,
-                    category_type=category.type,
-                    amount=budget.amount
-                )
-                result.append(detail)
-        
-        return result
+        rows = self.repository.get_with_categories_by_month(month, category_type)
+        return [
+            MonthlyBudgetDetailSchema(
+                id=budget.id,
+                category_id=budget.category_id,
+                category_name=category.name,
+                category_type=category.type,
+                amount=budget.amount
+            )
+            for budget, category in rows
+        ]
     
     def get_budget_total(self, month: str) -> int:
         """
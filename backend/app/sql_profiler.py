@@ -0,0 +1,231 @@
+"""Opt-in per-request SQL profiler with Server-Timing headers and N+1 detection"""
+
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def normalize_statement(statement: str) -> str:
+    """
+    Reduce a SQL statement to its shape.
+    Literals become ?, expanded IN lists become (?...) and whitespace is collapsed,
+    so the same query with different parameters maps to the same text.
+
+    Args:
+        statement: SQL statement as sent to the driver
+
+    Returns:
+        Normalized statement text
+    """
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PARAMETER_LIST.sub("(?...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class StatementStats:
+    """Repeat count and timings of one statement shape"""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class QueryProfile:
+    """Statements executed during one request (or one capture block)"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements: Dict[str, StatementStats] = {}
+        self.count = 0
+        self.duration = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, duration: float) -> None:
+        """
+        Record an executed statement.
+
+        Args:
+            statement: SQL statement text
+            duration: Execution time in seconds
+        """
+        shape = normalize_statement(statement)
+        with self._lock:
+            stats = self.statements.get(shape)
+            if stats is None:
+                stats = self.statements[shape] = StatementStats()
+            stats.count += 1
+            stats.total += duration
+            stats.max = max(stats.max, duration)
+            self.count += 1
+            self.duration += duration
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """
+        Get statement shapes executed more than threshold times (likely N+1 queries).
+
+        Args:
+            threshold: Maximum acceptable repeat count
+
+        Returns:
+            Dictionary with shape as key and repeat count as value
+        """
+        return {shape: stats.count for shape, stats in self.statements.items() if stats.count > threshold}
+
+    def slowest(self, limit: int = 5) -> List[Dict[str, object]]:
+        """
+        Get the statement shapes with the largest total time.
+
+        Args:
+            limit: Number of shapes returned
+
+        Returns:
+            List of dictionaries with the statement and its stats
+        """
+        ranked = sorted(self.statements.items(), key=lambda item: item[1].total, reverse=True)
+        return [{"statement": shape, **stats.as_dict()} for shape, stats in ranked[:limit]]
+
+    def report(self) -> str:
+        """Human-readable list of statement shapes, most repeated first"""
+        ranked = sorted(self.statements.items(), key=lambda item: item[1].count, reverse=True)
+        return "\n".join(f"{stats.count:>4}x {stats.total * 1000:8.2f} ms  {shape}" for shape, stats in ranked)
+
+
+# Profile of the request being served
+current_profile: ContextVar[Optional[QueryProfile]] = ContextVar("current_query_profile", default=None)
+
+# Profiles capturing statements from every thread (used by tests)
+_global_profiles: List[QueryProfile] = []
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryProfile]:
+    """
+    Record every statement executed by any engine, in any thread, inside the block.
+
+    Yields:
+        QueryProfile filled while the block runs
+    """
+    profile = QueryProfile()
+    _global_profiles.append(profile)
+    try:
+        yield profile
+    finally:
+        _global_profiles.remove(profile)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_profile.get() is not None or _global_profiles:
+        conn.info.setdefault("profiler_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile.get()
+    if profile is None and not _global_profiles:
+        return
+    starts = conn.info.get("profiler_query_start")
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    if profile is not None:
+        profile.record(statement, duration)
+    for captured in list(_global_profiles):
+        captured.record(statement, duration)
+
+
+def _handle_error(exception_context):
+    starts = exception_context.connection.info.get("profiler_query_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def install_statement_listeners() -> None:
+    """Listen to statement events of every engine (idempotent; cheap when no profile is active)"""
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+
+
+class SqlProfilerMiddleware:
+    """
+    ASGI middleware profiling the SQL of each request when settings.sql_profiler_enabled is set.
+
+    Adds a Server-Timing header (db and app durations), logs requests slower
+    than settings.sql_profiler_slow_request_ms with their costliest statements,
+    and warns when a statement shape repeats more than
+    settings.sql_profiler_repeat_threshold times in one request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.sql_profiler_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = current_profile.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                elapsed = time.perf_counter() - profile.started
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={profile.duration * 1000:.2f};desc="{profile.count} queries", '
+                    f"app;dur={elapsed * 1000:.2f}"
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile.reset(token)
+            self._report(scope, profile)
+
+    def _report(self, scope, profile: QueryProfile) -> None:
+        """Log slow requests and repeated statements"""
+        request = f"{scope['method']} {scope['path']}"
+        elapsed_ms = (time.perf_counter() - profile.started) * 1000
+
+        for shape, count in profile.repeated(settings.sql_profiler_repeat_threshold).items():
+            logger.warning(f"Possible N+1 in {request}: statement executed {count} times: {shape}")
+
+        if elapsed_ms > settings.sql_profiler_slow_request_ms:
+            logger.warning(
+                f"Slow request {request}: {elapsed_ms:.1f} ms, "
+                f"{profile.duration * 1000:.1f} ms in {profile.count} queries; "
+                f"slowest statements: {profile.slowest(3)}"
+            )
@@ -0,0 +1,65 @@
+"""Startup profile: import and per-phase timings logged as JSON"""
+
+import json
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfile:
+    """Collects named startup phase durations and logs them as one JSON line"""
+
+    def __init__(self):
+        """Initialize an empty profile"""
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Time a startup phase.
+
+        Args:
+            name: Phase name (repeated names accumulate)
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float) -> None:
+        """
+        Record the duration of a phase measured elsewhere.
+
+        Args:
+            name: Phase name (repeated names accumulate)
+            seconds: Duration in seconds
+        """
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Get the profile as a dictionary.
+
+        Returns:
+            Dictionary with per-phase and total milliseconds and the number of loaded modules
+        """
+        return {
+            "event": "startup_profile",
+            "phases_ms": {name: round(seconds * 1000, 2) for name, seconds in self.phases.items()},
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "modules_loaded": len(sys.modules),
+        }
+
+    def log(self) -> None:
+        """Log the profile as a single JSON line"""
+        logger.info(json.dumps(self.as_dict()))
+
+
+# Global profile of the running process, started when app.main begins importing
+startup_profile = StartupProfile()
@@ -0,0 +1,418 @@
+"""Lightweight W3C trace-context tracing with an in-process ring buffer and optional JSONL export"""
+
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from app.config import settings
+from app.sql_profiler import normalize_statement
+
+logger = logging.getLogger(__name__)
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+# Longest db.statement attribute kept on a span
+MAX_STATEMENT_LENGTH = 500
+
+# Paths never traced (the viewer itself)
+UNTRACED_PREFIXES = ("/debug/traces",)
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    Parse a W3C traceparent header.
+
+    Args:
+        header: Header value ("00-<trace id>-<parent span id>-<flags>")
+
+    Returns:
+        Tuple of (trace id, parent span id), or None if the header is missing or invalid
+    """
+    if not header:
+        return None
+    match = _TRACEPARENT.match(header.strip().lower())
+    if match is None or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2)
+
+
+class Span:
+    """One timed operation of a trace"""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start_time", "_started", "duration", "status", "attributes")
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: Optional[str] = None,
+        parent_id: Optional[str] = None,
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Start a span.
+
+        Args:
+            name: Operation name
+            trace_id: Trace to join (default: start a new trace)
+            parent_id: Span ID of the parent, if any
+            kind: "server", "client" or "internal"
+            attributes: Initial attributes
+        """
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_time = time.time()
+        self._started = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.status = "ok"
+        self.attributes: Dict[str, Any] = attributes or {}
+
+    @property
+    def traceparent(self) -> str:
+        """W3C traceparent value identifying this span"""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def child(self, name: str, kind: str = "internal", attributes: Optional[Dict[str, Any]] = None) -> "Span":
+        """Start a span under this one"""
+        return Span(name, self.trace_id, self.span_id, kind, attributes)
+
+    def end(self) -> None:
+        """Record the duration (idempotent)"""
+        if self.duration is None:
+            self.duration = time.perf_counter() - self._started
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time": self.start_time,
+            "duration_ms": round((self.duration or 0.0) * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class SpanBuffer:
+    """Ring buffer of finished spans, readable grouped by trace"""
+
+    def __init__(self, capacity: int):
+        """
+        Initialize the buffer.
+
+        Args:
+            capacity: Spans kept; the oldest are dropped first
+        """
+        self._spans: Deque[Span] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def _grouped(self) -> "OrderedDict[str, List[Span]]":
+        with self._lock:
+            spans = list(self._spans)
+        traces: "OrderedDict[str, List[Span]]" = OrderedDict()
+        for span in spans:
+            traces.setdefault(span.trace_id, []).append(span)
+        return traces
+
+    def traces(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Get the most recently finished traces.
+
+        Args:
+            limit: Number of traces returned
+
+        Returns:
+            List of traces, newest first
+        """
+        grouped = self._grouped()
+        recent = sorted(grouped.values(), key=lambda spans: max(s.start_time + (s.duration or 0) for s in spans), reverse=True)
+        return [_trace_dict(spans) for spans in recent[:limit]]
+
+    def trace(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get one trace.
+
+        Args:
+            trace_id: Trace ID
+
+        Returns:
+            Trace with its spans, or None if no span of it is buffered
+        """
+        spans = self._grouped().get(trace_id)
+        return _trace_dict(spans) if spans else None
+
+
+def _trace_dict(spans: List[Span]) -> Dict[str, Any]:
+    """Summarize a trace: root span, total duration and spans in start order"""
+    spans = sorted(spans, key=lambda s: s.start_time)
+    ids = {span.span_id for span in spans}
+    root = next((span for span in spans if span.parent_id not in ids), spans[0])
+    start = spans[0].start_time
+    end = max(span.start_time + (span.duration or 0.0) for span in spans)
+    return {
+        "trace_id": root.trace_id,
+        "root": root.name,
+        "remote_parent_id": root.parent_id,
+        "start_time": start,
+        "duration_ms": round((end - start) * 1000, 3),
+        "spans": [span.as_dict() for span in spans],
+    }
+
+
+def format_waterfall(trace: Dict[str, Any]) -> str:
+    """
+    Render a trace as an indented text waterfall.
+
+    Args:
+        trace: Trace dictionary from SpanBuffer
+
+    Returns:
+        One line per span with start offset, duration, name and key attributes
+    """
+    spans = trace["spans"]
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    ids = {span["span_id"] for span in spans}
+    for span in spans:
+        parent = span["parent_id"] if span["parent_id"] in ids else None
+        children.setdefault(parent, []).append(span)
+
+    lines = [f"trace {trace['trace_id']}  {trace['root']}  {trace['duration_ms']:.1f} ms"]
+    if trace["remote_parent_id"]:
+        lines[0] += f"  (client span {trace['remote_parent_id']})"
+
+    def walk(parent: Optional[str], depth: int) -> None:
+        for span in children.get(parent, []):
+            offset = (span["start_time"] - trace["start_time"]) * 1000
+            detail = str(span["attributes"].get("db.statement") or span["attributes"].get("http.status_code", ""))[:120]
+            marker = " !" if span["status"] != "ok" else ""
+            lines.append(
+                f"{offset:8.1f} ms {span['duration_ms']:8.1f} ms  {'  ' * depth}{span['name']}{marker}  {detail}".rstrip()
+            )
+            walk(span["span_id"], depth + 1)
+
+    walk(None, 0)
+    return "\n".join(lines) + "\n"
+
+
+class Tracer:
+    """
+    Creates spans while settings.tracing_enabled is set and exports finished
+    spans to the ring buffer and, if settings.tracing_jsonl_path is set, to a
+    JSONL file (one span per line) written by a background thread.
+    """
+
+    def __init__(self, capacity: Optional[int] = None):
+        """
+        Initialize the tracer.
+
+        Args:
+            capacity: Spans kept in memory (default: settings.tracing_buffer_size)
+        """
+        self.buffer = SpanBuffer(capacity if capacity is not None else settings.tracing_buffer_size)
+        # (path, line) pairs waiting for the writer thread, so file I/O never runs
+        # on the event loop (bounded: spans are dropped if the disk stalls)
+        self._lines: "queue.Queue[Tuple[str, str]]" = queue.Queue(maxsize=10000)
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+
+    def finish(self, span: Span) -> None:
+        """End a span and export it"""
+        span.end()
+        self.buffer.add(span)
+        if settings.tracing_jsonl_path:
+            self._enqueue(settings.tracing_jsonl_path, json.dumps(span.as_dict(), default=str))
+
+    def flush(self) -> None:
+        """Wait until every queued span has been written to its JSONL file"""
+        self._lines.join()
+
+    def _enqueue(self, path: str, line: str) -> None:
+        """Hand a span line to the writer thread, starting it on first use"""
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_lines, name="trace-writer", daemon=True)
+                self._writer.start()
+        try:
+            self._lines.put_nowait((path, line))
+        except queue.Full:
+            logger.warning("Span export queue is full, dropping span")
+
+    def _write_lines(self) -> None:
+        """Writer thread body: append queued span lines, keeping the file open between spans"""
+        output = None
+        while True:
+            path, line = self._lines.get()
+            try:
+                if output is None or output.name != path:
+                    if output is not None:
+                        output.close()
+                    output = None
+                    output = open(path, "a", encoding="utf-8")
+                output.write(line + "\n")
+                if self._lines.empty():
+                    output.flush()
+            except OSError as e:
+                logger.warning(f"Could not write span to {path}: {e}")
+            finally:
+                self._lines.task_done()
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        """
+        Trace a block as a child of the current span.
+        Does nothing (yields None) outside a traced request.
+
+        Args:
+            name: Operation name
+            **attributes: Span attributes
+        """
+        parent = current_span.get()
+        if parent is None or not settings.tracing_enabled:
+            yield None
+            return
+        span = parent.child(name, attributes=attributes)
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException:
+            span.status = "error"
+            raise
+        finally:
+            current_span.reset(token)
+            self.finish(span)
+
+
+# Span of the operation being served
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+# Process-wide tracer
+tracer = Tracer()
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware opening a server span per request when settings.tracing_enabled is set.
+
+    Joins the caller's trace when the request carries a valid traceparent
+    header and returns the server span in a traceresponse header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.tracing_enabled
+            or scope["path"].startswith(UNTRACED_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+        remote = parse_traceparent(traceparent)
+        span = Span(
+            f"{scope['method']} {scope['path']}",
+            trace_id=remote[0] if remote else None,
+            parent_id=remote[1] if remote else None,
+            kind="server",
+            attributes={"http.method": scope["method"], "http.target": scope["path"]}
+        )
+        token = current_span.set(span)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                span.attributes["http.status_code"] = message["status"]
+                if message["status"] >= 500:
+                    span.status = "error"
+                MutableHeaders(scope=message).append("traceresponse", span.traceparent)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException:
+            span.status = "error"
+            raise
+        finally:
+            current_span.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                span.name = f"{scope['method']} {route.path_format}"
+                span.attributes["http.route"] = route.path_format
+            tracer.finish(span)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    parent = current_span.get()
+    if parent is None or not settings.tracing_enabled:
+        return
+    span = parent.child(
+        "db.query",
+        kind="client",
+        attributes={
+            "db.system": conn.dialect.name,
+            "db.statement": normalize_statement(statement)[:MAX_STATEMENT_LENGTH],
+        }
+    )
+    conn.info.setdefault("trace_spans", []).append(span)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_spans")
+    if not spans or current_span.get() is None:
+        return
+    span = spans.pop()
+    if cursor.rowcount is not None and cursor.rowcount >= 0:
+        span.attributes["db.rowcount"] = cursor.rowcount
+    tracer.finish(span)
+
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    spans = connection.info.get("trace_spans") if connection is not None else None
+    if spans and current_span.get() is not None:
+        span = spans.pop()
+        span.status = "error"
+        span.attributes["error"] = type(exception_context.original_exception).__name__
+        tracer.finish(span)
+
+
+def install_db_tracing() -> None:
+    """Open a db.query span per statement executed inside a traced request (idempotent)"""
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
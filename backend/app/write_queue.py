@@ -0,0 +1,207 @@
+"""Single-writer queue coalescing expense inserts into group commits"""
+
+import logging
+import queue
+import random
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+from app.config import settings
+from app.database import is_sqlite_busy
+from app.metrics import SQLITE_BUSY_RETRIES
+from app.models.expense import Expense
+from app.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# A queued insert: (row values, future resolved with the new row id)
+PendingWrite = Tuple[Dict[str, Any], Future]
+
+
+class WriteQueue:
+    """
+    Queue feeding a single writer thread for one engine.
+
+    Callers block until their row is committed. The writer takes the first
+    pending insert, collects whatever else arrives within max_delay (up to
+    max_batch rows) and commits them in one transaction, so concurrent
+    requests share a single fsync instead of queueing on SQLite's write lock.
+    The thread exits after idle_timeout seconds without work and is restarted
+    on the next submit.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        max_batch: Optional[int] = None,
+        max_delay: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        retry_backoff: Optional[float] = None,
+        idle_timeout: Optional[float] = None
+    ):
+        """
+        Initialize the write queue.
+
+        Args:
+            engine: Engine the writer thread connects with
+            max_batch: Maximum rows per group commit (default: settings.write_queue_max_batch)
+            max_delay: Seconds to wait for more rows after the first (default: settings.write_queue_max_delay)
+            max_retries: Retries of a batch on lock contention (default: settings.write_queue_max_retries)
+            retry_backoff: Initial retry delay in seconds, doubled per attempt (default: settings.write_queue_retry_backoff)
+            idle_timeout: Seconds without work before the thread exits (default: settings.write_queue_idle_timeout)
+        """
+        # Weak, so that the per-engine registry entry can go away with the engine
+        self._engine = weakref.ref(engine)
+        self.max_batch = max_batch if max_batch is not None else settings.write_queue_max_batch
+        self.max_delay = max_delay if max_delay is not None else settings.write_queue_max_delay
+        self.max_retries = max_retries if max_retries is not None else settings.write_queue_max_retries
+        self.retry_backoff = retry_backoff if retry_backoff is not None else settings.write_queue_retry_backoff
+        self.idle_timeout = idle_timeout if idle_timeout is not None else settings.write_queue_idle_timeout
+
+        self._queue: "queue.Queue[PendingWrite]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        # Counters
+        self.rows = 0
+        self.commits = 0
+        self.retries = 0
+
+    def submit(self, values: Dict[str, Any]) -> int:
+        """
+        Insert an expense through the writer thread and wait for the commit.
+
+        Args:
+            values: Column values (date, month, category, amount, memo)
+
+        Returns:
+            ID of the inserted row
+
+        Raises:
+            OperationalError: If the database stayed locked after all retries
+            Exception: Any other error raised by the insert
+        """
+        future: Future = Future()
+        with self._lock:
+            self._queue.put((values, future))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="expense-writer",
+                    daemon=True
+                )
+                self._thread.start()
+        # Time spent queued behind and inside the group commit
+        with tracer.span("write_queue.wait"):
+            return future.result()
+
+    def _run(self) -> None:
+        """Writer loop: collect a batch, commit it, repeat until idle"""
+        while True:
+            try:
+                first = self._queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._thread = None
+                        return
+                continue
+
+            batch = [first]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    remaining = deadline - time.monotonic()
+                    if remaining > 0:
+                        batch.append(self._queue.get(timeout=remaining))
+                    else:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self._commit(batch)
+            except Exception as e:  # never let the writer die with callers waiting
+                logger.error(f"Expense writer failed: {e}", exc_info=True)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _commit(self, batch: List[PendingWrite]) -> None:
+        """
+        Insert a batch in one transaction and resolve its futures.
+
+        Lock contention is retried with jittered exponential backoff. Any other
+        error fails the whole transaction, so the rows are then committed one
+        by one and only the offending caller gets the error.
+        """
+        engine = self._engine()
+        if engine is None:
+            for _, future in batch:
+                future.set_exception(RuntimeError("Engine was disposed"))
+            return
+
+        attempt = 0
+        while True:
+            try:
+                with engine.begin() as connection:
+                    ids = [
+                        connection.execute(insert(Expense), values).inserted_primary_key[0]
+                        for values, _ in batch
+                    ]
+                break
+            except OperationalError as e:
+                if not is_sqlite_busy(e) or attempt >= self.max_retries:
+                    return self._fail(batch, e)
+                self.retries += 1
+                SQLITE_BUSY_RETRIES.inc()
+                delay = self.retry_backoff * (2 ** attempt)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+                attempt += 1
+            except Exception as e:
+                return self._fail(batch, e)
+
+        self.rows += len(batch)
+        self.commits += 1
+        for (_, future), row_id in zip(batch, ids):
+            future.set_result(row_id)
+
+    def _fail(self, batch: List[PendingWrite], error: Exception) -> None:
+        """Fail a single-row batch, or retry a larger batch row by row"""
+        if len(batch) == 1 or is_sqlite_busy(error):
+            for _, future in batch:
+                future.set_exception(error)
+            return
+        for pending in batch:
+            self._commit([pending])
+
+
+# One queue per engine; entries disappear with their engine
+_queues: "weakref.WeakKeyDictionary[Engine, WriteQueue]" = weakref.WeakKeyDictionary()
+_queues_lock = threading.Lock()
+
+
+def get_write_queue(engine: Engine) -> Optional[WriteQueue]:
+    """
+    Get the write queue of an engine.
+
+    Args:
+        engine: Engine bound to the caller's session
+
+    Returns:
+        WriteQueue, or None if the queue is disabled or the database is not SQLite
+    """
+    if not settings.write_queue_enabled or engine.dialect.name != "sqlite":
+        return None
+    with _queues_lock:
+        write_queue = _queues.get(engine)
+        if write_queue is None:
+            write_queue = WriteQueue(engine)
+            _queues[engine] = write_queue
+        return write_queue
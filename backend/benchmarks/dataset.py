@@ -0,0 +1,167 @@
+"""
+Synthetic household dataset for benchmarks.
+
+Generates several years of expenses shaped like a real household: monthly
+fixed costs early in the month, a few variable expenses per day with
+category-specific amounts, and default monthly budgets for every month.
+Generation is seeded, so the same arguments always produce the same rows.
+"""
+
+import random
+from datetime import date, timedelta
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+# Fixed monthly costs: (category, day of month, min amount, max amount)
+FIXED_COSTS = [
+    ("housing", 1, 80000, 80000),
+    ("utilities", 5, 8000, 18000),
+    ("communication", 10, 6000, 9000),
+    ("insurance", 27, 15000, 15000),
+]
+
+# Variable costs: (category, relative weight, min amount, max amount)
+VARIABLE_COSTS = [
+    ("food", 50, 200, 6000),
+    ("daily_goods", 15, 100, 3000),
+    ("transportation", 12, 200, 2000),
+    ("entertainment", 8, 500, 8000),
+    ("social", 5, 2000, 10000),
+    ("medical", 4, 500, 5000),
+    ("clothing", 4, 1000, 15000),
+    ("education", 2, 1000, 20000),
+]
+
+MEMOS = [None, None, None, "スーパー", "コンビニ", "ドラッグストア", "外食", "通販"]
+
+
+def month_starts(end_month: str, months: int) -> List[date]:
+    """
+    List the first day of each month, oldest first.
+
+    Args:
+        end_month: Last month in YYYY-MM format
+        months: Number of months
+
+    Returns:
+        List of dates
+    """
+    year, month = map(int, end_month.split("-"))
+    starts = []
+    for _ in range(months):
+        starts.append(date(year, month, 1))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return starts[::-1]
+
+
+def generate_expenses(
+    end_month: str,
+    years: int = 3,
+    expenses_per_day: float = 4.0,
+    seed: int = 0
+) -> Iterator[Dict[str, object]]:
+    """
+    Generate expense rows.
+
+    Args:
+        end_month: Last month generated, in YYYY-MM format
+        years: Number of years of history
+        expenses_per_day: Average variable expenses per day
+        seed: Random seed
+
+    Yields:
+        Column values for the expenses table
+    """
+    rng = random.Random(seed)
+    categories = [c for c, _, _, _ in VARIABLE_COSTS]
+    weights = [w for _, w, _, _ in VARIABLE_COSTS]
+    ranges = {c: (low, high) for c, _, low, high in VARIABLE_COSTS}
+
+    for start in month_starts(end_month, years * 12):
+        month = start.strftime("%Y-%m")
+        for category, day, low, high in FIXED_COSTS:
+            yield {
+                "date": start.replace(day=day),
+                "month": month,
+                "category": category,
+                "amount": rng.randint(low, high) // 10 * 10,
+                "memo": None,
+            }
+        day = start
+        while day.month == start.month:
+            # Poisson-like count: expenses_per_day on average, never negative
+            count = max(0, int(rng.gauss(expenses_per_day, expenses_per_day / 2) + 0.5))
+            for category in rng.choices(categories, weights, k=count):
+                low, high = ranges[category]
+                yield {
+                    "date": day,
+                    "month": month,
+                    "category": category,
+                    "amount": rng.randint(low, high) // 10 * 10,
+                    "memo": rng.choice(MEMOS),
+                }
+            day += timedelta(days=1)
+
+
+def seed_household(
+    engine: Engine,
+    end_month: Optional[str] = None,
+    years: int = 3,
+    expenses_per_day: float = 4.0,
+    seed: int = 0,
+    chunk_size: int = 5000,
+    max_expenses: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Create the schema and fill it with a synthetic household.
+
+    Args:
+        engine: Engine of an empty database
+        end_month: Last month generated (default: current month)
+        years: Number of years of history
+        expenses_per_day: Average variable expenses per day
+        seed: Random seed
+        chunk_size: Rows per executemany insert
+        max_expenses: Stop after this many expenses (the newest months are then partly empty)
+
+    Returns:
+        Dictionary with the number of expenses and months seeded
+    """
+    # Imported here so callers can point DATABASE_URL elsewhere before app.database loads
+    from app.database import Base
+    from app.models.expense import Expense
+    from app.services.category import CategoryService
+    from app.services.monthly_budget import MonthlyBudgetService
+
+    end_month = end_month or date.today().strftime("%Y-%m")
+    Base.metadata.create_all(bind=engine)
+
+    session = sessionmaker(bind=engine)()
+    try:
+        CategoryService(session).initialize_default_categories()
+        months = month_starts(end_month, years * 12)
+        budget_service = MonthlyBudgetService(session)
+        for start in months:
+            budget_service.initialize_default_budgets(start.strftime("%Y-%m"))
+    finally:
+        session.close()
+
+    expenses = 0
+    chunk: List[Dict[str, object]] = []
+    with engine.begin() as connection:
+        rows = generate_expenses(end_month, years, expenses_per_day, seed)
+        for row in islice(rows, max_expenses):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                connection.execute(insert(Expense), chunk)
+                expenses += len(chunk)
+                chunk = []
+        if chunk:
+            connection.execute(insert(Expense), chunk)
+            expenses += len(chunk)
+
+    return {"expenses": expenses, "months": len(months)}
@@ -0,0 +1,385 @@
+"""
+HTTP load test with per-route latency percentiles.
+
+Seeds a synthetic multi-year household into a fresh SQLite file, starts the
+API (under uvicorn, or in-process through httpx's ASGI transport) and drives
+a weighted mix of operations at fixed concurrency for a fixed time:
+
+    kiosk    GET  /api/summary (dashboard poll of the current month)
+    expense  POST /api/expenses
+    budget   GET  /api/monthly-budgets, then POST /api/monthly-budgets
+    history  GET  /api/expenses?month=<random past month>
+    stats    GET  /api/expenses/statistics/<random past month>
+
+Reports req/s and p50/p95/p99 per route and writes a JSON result file; pass
+an earlier result file with --baseline to print the change per route.
+
+Usage (from backend/):
+    python -m benchmarks.loadtest --concurrency 8 --duration 20 --output loadtest.json
+    python -m benchmarks.loadtest --mix kiosk=90,expense=10 --baseline loadtest.json
+    python -m benchmarks.loadtest --url http://raspberrypi:8000 --no-seed
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.dataset import month_starts
+
+DEFAULT_MIX = "kiosk=70,expense=15,budget=5,history=7,stats=3"
+
+BUDGET_CATEGORIES = ["food", "daily_goods", "transportation", "entertainment", "social"]
+EXPENSE_CATEGORIES = ["food", "food", "food", "daily_goods", "transportation", "entertainment"]
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """
+    Parse an operation mix such as "kiosk=70,expense=30".
+
+    Args:
+        mix: Comma-separated operation=weight pairs
+
+    Returns:
+        Dictionary with operation as key and weight as value
+
+    Raises:
+        ValueError: If an operation is unknown or a weight is not positive
+    """
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {name} (choose from {', '.join(OPERATIONS)})")
+        weights[name] = float(weight or 1)
+        if weights[name] <= 0:
+            raise ValueError(f"Weight of {name} must be positive")
+    return weights
+
+
+class Recorder:
+    """Latencies and errors per route"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    async def call(self, client: httpx.AsyncClient, route: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """
+        Send a request and record its latency under the route name.
+
+        Args:
+            client: HTTP client
+            route: Route template used as the report key (e.g. "GET /api/summary")
+            method: HTTP method
+            url: Request URL
+            **kwargs: Arguments for httpx
+
+        Returns:
+            Response, or None if the request failed
+        """
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[route] = self.errors.get(route, 0) + 1
+            return None
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            self.errors[route] = self.errors.get(route, 0) + 1
+        else:
+            self.latencies.setdefault(route, []).append(elapsed)
+        return response
+
+
+class Workload:
+    """Operations of the mix, sharing the month range of the seeded dataset"""
+
+    def __init__(self, months: List[str], rng: random.Random):
+        self.months = months
+        self.current_month = months[-1]
+        self.rng = rng
+
+    async def kiosk(self, client, recorder: Recorder) -> None:
+        await recorder.call(client, "GET /api/summary", "GET", "/api/summary", params={"month": self.current_month})
+
+    async def expense(self, client, recorder: Recorder) -> None:
+        today = date.today()
+        await recorder.call(
+            client, "POST /api/expenses", "POST", "/api/expenses",
+            json={
+                "date": today.isoformat(),
+                "category": self.rng.choice(EXPENSE_CATEGORIES),
+                "amount": self.rng.randint(1, 600) * 10,
+                "memo": "loadtest",
+            },
+            headers={"Idempotency-Key": str(uuid.uuid4())}
+        )
+
+    async def budget(self, client, recorder: Recorder) -> None:
+        # What the budget page does: load the month, then save one category
+        await recorder.call(
+            client, "GET /api/monthly-budgets", "GET", "/api/monthly-budgets",
+            params={"month": self.current_month}
+        )
+        await recorder.call(
+            client, "POST /api/monthly-budgets", "POST", "/api/monthly-budgets",
+            json={
+                "month": self.current_month,
+                "category_id": self.rng.choice(BUDGET_CATEGORIES),
+                "amount": self.rng.randint(10, 100) * 1000,
+            },
+            headers={"Idempotency-Key": str(uuid.uuid4())}
+        )
+
+    async def history(self, client, recorder: Recorder) -> None:
+        await recorder.call(
+            client, "GET /api/expenses", "GET", "/api/expenses",
+            params={"month": self.rng.choice(self.months)}
+        )
+
+    async def stats(self, client, recorder: Recorder) -> None:
+        month = self.rng.choice(self.months)
+        await recorder.call(
+            client, "GET /api/expenses/statistics/{month}", "GET", f"/api/expenses/statistics/{month}"
+        )
+
+
+OPERATIONS = ["kiosk", "expense", "budget", "history", "stats"]
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    months: List[str],
+    mix: Dict[str, float],
+    concurrency: int,
+    duration: float,
+    seed: int
+) -> Tuple[Recorder, float]:
+    """
+    Run the mix from concurrency workers until duration seconds have passed.
+
+    Returns:
+        Tuple of (recorder, elapsed seconds)
+    """
+    recorder = Recorder()
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id: int) -> None:
+        rng = random.Random(seed * 1000 + worker_id)
+        workload = Workload(months, rng)
+        while time.perf_counter() < deadline:
+            operation = rng.choices(names, weights)[0]
+            await getattr(workload, operation)(client, recorder)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return recorder, time.perf_counter() - started
+
+
+def summarize(recorder: Recorder, elapsed: float) -> Dict[str, Dict[str, float]]:
+    """
+    Compute throughput and latency percentiles per route and in total.
+
+    Returns:
+        Dictionary with route as key (plus "TOTAL") and its measurements
+    """
+    routes: Dict[str, Dict[str, float]] = {}
+    everything: List[float] = []
+    for route in sorted(set(recorder.latencies) | set(recorder.errors)):
+        latencies = sorted(recorder.latencies.get(route, []))
+        everything.extend(latencies)
+        routes[route] = _measurements(latencies, recorder.errors.get(route, 0), elapsed)
+    routes["TOTAL"] = _measurements(sorted(everything), sum(recorder.errors.values()), elapsed)
+    return routes
+
+
+def _measurements(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    if not latencies:
+        return {"requests": 0, "errors": errors, "rps": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+    }
+
+
+def print_report(routes: Dict[str, Dict[str, float]], baseline: Optional[Dict[str, Dict[str, float]]] = None) -> None:
+    """Print the per-route table, with changes against a baseline when given"""
+    print(f"{'route':<40}{'reqs':>7}{'errors':>7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for route, r in routes.items():
+        print(f"{route:<40}{r['requests']:>7}{r['errors']:>7}{r['rps']:>9.1f}{r['p50_ms']:>9.2f}"
+              f"{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['max_ms']:>9.2f}")
+        old = (baseline or {}).get(route)
+        if old:
+            changes = []
+            for key in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+                if old[key]:
+                    changes.append(f"{key} {(r[key] - old[key]) / old[key] * 100:+.1f}%")
+            print(f"{'  vs baseline':<40}{', '.join(changes)}")
+
+
+def git_commit() -> Optional[str]:
+    """Current commit of the working tree, if it is a git checkout"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_uvicorn(database_url: str, port: int) -> subprocess.Popen:
+    """Start the API under uvicorn and wait for /health"""
+    env = dict(os.environ, DATABASE_URL=database_url, LOG_LEVEL="WARNING")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not become healthy within 30 seconds")
+
+
+async def run_in_process(args, months: List[str], mix: Dict[str, float]) -> Tuple[Recorder, float]:
+    # DATABASE_URL is set before this import so the app binds to the seeded file
+    from app.database import init_db
+    from app.main import app
+
+    init_db()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=30) as client:
+        return await drive(client, months, mix, args.concurrency, args.duration, args.seed)
+
+
+async def run_against(url: str, args, months: List[str], mix: Dict[str, float]) -> Tuple[Recorder, float]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=30, limits=limits) as client:
+        return await drive(client, months, mix, args.concurrency, args.duration, args.seed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", choices=["uvicorn", "inprocess"], default="uvicorn",
+                        help="start the app under uvicorn (default) or call it in-process")
+    parser.add_argument("--url", help="drive an already running server instead (implies --no-seed)")
+    parser.add_argument("--no-seed", action="store_true", help="do not seed a dataset")
+    parser.add_argument("--years", type=int, default=3, help="years of seeded history")
+    parser.add_argument("--expenses-per-day", type=float, default=4.0, help="average seeded expenses per day")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent workers")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds to run")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"operation weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of dataset and workload")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare with an earlier JSON result file")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    months = [start.strftime("%Y-%m") for start in month_starts(date.today().strftime("%Y-%m"), args.years * 12)]
+    meta = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "server": "url" if args.url else args.server,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "mix": mix,
+        "years": args.years,
+        "expenses_per_day": args.expenses_per_day,
+        "seed": args.seed,
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        process = None
+        try:
+            if args.url:
+                url = args.url.rstrip("/")
+            else:
+                database_url = f"sqlite:///{Path(directory) / 'loadtest.db'}"
+                os.environ["DATABASE_URL"] = database_url
+                os.environ.setdefault("LOG_LEVEL", "WARNING")
+                if not args.no_seed:
+                    from sqlalchemy import create_engine
+                    from benchmarks.dataset import seed_household
+                    engine = create_engine(database_url)
+                    started = time.perf_counter()
+                    seeded = seed_household(engine, years=args.years, expenses_per_day=args.expenses_per_day, seed=args.seed)
+                    engine.dispose()
+                    meta["seeded_expenses"] = seeded["expenses"]
+                    print(f"Seeded {seeded['expenses']} expenses over {seeded['months']} months "
+                          f"in {time.perf_counter() - started:.1f}s")
+                if args.server == "uvicorn":
+                    port = free_port()
+                    process = start_uvicorn(database_url, port)
+                    url = f"http://127.0.0.1:{port}"
+
+            print(f"{args.concurrency} workers for {args.duration:.0f}s, mix {args.mix}")
+            if args.url or args.server == "uvicorn":
+                recorder, elapsed = asyncio.run(run_against(url, args, months, mix))
+            else:
+                recorder, elapsed = asyncio.run(run_in_process(args, months, mix))
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=10)
+
+    routes = summarize(recorder, elapsed)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["routes"]
+    print_report(routes, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "routes": routes}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
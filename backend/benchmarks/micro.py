@@ -0,0 +1,334 @@
+"""
+Micro-benchmarks of the hot service and repository functions, with baselines.
+
+Each benchmark runs against deterministic generated datasets of 1k, 100k
+and 1M expenses (cached between runs, copied per run so writes never touch
+the cache). The median time per call is compared with the stored baseline,
+and the process exits with status 1 when any benchmark is slower than the
+baseline by more than the tolerance.
+
+Baselines are machine-specific: record them on the machine the comparison
+runs on (e.g. the Raspberry Pi) with --update-baseline.
+
+Usage (from backend/):
+    python -m benchmarks.micro                       # 1k and 100k, compare with baselines
+    python -m benchmarks.micro --sizes 1k,100k,1m --tolerance 0.3
+    python -m benchmarks.micro --only summary --update-baseline
+"""
+
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from itertools import cycle
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.database import Base  # noqa: F401  (imported before app.models, which it loads)
+from app.models.expense import Expense as ExpenseModel
+from app.schemas.budget import BudgetCreate
+from app.schemas.category import MonthlyBudgetCreateSchema
+from app.schemas.expense import Expense
+from app.services.budget import BudgetService
+from app.services.expense import ExpenseService
+from app.services.monthly_budget import MonthlyBudgetService
+from app.services.summary import SummaryService
+from benchmarks.dataset import seed_household
+
+# Bump when the generator changes so cached datasets are rebuilt
+DATASET_VERSION = 1
+
+# Fixed so that datasets do not depend on the day the benchmark runs
+END_MONTH = "2025-12"
+
+BASELINE_PATH = Path(__file__).with_name("baselines.json")
+DEFAULT_DATA_DIR = Path(tempfile.gettempdir()) / "home-finance-benchmarks"
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """Size and time span of a generated dataset"""
+
+    expenses: int
+    years: int
+
+    @property
+    def expenses_per_day(self) -> float:
+        # Slightly above the target so the newest month is full before the cap applies
+        return self.expenses / (self.years * 365) * 1.02
+
+
+DATASETS = {
+    "1k": DatasetSpec(1_000, 1),
+    "100k": DatasetSpec(100_000, 5),
+    "1m": DatasetSpec(1_000_000, 10),
+}
+
+# A benchmark gets a session factory and the benchmarked month, and returns the call to time
+Benchmark = Callable[[sessionmaker, str], Callable[[], object]]
+
+
+def _per_session(call: Callable[[object, str], object]) -> Benchmark:
+    """Run each timed call in a fresh session, as a request would"""
+    def setup(SessionLocal: sessionmaker, month: str) -> Callable[[], object]:
+        def run() -> object:
+            db = SessionLocal()
+            try:
+                return call(db, month)
+            finally:
+                db.close()
+        return run
+    return setup
+
+
+def _model_validate(SessionLocal: sessionmaker, month: str) -> Callable[[], object]:
+    # Rows are loaded once; only the ORM-to-schema conversion is timed
+    with SessionLocal() as db:
+        rows = db.scalars(select(ExpenseModel).where(ExpenseModel.month == month)).all()
+    return lambda: [Expense.model_validate(row) for row in rows]
+
+
+# Upserts alternate between two amounts so every call is a real update
+_amounts = cycle([90000, 91000])
+
+
+def _monthly_budget_upsert(db, month: str) -> object:
+    return MonthlyBudgetService(db).register_budget(
+        MonthlyBudgetCreateSchema(month=month, category_id="food", amount=next(_amounts))
+    )
+
+
+def _budget_upsert(db, month: str) -> object:
+    return BudgetService(db).register_budget(BudgetCreate(month=month, category="food", amount=next(_amounts)))
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    "SummaryService.calculate_summary": _per_session(
+        lambda db, month: SummaryService(db, timezone=settings.timezone).calculate_summary(month)
+    ),
+    "ExpenseService.get_expenses_summary_by_category": _per_session(
+        lambda db, month: ExpenseService(db, timezone=settings.timezone).get_expenses_summary_by_category(month)
+    ),
+    "MonthlyBudgetService.get_budgets_by_month": _per_session(
+        lambda db, month: MonthlyBudgetService(db).get_budgets_by_month(month)
+    ),
+    "Expense.model_validate (one month)": _model_validate,
+    "MonthlyBudgetService.register_budget (upsert)": _per_session(_monthly_budget_upsert),
+    "BudgetService.register_budget (upsert)": _per_session(_budget_upsert),
+}
+
+
+def dataset_path(size: str, spec: DatasetSpec, data_dir: Path, seed: int) -> Path:
+    """
+    Get the cached dataset file, generating it on first use.
+
+    Args:
+        size: Dataset name (e.g. "100k")
+        spec: Dataset size and span
+        data_dir: Cache directory
+        seed: Random seed
+
+    Returns:
+        Path of the SQLite file
+    """
+    path = data_dir / f"micro-{size}-v{DATASET_VERSION}-seed{seed}.db"
+    if path.exists():
+        return path
+    data_dir.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(".tmp")
+    partial.unlink(missing_ok=True)
+    engine = create_engine(f"sqlite:///{partial}")
+    started = time.perf_counter()
+    seeded = seed_household(
+        engine,
+        end_month=END_MONTH,
+        years=spec.years,
+        expenses_per_day=spec.expenses_per_day,
+        seed=seed,
+        max_expenses=spec.expenses
+    )
+    engine.dispose()
+    partial.rename(path)
+    print(f"Generated {size} dataset ({seeded['expenses']} expenses) in {time.perf_counter() - started:.1f}s",
+          file=sys.stderr)
+    return path
+
+
+def measure(call: Callable[[], object], min_time: float = 0.5, min_runs: int = 5, max_runs: int = 1000) -> Dict[str, float]:
+    """
+    Time a call repeatedly after one warm-up call.
+
+    Args:
+        call: Function to time
+        min_time: Keep running until this many seconds were spent
+        min_runs: Minimum timed runs
+        max_runs: Maximum timed runs
+
+    Returns:
+        Dictionary with run count and median/min/max milliseconds per call
+    """
+    call()
+    times: List[float] = []
+    total = 0.0
+    while len(times) < max_runs and (len(times) < min_runs or total < min_time):
+        started = time.perf_counter()
+        call()
+        elapsed = time.perf_counter() - started
+        times.append(elapsed)
+        total += elapsed
+    return {
+        "runs": len(times),
+        "median_ms": round(statistics.median(times) * 1000, 4),
+        "min_ms": round(min(times) * 1000, 4),
+        "max_ms": round(max(times) * 1000, 4),
+    }
+
+
+def run_suite(
+    datasets: Dict[str, DatasetSpec],
+    data_dir: Path,
+    seed: int = 0,
+    only: Optional[str] = None,
+    min_time: float = 0.5
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Run the benchmarks against each dataset.
+
+    Args:
+        datasets: Dataset name to size and span
+        data_dir: Cache directory of generated datasets
+        seed: Random seed of the datasets
+        only: Run only benchmarks whose name contains this text
+        min_time: Seconds spent per benchmark
+
+    Returns:
+        Dictionary of dataset name to benchmark name to measurements
+    """
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for size, spec in datasets.items():
+        cached = dataset_path(size, spec, data_dir, seed)
+        with tempfile.TemporaryDirectory() as directory:
+            working = Path(directory) / cached.name
+            shutil.copyfile(cached, working)
+            engine = create_engine(f"sqlite:///{working}")
+            SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            with SessionLocal() as db:
+                # The busiest month, so per-month work grows with the dataset
+                month = db.execute(
+                    select(ExpenseModel.month).group_by(ExpenseModel.month)
+                    .order_by(func.count().desc(), ExpenseModel.month.desc()).limit(1)
+                ).scalar_one()
+            results[size] = {}
+            for name, benchmark in BENCHMARKS.items():
+                if only and only.lower() not in name.lower():
+                    continue
+                results[size][name] = measure(benchmark(SessionLocal, month), min_time=min_time)
+            engine.dispose()
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, Dict[str, float]]],
+    baselines: Dict[str, Dict[str, Dict[str, float]]],
+    tolerance: float
+) -> List[Tuple[str, str, float, Optional[float], Optional[float], bool]]:
+    """
+    Compare medians with baselines.
+
+    Args:
+        results: Measurements from run_suite
+        baselines: Stored measurements in the same shape
+        tolerance: Allowed slowdown as a fraction (0.2 = 20% slower)
+
+    Returns:
+        List of (dataset, benchmark, median ms, baseline ms or None, change or None, regressed)
+    """
+    rows = []
+    for size, benchmarks in results.items():
+        for name, measured in benchmarks.items():
+            baseline = baselines.get(size, {}).get(name)
+            if baseline is None:
+                rows.append((size, name, measured["median_ms"], None, None, False))
+                continue
+            change = measured["median_ms"] / baseline["median_ms"] - 1 if baseline["median_ms"] else 0.0
+            rows.append((size, name, measured["median_ms"], baseline["median_ms"], change, change > tolerance))
+    return rows
+
+
+def load_baselines(path: Path) -> Dict[str, object]:
+    if not path.exists():
+        return {"meta": {}, "results": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1k,100k", help=f"datasets to run ({', '.join(DATASETS)})")
+    parser.add_argument("--only", help="run only benchmarks whose name contains this text")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before failing (0.2 = 20%%)")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds spent per benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="dataset seed")
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR, help="cache of generated datasets")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="baseline file")
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--output", type=Path, help="also write this run's results to a JSON file")
+    args = parser.parse_args()
+
+    sizes = [size.strip() for size in args.sizes.split(",")]
+    unknown = [size for size in sizes if size not in DATASETS]
+    if unknown:
+        parser.error(f"unknown sizes: {', '.join(unknown)}")
+
+    results = run_suite({size: DATASETS[size] for size in sizes}, args.data_dir, args.seed, args.only, args.min_time)
+    stored = load_baselines(args.baseline)
+    rows = compare(results, stored["results"], args.tolerance)
+
+    print(f"{'dataset':<8}{'benchmark':<50}{'median ms':>11}{'baseline':>11}{'change':>9}")
+    for size, name, median, baseline, change, regressed in rows:
+        baseline_text = f"{baseline:>11.3f}" if baseline is not None else f"{'-':>11}"
+        change_text = f"{change * 100:>+8.1f}%" if change is not None else f"{'-':>9}"
+        print(f"{size:<8}{name:<50}{median:>11.3f}{baseline_text}{change_text}{'  REGRESSION' if regressed else ''}")
+
+    meta = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "dataset_version": DATASET_VERSION,
+        "seed": args.seed,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    if args.update_baseline:
+        for size, benchmarks in results.items():
+            stored["results"].setdefault(size, {}).update(benchmarks)
+        stored["meta"] = meta
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(stored, f, indent=2, sort_keys=True, ensure_ascii=False)
+            f.write("\n")
+        print(f"Baseline updated: {args.baseline}")
+        return
+
+    if stored.get("meta", {}).get("machine") not in (None, meta["machine"]):
+        print(f"Warning: baseline was recorded on {stored['meta']['machine']}, this is {meta['machine']}",
+              file=sys.stderr)
+    regressions = [row for row in rows if row[5]]
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.tolerance * 100:.0f}%", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""
+Replay captured production traffic and compare it with the capture.
+
+Reads the JSONL files written by the capture middleware (CAPTURE_ENABLED=true),
+re-issues every request against a copy of a database (or a fresh one) at the
+captured pace, optionally sped up, and reports per route:
+
+    - captured vs replayed p50/p95/p99 latency
+    - requests whose status code differs from the capture
+    - GET requests whose response body differs from the capture (SHA-256)
+
+For the read check to be meaningful the replay must start from the state the
+database had when the capture started, e.g. a snapshot taken with
+POST /api/admin/backups right before enabling capture (the home_finance-*.db.gz
+file it writes can be passed as is). Reads are compared exactly only up to
+the first successful write: rows written during the replay carry new
+server-set created_at values, so later reads listing them are reported
+separately and do not fail the run. Requests overlapping in the
+replay can also be reordered; --speed 0 --concurrency 1 replays serially.
+Captured durations are measured inside the server and replayed ones at the
+client, so --server inprocess gives the closest latency comparison.
+
+Usage (from backend/):
+    python -m benchmarks.replay /data/capture/requests.jsonl* --database /data/backups/home_finance-20251225T103000123456.db.gz
+    python -m benchmarks.replay capture.jsonl --database snapshot.db --speed 10 --output replay.json
+    python -m benchmarks.replay capture.jsonl --url http://127.0.0.1:8000 --speed 0
+"""
+
+import argparse
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import httpx
+
+from benchmarks.loadtest import free_port, git_commit, percentile, start_uvicorn
+
+# Mismatching requests listed per kind in the report
+MAX_EXAMPLES = 10
+
+
+def load_capture(paths: List[str]) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Read capture files, including rotated ones, in request order.
+
+    Args:
+        paths: Capture JSONL files in any order
+
+    Returns:
+        Tuple of (records sorted by start time, number of unusable lines)
+    """
+    records = []
+    skipped = 0
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line cut short by a crash or a rotation mid-write
+                    skipped += 1
+                    continue
+                if record.get("body_truncated"):
+                    skipped += 1
+                    continue
+                records.append(record)
+    records.sort(key=lambda record: record["ts"])
+    return records, skipped
+
+
+def route_key(record: Dict[str, Any]) -> str:
+    """Report key of a record: method plus route template (or raw path for unmatched requests)"""
+    return f"{record['method']} {record.get('route') or record['path']}"
+
+
+def request_body(record: Dict[str, Any]) -> Optional[bytes]:
+    """Captured request body as bytes"""
+    if "body" in record:
+        return record["body"].encode("utf-8")
+    if "body_b64" in record:
+        return base64.b64decode(record["body_b64"])
+    return None
+
+
+async def replay(
+    client: httpx.AsyncClient,
+    records: List[Dict[str, Any]],
+    speed: float,
+    concurrency: int
+) -> Tuple[List[Dict[str, Any]], float]:
+    """
+    Re-issue captured requests, keeping their relative start times.
+
+    Args:
+        client: HTTP client bound to the target
+        records: Captured records in start order
+        speed: Pace factor (1 = as captured, 10 = ten times faster, 0 = no waiting)
+        concurrency: Most requests in flight at once
+
+    Returns:
+        Tuple of (one result per record, in record order; elapsed seconds)
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(records)
+    slots = asyncio.Semaphore(concurrency)
+    first = records[0]["ts"] if records else 0.0
+
+    async def issue(index: int, record: Dict[str, Any]) -> None:
+        try:
+            started = time.perf_counter()
+            try:
+                response = await client.request(
+                    record["method"],
+                    record["path"] + (f"?{record['query']}" if record["query"] else ""),
+                    content=request_body(record),
+                    headers=record.get("headers") or {}
+                )
+            except Exception as e:
+                # Transport errors, and app exceptions if the transport still raises them
+                results[index] = {
+                    "status": None,
+                    "latency": time.perf_counter() - started,
+                    "error": f"{type(e).__name__}: {e}",
+                }
+                return
+            results[index] = {
+                "status": response.status_code,
+                "latency": time.perf_counter() - started,
+                "sha256": hashlib.sha256(response.content).hexdigest(),
+            }
+        finally:
+            slots.release()
+
+    started = time.perf_counter()
+    tasks = []
+    for index, record in enumerate(records):
+        if speed > 0:
+            delay = (record["ts"] - first) / speed - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await slots.acquire()
+        tasks.append(asyncio.create_task(issue(index, record)))
+    await asyncio.gather(*tasks)
+    return results, time.perf_counter() - started
+
+
+def compare(records: List[Dict[str, Any]], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Compare replayed results with the capture.
+
+    Args:
+        records: Captured records
+        results: Replay results in the same order
+
+    Returns:
+        Dictionary with per-route latency percentiles and the status and body mismatches;
+        body mismatches note whether a successful write was captured before the read
+    """
+    captured: Dict[str, List[float]] = {}
+    replayed: Dict[str, List[float]] = {}
+    status_mismatches = []
+    body_mismatches = []
+    verified_reads = 0
+    written = False
+
+    for record, result in zip(records, results):
+        key = route_key(record)
+        captured.setdefault(key, []).append(record["duration_ms"] / 1000)
+        replayed.setdefault(key, []).append(result["latency"])
+        if result["status"] != record["status"]:
+            status_mismatches.append({
+                "ts": record["ts"], "request": f"{record['method']} {record['path']}",
+                "captured": record["status"], "replayed": result["status"],
+            })
+        elif record.get("response_sha256"):
+            verified_reads += 1
+            if result["sha256"] != record["response_sha256"]:
+                body_mismatches.append({
+                    "ts": record["ts"],
+                    "request": f"{record['method']} {record['path']}"
+                               + (f"?{record['query']}" if record["query"] else ""),
+                    "after_write": written,
+                })
+        if record["method"] not in ("GET", "HEAD") and record["status"] is not None and record["status"] < 400:
+            written = True
+
+    routes = {}
+    for key in sorted(captured):
+        before = sorted(captured[key])
+        after = sorted(replayed[key])
+        routes[key] = {"requests": len(before)}
+        for p in (50, 95, 99):
+            routes[key][f"captured_p{p}_ms"] = round(percentile(before, p) * 1000, 3)
+            routes[key][f"replayed_p{p}_ms"] = round(percentile(after, p) * 1000, 3)
+
+    return {
+        "routes": routes,
+        "verified_reads": verified_reads,
+        "status_mismatches": status_mismatches,
+        "body_mismatches": body_mismatches,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Print the latency table and the mismatches"""
+    print(f"{'route':<44}{'reqs':>6}{'p50 cap':>10}{'p50 rep':>10}{'p95 cap':>10}{'p95 rep':>10}{'p99 cap':>10}{'p99 rep':>10}")
+    for key, r in report["routes"].items():
+        print(f"{key:<44}{r['requests']:>6}"
+              f"{r['captured_p50_ms']:>10.2f}{r['replayed_p50_ms']:>10.2f}"
+              f"{r['captured_p95_ms']:>10.2f}{r['replayed_p95_ms']:>10.2f}"
+              f"{r['captured_p99_ms']:>10.2f}{r['replayed_p99_ms']:>10.2f}")
+
+    statuses = report["status_mismatches"]
+    bodies = report["body_mismatches"]
+    print(f"\nStatus mismatches: {len(statuses)}")
+    for mismatch in statuses[:MAX_EXAMPLES]:
+        print(f"  {mismatch['request']}: captured {mismatch['captured']}, replayed {mismatch['replayed']}")
+    strict = [mismatch for mismatch in bodies if not mismatch["after_write"]]
+    print(f"Read responses verified: {report['verified_reads']}, differing: {len(strict)}"
+          f" (+{len(bodies) - len(strict)} after a write)")
+    for mismatch in bodies[:MAX_EXAMPLES]:
+        print(f"  {mismatch['request']}" + ("  (after a write)" if mismatch["after_write"] else ""))
+
+
+def copy_database(source: str, target: Path) -> None:
+    """
+    Copy a SQLite database consistently (safe while the source is being written).
+
+    Args:
+        source: SQLite file, or a gzip-compressed snapshot (*.gz) from the backup endpoint
+        target: Destination file; a compressed source is decompressed next to it first
+    """
+    if source.endswith(".gz"):
+        decompressed = target.with_name(target.name + ".snapshot")
+        with gzip.open(source, "rb") as compressed, open(decompressed, "wb") as raw:
+            shutil.copyfileobj(compressed, raw)
+        source = str(decompressed)
+    source_connection = sqlite3.connect(f"file:{quote(source)}?mode=ro", uri=True)
+    target_connection = sqlite3.connect(target)
+    try:
+        source_connection.backup(target_connection)
+    finally:
+        target_connection.close()
+        source_connection.close()
+
+
+async def run_in_process(records, args) -> Tuple[List[Dict[str, Any]], float]:
+    # DATABASE_URL is set before this import so the app binds to the replay database
+    from app.database import init_db
+    from app.main import app
+
+    init_db()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    # Unhandled exceptions become 500 responses, as they would under uvicorn
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://replay", timeout=60) as client:
+        return await replay(client, records, args.speed, args.concurrency)
+
+
+async def run_against(url: str, records, args) -> Tuple[List[Dict[str, Any]], float]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=60, limits=limits) as client:
+        return await replay(client, records, args.speed, args.concurrency)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("capture", nargs="+", help="capture JSONL files (rotated ones included)")
+    parser.add_argument("--database", help="SQLite file or backup snapshot (.db.gz) to replay against (copied first; default: a fresh database)")
+    parser.add_argument("--server", choices=["uvicorn", "inprocess"], default="uvicorn",
+                        help="start the app under uvicorn (default) or call it in-process")
+    parser.add_argument("--url", help="replay against an already running server instead")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="pace factor: 1 = as captured, 10 = ten times faster, 0 = no waiting")
+    parser.add_argument("--concurrency", type=int, default=16, help="most requests in flight at once")
+    parser.add_argument("--output", help="write the report to this JSON file")
+    args = parser.parse_args()
+
+    records, skipped = load_capture(args.capture)
+    if not records:
+        parser.error("no replayable records in the capture")
+    span = records[-1]["ts"] - records[0]["ts"]
+    print(f"Replaying {len(records)} requests captured over {span:.0f}s at speed {args.speed:g}"
+          + (f" ({skipped} lines skipped)" if skipped else ""))
+
+    with tempfile.TemporaryDirectory() as directory:
+        process = None
+        try:
+            if args.url:
+                url = args.url.rstrip("/")
+            else:
+                database = Path(directory) / "replay.db"
+                if args.database:
+                    copy_database(args.database, database)
+                database_url = f"sqlite:///{database}"
+                os.environ["DATABASE_URL"] = database_url
+                os.environ.setdefault("LOG_LEVEL", "WARNING")
+                if args.server == "uvicorn":
+                    port = free_port()
+                    process = start_uvicorn(database_url, port)
+                    url = f"http://127.0.0.1:{port}"
+
+            if args.url or args.server == "uvicorn":
+                results, elapsed = asyncio.run(run_against(url, records, args))
+            else:
+                results, elapsed = asyncio.run(run_in_process(records, args))
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=10)
+
+    report = compare(records, results)
+    print(f"Replay took {elapsed:.1f}s\n")
+    print_report(report)
+
+    if args.output:
+        meta = {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "captures": args.capture,
+            "database": args.database,
+            "server": "url" if args.url else args.server,
+            "speed": args.speed,
+            "concurrency": args.concurrency,
+            "elapsed": round(elapsed, 3),
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, **report}, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"Report written to {args.output}")
+
+    if report["status_mismatches"] or any(not mismatch["after_write"] for mismatch in report["body_mismatches"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
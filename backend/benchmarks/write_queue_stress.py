@@ -0,0 +1,133 @@
+"""
+Multi-threaded expense insert stress benchmark.
+
+Runs the same concurrent insert workload against a fresh SQLite file with
+the group-commit write queue enabled and disabled (commit per row), and
+prints latency percentiles, throughput and commit counts.
+
+Usage (from backend/):
+    python -m benchmarks.write_queue_stress --threads 8 --writes 200
+"""
+
+import argparse
+import math
+import tempfile
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Dict, List
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.database import Base
+from app.repositories.expense import ExpenseRepository
+from app.write_queue import get_write_queue
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def run(mode: str, threads: int, writes: int, directory: Path) -> Dict[str, float]:
+    """
+    Run the workload once.
+
+    Args:
+        mode: "queue" (group commit) or "direct" (commit per row)
+        threads: Number of concurrent writer threads
+        writes: Inserts per thread
+        directory: Directory for the temporary database
+
+    Returns:
+        Dictionary of measurements
+    """
+    engine = create_engine(
+        f"sqlite:///{directory / f'{mode}.db'}",
+        connect_args={"check_same_thread": False, "timeout": settings.sqlite_busy_timeout},
+        pool_size=threads,
+        max_overflow=threads
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    settings.write_queue_enabled = mode == "queue"
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker(worker_id: int) -> None:
+        db = SessionLocal()
+        repository = ExpenseRepository(db)
+        local = []
+        barrier.wait()
+        try:
+            for i in range(writes):
+                started = time.perf_counter()
+                try:
+                    repository.create_expense(date(2025, 12, 1 + i % 28), "food", worker_id * writes + i)
+                except Exception:
+                    db.rollback()
+                    with lock:
+                        errors[0] += 1
+                    continue
+                local.append(time.perf_counter() - started)
+        finally:
+            db.close()
+        with lock:
+            latencies.extend(local)
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    write_queue = get_write_queue(engine)
+    latencies.sort()
+    result = {
+        "rows": len(latencies),
+        "errors": errors[0],
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": latencies[-1] * 1000,
+        "commits": write_queue.commits if write_queue else len(latencies),
+        "retries": write_queue.retries if write_queue else 0,
+    }
+    engine.dispose()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8, help="concurrent writer threads")
+    parser.add_argument("--writes", type=int, default=200, help="inserts per thread")
+    parser.add_argument("--mode", choices=["both", "queue", "direct"], default="both")
+    args = parser.parse_args()
+
+    modes = ["direct", "queue"] if args.mode == "both" else [args.mode]
+    enabled = settings.write_queue_enabled
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            print(f"{args.threads} threads x {args.writes} inserts")
+            print(f"{'mode':<8}{'rows':>7}{'errors':>8}{'rows/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+                  f"{'p99 ms':>9}{'max ms':>9}{'commits':>9}{'retries':>9}")
+            for mode in modes:
+                r = run(mode, args.threads, args.writes, Path(directory))
+                print(f"{mode:<8}{r['rows']:>7}{r['errors']:>8}{r['throughput']:>9.0f}{r['p50_ms']:>9.2f}"
+                      f"{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['max_ms']:>9.2f}{r['commits']:>9}{r['retries']:>9}")
+    finally:
+        settings.write_queue_enabled = enabled
+
+
+if __name__ == "__main__":
+    main()
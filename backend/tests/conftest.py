@@ -2,6 +2,7 @@
 
 import pytest
 import os
+from contextlib import contextmanager
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
@@ -11,6 +12,7 @@ from app.main import app
 from app.database import Base, get_db
 import app.database as database_module
 import app.config as config_module
+from app.sql_profiler import capture_queries
 
 
 # Test database URL (local file)
@@ -44,6 +46,26 @@ def test_db():
             os.remove("./test_home_finance.db")
 
 
+@pytest.fixture
+def assert_max_queries():
+    """
+    Assert that a block executes at most `limit` SQL statements.
+    Statements from every thread are counted, so it works around TestClient calls:
+    
+        with assert_max_queries(2):
+            client.get("/api/monthly-budgets?month=2025-12")
+    """
+    @contextmanager
+    def _assert_max_queries(limit):
+        with capture_queries() as profile:
+            yield profile
+        assert profile.count <= limit, (
+            f"Expected at most {limit} queries, got {profile.count}:\n{profile.report()}"
+        )
+    
+    return _assert_max_queries
+
+
 @pytest.fixture(scope="function")
 def client(test_db):
     """Create a test client with test database"""
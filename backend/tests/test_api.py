@@ -1,7 +1,22 @@
 """API endpoint tests"""
 
+import threading
+import time
+
 import pytest
 from datetime import date
+from unittest.mock import patch
+from fastapi import HTTPException
+
+import app.config as config_module
+from app.idempotency import IdempotencyStore, idempotency_store
+from app.metrics import MetricsRegistry, HTTP_REQUESTS, DB_REQUEST_QUERIES
+from app.sql_profiler import QueryProfile, normalize_statement
+from app.profiling import StackSampler, collapse_stats, stack_sampler
+from app.memory import memory_tracker
+from app.tracing import parse_traceparent, tracer
+from app.capture import close_capture
+from app.conditional import write_activity
 
 
 class TestHealthEndpoint:
@@ -14,6 +29,120 @@ class TestHealthEndpoint:
         assert response.json() == {"status": "ok"}
 
 
+class TestMetricsEndpoint:
+    """Test the Prometheus metrics endpoint"""
+    
+    def test_metrics_exposition(self, client):
+        """Test that /metrics serves the text exposition format"""
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE http_request_duration_seconds histogram" in response.text
+        assert "# TYPE db_queries_total counter" in response.text
+    
+    def test_requests_are_labelled_by_route_template(self, client):
+        """Test that request metrics use the route template, not the raw path"""
+        before = HTTP_REQUESTS.value("GET", "/api/expenses/{expense_id}", "404")
+        client.get("/api/expenses/12345")
+        after = HTTP_REQUESTS.value("GET", "/api/expenses/{expense_id}", "404")
+        assert after == before + 1
+        assert 'route="/api/expenses/12345"' not in client.get("/metrics").text
+    
+    def test_sql_is_counted_per_request(self, client):
+        """Test that statements executed during a request are attributed to its route"""
+        before = DB_REQUEST_QUERIES.count("/api/summary")
+        client.get("/api/summary?month=2025-12")
+        assert DB_REQUEST_QUERIES.count("/api/summary") == before + 1
+        
+        text = client.get("/metrics").text
+        line = next(l for l in text.splitlines() if l.startswith('db_queries_per_request_sum{route="/api/summary"}'))
+        assert float(line.split()[-1]) > 0
+    
+    def test_registry_rendering(self):
+        """Test counter, gauge and histogram exposition lines"""
+        registry = MetricsRegistry()
+        counter = registry.counter("jobs_total", "Jobs", ["kind"])
+        gauge = registry.gauge("queue_depth", "Depth")
+        histogram = registry.histogram("job_seconds", "Job latency", buckets=(0.1, 1.0))
+        counter.inc("a")
+        counter.inc("a", amount=2)
+        counter.inc('quote"d')
+        gauge.set(3)
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+        
+        lines = registry.render().splitlines()
+        assert 'jobs_total{kind="a"} 3' in lines
+        assert 'jobs_total{kind="quote\\"d"} 1' in lines
+        assert "queue_depth 3" in lines
+        assert 'job_seconds_bucket{le="0.1"} 1' in lines
+        assert 'job_seconds_bucket{le="1"} 2' in lines
+        assert 'job_seconds_bucket{le="+Inf"} 3' in lines
+        assert "job_seconds_count 3" in lines
+        
+        with pytest.raises(ValueError):
+            registry.counter("jobs_total", "Duplicate")
+
+
+class TestSqlProfiler:
+    """Test the per-request SQL profiler"""
+    
+    def test_server_timing_header_when_enabled(self, client):
+        """Test that profiled responses carry db and app timings"""
+        with patch.object(config_module.settings, 'sql_profiler_enabled', True):
+            response = client.get("/api/summary?month=2025-12")
+        
+        timing = response.headers["Server-Timing"]
+        assert timing.startswith("db;dur=")
+        assert "queries" in timing
+        assert "app;dur=" in timing
+    
+    def test_no_header_when_disabled(self, client):
+        """Test that the profiler is off by default"""
+        response = client.get("/api/summary?month=2025-12")
+        assert "Server-Timing" not in response.headers
+    
+    def test_repeated_statement_is_reported(self, client, caplog):
+        """Test that a statement shape repeated past the threshold is logged as a possible N+1"""
+        with patch.object(config_module.settings, 'sql_profiler_enabled', True), \
+                patch.object(config_module.settings, 'sql_profiler_repeat_threshold', 0):
+            client.get("/api/summary?month=2025-12")
+        assert "Possible N+1 in GET /api/summary" in caplog.text
+    
+    def test_monthly_budgets_use_single_query(self, client, test_db, assert_max_queries):
+        """Test that listing monthly budgets does not query categories per row"""
+        from app.services.category import CategoryService
+        CategoryService(test_db).initialize_default_categories()
+        for category_id in ("food", "housing", "utilities", "medical"):
+            client.post("/api/monthly-budgets", json={"month": "2025-12", "category_id": category_id, "amount": 1000})
+        
+        with assert_max_queries(1):
+            response = client.get("/api/monthly-budgets?month=2025-12")
+        assert len(response.json()) == 4
+        
+        with assert_max_queries(1):
+            response = client.get("/api/monthly-budgets?month=2025-12&category_type=fixed")
+        assert {b["category_id"] for b in response.json()} == {"housing", "utilities"}
+    
+    def test_normalize_statement(self):
+        """Test that literals, IN lists and whitespace are normalized"""
+        assert normalize_statement(
+            "SELECT * FROM expenses\n  WHERE id = 42 AND memo = 'it''s' AND category IN (?, ?, ?)"
+        ) == "SELECT * FROM expenses WHERE id = ? AND memo = ? AND category IN (?...)"
+    
+    def test_profile_groups_by_shape(self):
+        """Test that statements with different literals are counted as one shape"""
+        profile = QueryProfile()
+        for expense_id in range(3):
+            profile.record(f"SELECT * FROM expenses WHERE id = {expense_id}", 0.001)
+        profile.record("SELECT * FROM categories", 0.002)
+        
+        assert profile.count == 4
+        assert profile.repeated(2) == {"SELECT * FROM expenses WHERE id = ?": 3}
+        assert profile.slowest(1)[0]["statement"] == "SELECT * FROM expenses WHERE id = ?"
+
+
 class TestBudgetEndpoints:
     """Test budget API endpoints"""
     
@@ -300,6 +429,934 @@ class TestExpenseEndpoints:
         # Verify it's deleted
         get_response = client.get(f"/api/expenses/{expense_id}")
         assert get_response.status_code == 404
+    
+    def test_get_expense_page(self, client):
+        """Test paging through a month's expenses in a stable sort order"""
+        for day, amount in enumerate([500, 300, 300, 900, 100], start=1):
+            client.post("/api/expenses", json={
+                "date": f"2025-12-{day:02d}",
+                "category": "食費" if day % 2 else "日用品",
+                "amount": amount
+            })
+        client.post("/api/expenses", json={"date": "2025-11-30", "category": "食費", "amount": 700})
+        
+        pages = [
+            client.get(f"/api/expenses/page?month=2025-12&sort=amount&order=asc&offset={offset}&limit=2").json()
+            for offset in (0, 2, 4)
+        ]
+        assert [page["total"] for page in pages] == [5, 5, 5]
+        assert [[item["amount"] for item in page["items"]] for page in pages] == [[100, 300], [300, 500], [900]]
+        # Equal amounts are ordered by ID
+        assert pages[0]["items"][1]["id"] < pages[1]["items"][0]["id"]
+        assert pages[2]["offset"] == 4 and pages[2]["limit"] == 2
+        
+        response = client.get("/api/expenses/page?month=2025-12&category=食費")
+        data = response.json()
+        assert data["total"] == 3
+        assert [item["date"] for item in data["items"]] == ["2025-12-05", "2025-12-03", "2025-12-01"]
+    
+    def test_get_expense_page_rejects_unknown_sort(self, client):
+        """Test that only known columns can be sorted by"""
+        response = client.get("/api/expenses/page?sort=memo")
+        assert response.status_code == 422
+        response = client.get("/api/expenses/page?limit=0")
+        assert response.status_code == 422
+    
+    def test_bulk_delete_expenses(self, client):
+        """Test deleting several expenses in one request"""
+        ids = [
+            client.post("/api/expenses", json={
+                "date": "2025-12-25",
+                "category": "食費",
+                "amount": amount
+            }).json()["id"]
+            for amount in (100, 200, 300)
+        ]
+        
+        response = client.post("/api/expenses/bulk-delete", json={"ids": [ids[0], ids[2], 999]})
+        assert response.status_code == 200
+        assert response.json() == {"deleted": [ids[0], ids[2]], "not_found": [999], "archived": []}
+        
+        remaining = client.get("/api/expenses?month=2025-12").json()
+        assert [expense["id"] for expense in remaining] == [ids[1]]
+        
+        # Repeating the request deletes nothing more
+        response = client.post("/api/expenses/bulk-delete", json={"ids": [ids[0]]})
+        assert response.json()["not_found"] == [ids[0]]
+        
+        response = client.post("/api/expenses/bulk-delete", json={"ids": []})
+        assert response.status_code == 422
+
+
+class TestAnomalyEndpoints:
+    """Test anomaly API endpoints"""
+    
+    def test_get_anomalies(self, client):
+        """Test getting flagged days for a month"""
+        for day, amount in enumerate([1000, 1200, 900, 1100, 1000, 1050], start=20):
+            client.post("/api/expenses", json={
+                "date": f"2025-11-{day:02d}",
+                "category": "food",
+                "amount": amount
+            })
+        client.post("/api/expenses", json={
+            "date": "2025-12-03",
+            "category": "food",
+            "amount": 20000
+        })
+        
+        response = client.get("/api/anomalies?month=2025-12")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["month"] == "2025-12"
+        assert len(data["anomalies"]) == 1
+        assert data["anomalies"][0]["date"] == "2025-12-03"
+    
+    def test_create_expense_anomaly_flag(self, client):
+        """Test that the created expense carries the anomaly flag"""
+        for day in range(1, 7):
+            client.post("/api/expenses", json={
+                "date": f"2025-12-{day:02d}",
+                "category": "food",
+                "amount": 1000
+            })
+        
+        response = client.post("/api/expenses", json={
+            "date": "2025-12-07",
+            "category": "food",
+            "amount": 1000
+        })
+        assert response.status_code == 201
+        assert response.json()["is_anomaly"] is False
+        
+        response = client.post("/api/expenses", json={
+            "date": "2025-12-08",
+            "category": "food",
+            "amount": 50000
+        })
+        assert response.status_code == 201
+        assert response.json()["is_anomaly"] is True
+
+
+class TestImportEndpoints:
+    """Test CSV import API endpoints"""
+    
+    def _seed_categories(self):
+        """Initialize default categories in the test database"""
+        from app.services.category import CategoryService
+        from app.database import get_db
+        
+        db = next(get_db())
+        CategoryService(db).initialize_default_categories()
+        db.close()
+    
+    def test_import_csv(self, client):
+        """Test importing a CSV statement"""
+        self._seed_categories()
+        body = "date,category,amount,memo\n2025-12-01,food,1200,スーパー\n2025-12-02,food,oops,\n"
+        
+        response = client.post(
+            "/api/import/csv",
+            content=body.encode("utf-8"),
+            headers={"Content-Type": "text/csv"}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["imported"] == 1
+        assert data["error_count"] == 1
+        assert data["errors"][0]["line"] == 3
+        
+        response = client.get("/api/expenses?month=2025-12")
+        assert len(response.json()) == 1
+    
+    def test_import_csv_dry_run(self, client):
+        """Test that dry-run does not write"""
+        self._seed_categories()
+        body = "date,category,amount\n2025-12-01,food,1200\n"
+        
+        response = client.post("/api/import/csv?dry_run=true", content=body.encode("utf-8"))
+        assert response.status_code == 200
+        assert response.json()["imported"] == 1
+        
+        response = client.get("/api/expenses?month=2025-12")
+        assert response.json() == []
+    
+    def test_import_csv_does_not_block_other_requests(self, client):
+        """Test that other requests are served while an import is running"""
+        from app.services.csv_import import CsvImportService
+        self._seed_categories()
+        started = threading.Event()
+        release = threading.Event()
+        finished = threading.Event()
+        original = CsvImportService.import_csv
+        
+        def slow_import(service, *args, **kwargs):
+            started.set()
+            release.wait(5)
+            try:
+                return original(service, *args, **kwargs)
+            finally:
+                finished.set()
+        
+        responses = []
+        body = "date,category,amount\n2025-12-01,food,1200\n".encode("utf-8")
+        with patch.object(CsvImportService, "import_csv", slow_import):
+            worker = threading.Thread(target=lambda: responses.append(client.post("/api/import/csv", content=body)))
+            worker.start()
+            try:
+                assert started.wait(5)
+                response = client.get("/health")
+                served_during_import = not finished.is_set()
+            finally:
+                release.set()
+                worker.join()
+        
+        assert response.status_code == 200
+        assert served_during_import
+        assert responses[0].json()["imported"] == 1
+    
+    def test_import_csv_bad_amounts_are_row_errors(self, client):
+        """Test that infinite and oversized amounts are reported per row instead of failing the import"""
+        self._seed_categories()
+        body = "date,category,amount\n2025-12-01,food,Infinity\n2025-12-02,food,1e30\n2025-12-03,food,500\n"
+        
+        response = client.post("/api/import/csv", content=body.encode("utf-8"))
+        assert response.status_code == 200
+        data = response.json()
+        assert data["imported"] == 1
+        assert [e["line"] for e in data["errors"]] == [2, 3]
+    
+    def test_import_csv_unknown_profile(self, client):
+        """Test that an unknown profile returns 400"""
+        response = client.post("/api/import/csv?profile=nope", content=b"date,amount\n")
+        assert response.status_code == 400
+
+
+class TestCpuProfiler:
+    """Test ?__profile=1 requests and the stack sampler"""
+    
+    headers = {"X-Admin-Token": "secret"}
+    
+    def test_profile_query_ignored_when_disabled(self, client):
+        """Test that ?__profile=1 is a no-op unless profiling is enabled"""
+        with patch.object(config_module.settings, 'admin_token', "secret"):
+            response = client.get("/api/summary?month=2025-12&__profile=1", headers=self.headers)
+        assert response.status_code == 200
+        assert "functions" not in response.json()
+    
+    def test_profile_requires_admin_token(self, client):
+        """Test that profiling a request needs a valid admin token"""
+        with patch.object(config_module.settings, 'profiling_enabled', True), \
+                patch.object(config_module.settings, 'admin_token', "secret"):
+            response = client.get("/api/summary?month=2025-12&__profile=1", headers={"X-Admin-Token": "wrong"})
+        assert response.status_code == 401
+    
+    def test_profile_returns_top_functions(self, client):
+        """Test that a profiled request returns functions ranked by cumulative time"""
+        with patch.object(config_module.settings, 'profiling_enabled', True), \
+                patch.object(config_module.settings, 'admin_token', "secret"):
+            response = client.get("/api/summary?month=2025-12&__profile=1", headers=self.headers)
+        
+        assert response.status_code == 200
+        assert response.headers["X-Profiled-Status"] == "200"
+        profile = response.json()
+        assert profile["request"] == "GET /api/summary"
+        assert profile["total_calls"] > 0
+        cumulative = [f["cumtime_ms"] for f in profile["functions"]]
+        assert cumulative == sorted(cumulative, reverse=True)
+        assert any("calculate_summary" in f["function"] for f in profile["functions"])
+    
+    def test_profile_collapsed_format(self, client):
+        """Test that collapsed stacks are returned as "frame;frame count" lines"""
+        with patch.object(config_module.settings, 'profiling_enabled', True), \
+                patch.object(config_module.settings, 'admin_token', "secret"):
+            response = client.get(
+                "/api/summary?month=2025-12&__profile=1&__profile_format=collapsed",
+                headers=self.headers
+            )
+        
+        assert response.headers["content-type"].startswith("text/plain")
+        lines = response.text.strip().splitlines()
+        assert lines
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            assert int(count) > 0
+        assert any("calculate_summary" in line for line in lines)
+    
+    def test_collapse_stats_splits_time_by_caller(self):
+        """Test that a shared callee's own time is split across its callers"""
+        main, a, b, leaf = ("m.py", 1, "main"), ("m.py", 5, "a"), ("m.py", 9, "b"), ("m.py", 13, "leaf")
+        stats = {
+            main: (1, 1, 0.0, 4.0, {}),
+            a: (1, 1, 0.0, 3.0, {main: (1, 1, 0.0, 3.0)}),
+            b: (1, 1, 0.0, 1.0, {main: (1, 1, 0.0, 1.0)}),
+            leaf: (2, 2, 4.0, 4.0, {a: (1, 1, 3.0, 3.0), b: (1, 1, 1.0, 1.0)}),
+        }
+        stacks = collapse_stats(stats)
+        assert stacks["main (m.py:1);a (m.py:5);leaf (m.py:13)"] == pytest.approx(3.0)
+        assert stacks["main (m.py:1);b (m.py:9);leaf (m.py:13)"] == pytest.approx(1.0)
+    
+    def test_sampler_endpoints(self, client):
+        """Test starting, stopping and reading the stack sampler"""
+        with patch.object(config_module.settings, 'profiling_enabled', True), \
+                patch.object(config_module.settings, 'admin_token', "secret"):
+            response = client.post("/api/admin/profiler/sampler?seconds=5&interval=0.001", headers=self.headers)
+            assert response.status_code == 202
+            assert response.json()["running"] is True
+            
+            response = client.post("/api/admin/profiler/sampler?seconds=5", headers=self.headers)
+            assert response.status_code == 409
+            
+            for _ in range(5):
+                client.get("/api/summary?month=2025-12")
+            response = client.delete("/api/admin/profiler/sampler", headers=self.headers)
+            assert response.json()["running"] is False
+            assert response.json()["samples"] > 0
+            
+            response = client.get("/api/admin/profiler/sampler?format=collapsed", headers=self.headers)
+            assert response.text.strip()
+            assert response.text.startswith("thread:")
+    
+    def test_sampler_disabled(self, client):
+        """Test that sampler endpoints are rejected unless profiling is enabled"""
+        with patch.object(config_module.settings, 'admin_token', "secret"):
+            response = client.get("/api/admin/profiler/sampler", headers=self.headers)
+        assert response.status_code == 403
+    
+    def test_sampler_rejects_long_runs(self, client):
+        """Test that runs longer than the configured maximum are rejected"""
+        with patch.object(config_module.settings, 'profiling_enabled', True), \
+                patch.object(config_module.settings, 'admin_token', "secret"):
+            response = client.post("/api/admin/profiler/sampler?seconds=100000", headers=self.headers)
+        assert response.status_code == 400
+        assert not stack_sampler.running
+    
+    def test_sampler_aggregates_busy_thread(self):
+        """Test that a busy thread's function dominates the sampled profile"""
+        stop = threading.Event()
+        
+        def busy_loop():
+            while not stop.is_set():
+                sum(range(1000))
+        
+        worker = threading.Thread(target=busy_loop, name="busy")
+        worker.start()
+        sampler = StackSampler()
+        try:
+            sampler.start(0.3, 0.002)
+            time.sleep(0.3)
+            sampler.stop()
+        finally:
+            stop.set()
+            worker.join()
+        
+        profile = sampler.as_dict()
+        busy = next(f for f in profile["functions"] if f["function"].startswith("busy_loop"))
+        assert busy["total_samples"] > 0
+        assert any(stack.startswith("thread:busy;") for stack in sampler.samples)
+    
+    def test_sampler_can_be_read_while_running(self):
+        """Test that the profile can be aggregated repeatedly while the sampler is still adding stacks"""
+        sampler = StackSampler()
+        sampler.start(0.3, 0.001)
+        try:
+            while sampler.running:
+                profile = sampler.as_dict()
+                sampler.collapsed()
+                assert profile["samples"] >= 0
+        finally:
+            sampler.stop()
+        
+        assert sampler.as_dict()["samples"] == sampler.sample_count
+
+
+class TestMemoryEndpoints:
+    """Test memory introspection admin endpoints"""
+    
+    headers = {"X-Admin-Token": "secret"}
+    
+    @pytest.fixture(autouse=True)
+    def admin_token(self):
+        with patch.object(config_module.settings, 'admin_token', "secret"):
+            yield
+        memory_tracker.stop()
+    
+    def test_status_reports_rss_sessions_and_gc(self, client, test_db):
+        """Test that the status includes RSS, live session identity maps and GC stats"""
+        client.post("/api/expenses", json={"date": "2025-12-01", "category": "food", "amount": 1000})
+        from app.models import Expense
+        loaded = test_db.query(Expense).all()
+        
+        response = client.get("/api/admin/memory", headers=self.headers)
+        assert response.status_code == 200
+        status = response.json()
+        assert status["peak_rss_bytes"] > 0
+        assert status["tracemalloc"]["tracing"] is False
+        assert len(status["gc"]["generations"]) == 3
+        assert any(s["identity_map_size"] >= len(loaded) for s in status["sessions"])
+    
+    def test_snapshot_requires_tracing(self, client):
+        """Test that snapshots are rejected until tracemalloc is started"""
+        response = client.post("/api/admin/memory/snapshots?name=before", headers=self.headers)
+        assert response.status_code == 409
+    
+    def test_snapshot_diff_finds_growth(self, client):
+        """Test that memory retained between two snapshots shows up at its allocation line"""
+        response = client.post("/api/admin/memory/tracemalloc/start", headers=self.headers)
+        assert response.json()["tracemalloc"]["tracing"] is True
+        client.post("/api/admin/memory/snapshots?name=before", headers=self.headers)
+        
+        retained = [bytearray(1024) for _ in range(1000)]
+        response = client.post("/api/admin/memory/snapshots?name=after", headers=self.headers)
+        assert response.status_code == 201
+        
+        response = client.get("/api/admin/memory/diff?base=before&target=after", headers=self.headers)
+        growth = response.json()[0]
+        assert "test_api.py" in growth["location"]
+        assert growth["size_diff_bytes"] >= 1000 * 1024
+        assert growth["count_diff"] >= 1000
+        
+        response = client.get("/api/admin/memory/top?snapshot=after&limit=5", headers=self.headers)
+        assert any("test_api.py" in site["location"] for site in response.json())
+        
+        response = client.get("/api/admin/memory/snapshots", headers=self.headers)
+        assert [s["name"] for s in response.json()] == ["before", "after"]
+        del retained
+    
+    def test_unknown_snapshot(self, client):
+        """Test that diffing against an unknown snapshot returns 400"""
+        client.post("/api/admin/memory/tracemalloc/start", headers=self.headers)
+        response = client.get("/api/admin/memory/diff?base=missing", headers=self.headers)
+        assert response.status_code == 400
+    
+    def test_rss_metric(self, client):
+        """Test that resident memory is exported on /metrics"""
+        response = client.get("/metrics")
+        assert "process_resident_memory_bytes " in response.text
+
+
+class TestTracing:
+    """Test trace propagation, spans and the /debug/traces viewer"""
+    
+    headers = {"X-Admin-Token": "secret"}
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    traceparent = f"00-{trace_id}-00f067aa0ba902b7-01"
+    
+    @pytest.fixture(autouse=True)
+    def tracing_enabled(self):
+        tracer.buffer.clear()
+        with patch.object(config_module.settings, 'tracing_enabled', True), \
+                patch.object(config_module.settings, 'admin_token', "secret"):
+            yield
+        tracer.buffer.clear()
+    
+    def test_parse_traceparent(self):
+        """Test that only well-formed traceparent headers are accepted"""
+        assert parse_traceparent(self.traceparent) == (self.trace_id, "00f067aa0ba902b7")
+        assert parse_traceparent("00-" + "0" * 32 + "-00f067aa0ba902b7-01") is None
+        assert parse_traceparent("garbage") is None
+        assert parse_traceparent(None) is None
+    
+    def test_request_joins_caller_trace(self, client):
+        """Test that the server span continues the caller's trace with db.query children"""
+        response = client.get("/api/summary?month=2025-12", headers={"traceparent": self.traceparent})
+        assert response.headers["traceresponse"].startswith(f"00-{self.trace_id}-")
+        
+        trace = client.get(f"/debug/traces/{self.trace_id}", headers=self.headers).json()
+        assert trace["root"] == "GET /api/summary"
+        assert trace["remote_parent_id"] == "00f067aa0ba902b7"
+        server = next(s for s in trace["spans"] if s["kind"] == "server")
+        assert server["attributes"]["http.status_code"] == 200
+        queries = [s for s in trace["spans"] if s["name"] == "db.query"]
+        assert queries
+        assert all(q["parent_id"] == server["span_id"] for q in queries)
+        assert any("FROM" in q["attributes"]["db.statement"] for q in queries)
+    
+    def test_new_trace_without_header(self, client):
+        """Test that requests without traceparent start their own trace"""
+        response = client.get("/health")
+        trace_id = response.headers["traceresponse"].split("-")[1]
+        assert trace_id != self.trace_id
+        
+        traces = client.get("/debug/traces", headers=self.headers).json()
+        assert traces[0]["trace_id"] == trace_id
+        assert traces[0]["remote_parent_id"] is None
+    
+    def test_expense_write_is_traced(self, client):
+        """Test that a create records the wait for the group commit"""
+        client.post(
+            "/api/expenses",
+            json={"date": "2025-12-01", "category": "food", "amount": 1000},
+            headers={"traceparent": self.traceparent}
+        )
+        trace = client.get(f"/debug/traces/{self.trace_id}?format=text", headers=self.headers)
+        assert "POST /api/expenses" in trace.text
+        assert "write_queue.wait" in trace.text
+    
+    def test_disabled_by_default(self, client):
+        """Test that no spans are recorded and the viewer is off when tracing is disabled"""
+        with patch.object(config_module.settings, 'tracing_enabled', False):
+            response = client.get("/health", headers={"traceparent": self.traceparent})
+            assert "traceresponse" not in response.headers
+            assert client.get("/debug/traces", headers=self.headers).status_code == 403
+        assert len(tracer.buffer) == 0
+    
+    def test_jsonl_export(self, client, tmp_path):
+        """Test that spans are appended to the JSONL file when configured"""
+        import json
+        path = tmp_path / "spans.jsonl"
+        with patch.object(config_module.settings, 'tracing_jsonl_path', str(path)):
+            client.get("/api/summary?month=2025-12", headers={"traceparent": self.traceparent})
+        tracer.flush()
+        
+        spans = [json.loads(line) for line in path.read_text().splitlines()]
+        assert {span["trace_id"] for span in spans} == {self.trace_id}
+        assert any(span["kind"] == "server" for span in spans)
+    
+    def test_jsonl_export_runs_off_the_request_thread(self, client, tmp_path):
+        """Test that span lines are written by the writer thread and follow a changed path"""
+        import builtins
+        import json
+        first, second = tmp_path / "first.jsonl", tmp_path / "second.jsonl"
+        writers = set()
+        real_open = builtins.open
+        
+        def recording_open(file, *args, **kwargs):
+            if str(file).endswith(".jsonl"):
+                writers.add(threading.current_thread().name)
+            return real_open(file, *args, **kwargs)
+        
+        with patch("builtins.open", recording_open):
+            with patch.object(config_module.settings, 'tracing_jsonl_path', str(first)):
+                client.get("/health")
+                tracer.flush()
+            with patch.object(config_module.settings, 'tracing_jsonl_path', str(second)):
+                client.get("/health")
+                tracer.flush()
+        
+        assert writers == {"trace-writer"}
+        assert len(first.read_text().splitlines()) == 1
+        assert json.loads(second.read_text())["name"] == "GET /health"
+    
+    def test_unknown_trace(self, client):
+        """Test that an unknown trace ID returns 404"""
+        response = client.get("/debug/traces/" + "a" * 32, headers=self.headers)
+        assert response.status_code == 404
+
+
+class TestTrafficCapture:
+    """Test the opt-in capture of requests for replay"""
+    
+    @pytest.fixture
+    def capture_path(self, tmp_path):
+        path = tmp_path / "capture" / "requests.jsonl"
+        with patch.object(config_module.settings, 'capture_enabled', True), \
+                patch.object(config_module.settings, 'capture_path', str(path)):
+            yield path
+        close_capture()
+    
+    @staticmethod
+    def read_records(path):
+        import json
+        close_capture()
+        return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    
+    def test_records_request_and_response(self, client, capture_path):
+        """Test that method, path, query, route, body, status and a read digest are recorded"""
+        import hashlib
+        import json
+        summary = client.get("/api/summary?month=2025-12")
+        client.post(
+            "/api/expenses",
+            json={"date": "2025-12-01", "category": "food", "amount": 1000, "memo": "昼食"},
+            headers={"Idempotency-Key": "capture-test"}
+        )
+        
+        read, write = self.read_records(capture_path)
+        assert read["method"] == "GET"
+        assert read["path"] == "/api/summary"
+        assert read["query"] == "month=2025-12"
+        assert read["route"] == "/api/summary"
+        assert read["status"] == 200
+        assert read["duration_ms"] > 0
+        assert read["response_sha256"] == hashlib.sha256(summary.content).hexdigest()
+        assert write["status"] == 201
+        assert json.loads(write["body"])["memo"] == "昼食"
+        assert write["headers"]["idempotency-key"] == "capture-test"
+        assert "response_sha256" not in write
+    
+    def test_admin_and_diagnostics_not_recorded(self, client, capture_path):
+        """Test that admin requests (carrying the token) and health checks are never captured"""
+        with patch.object(config_module.settings, 'admin_token', "secret"):
+            client.get("/api/admin/memory", headers={"X-Admin-Token": "secret"})
+        client.get("/health")
+        client.get("/api/categories")
+        
+        assert [r["path"] for r in self.read_records(capture_path)] == ["/api/categories"]
+    
+    def test_rotation(self, client, capture_path):
+        """Test that the capture rotates at capture_max_bytes"""
+        with patch.object(config_module.settings, 'capture_max_bytes', 600):
+            for _ in range(10):
+                client.get("/api/categories")
+            close_capture()
+        
+        assert (capture_path.parent / "requests.jsonl.1").exists()
+    
+    @staticmethod
+    def run_middleware(chunks):
+        """Send a POST whose body arrives in chunks through CaptureMiddleware on an event loop"""
+        import asyncio
+        from app.capture import CaptureMiddleware
+        
+        async def app(scope, receive, send):
+            while (await receive()).get("more_body"):
+                pass
+            await send({"type": "http.response.start", "status": 201, "headers": []})
+            await send({"type": "http.response.body", "body": b"{}"})
+        
+        messages = [
+            {"type": "http.request", "body": chunk, "more_body": index < len(chunks) - 1}
+            for index, chunk in enumerate(chunks)
+        ]
+        
+        async def receive():
+            return messages.pop(0)
+        
+        async def send(message):
+            pass
+        
+        scope = {"type": "http", "method": "POST", "path": "/api/expenses", "query_string": b"", "headers": []}
+        asyncio.run(CaptureMiddleware(app)(scope, receive, send))
+    
+    def test_truncated_body_is_a_prefix(self, capture_path):
+        """Test that a body over capture_max_body_bytes is cut once and later chunks are not appended"""
+        with patch.object(config_module.settings, 'capture_max_body_bytes', 10):
+            self.run_middleware([b"aaaaaa", b"bbbbbbbbbb", b"cc"])
+        
+        record, = self.read_records(capture_path)
+        assert record["body"] == "aaaaaabbbb"
+        assert record["body_truncated"] is True
+    
+    def test_records_are_written_off_the_event_loop(self, capture_path):
+        """Test that the capture file is written by the writer thread, not the request's thread"""
+        import app.capture as capture_module
+        threads = []
+        original = capture_module._capture_logger
+        
+        def spy():
+            threads.append(threading.current_thread().name)
+            return original()
+        
+        with patch.object(capture_module, '_capture_logger', spy):
+            self.run_middleware([b"{}"])
+            close_capture()
+        
+        assert threads == ["capture-writer"]
+        assert [r["body"] for r in self.read_records(capture_path)] == ["{}"]
+    
+    def test_disabled_by_default(self, client, tmp_path):
+        """Test that nothing is written unless capture is enabled"""
+        path = tmp_path / "requests.jsonl"
+        with patch.object(config_module.settings, 'capture_path', str(path)):
+            client.get("/api/categories")
+        assert not path.exists()
+    
+    def test_replay_matches_captured_reads(self, client, capture_path):
+        """Test that replaying captured reads against the same data reproduces them"""
+        import asyncio
+        import httpx
+        from benchmarks.replay import compare, replay
+        from app.main import app
+        
+        client.get("/api/summary?month=2025-12")
+        client.get("/api/expenses?month=2025-12")
+        client.get("/api/does-not-exist")
+        records = self.read_records(capture_path)
+        
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://replay") as replay_client:
+                return await replay(replay_client, records, speed=0, concurrency=1)
+        
+        with patch.object(config_module.settings, 'capture_enabled', False):
+            results, _ = asyncio.run(run())
+        report = compare(records, results)
+        
+        assert report["verified_reads"] == 3
+        assert report["status_mismatches"] == []
+        assert report["body_mismatches"] == []
+        assert set(report["routes"]) == {"GET /api/summary", "GET /api/expenses", "GET /api/does-not-exist"}
+    
+    def test_replay_records_failures_as_results(self):
+        """Test that a request the client cannot complete still yields a result for compare()"""
+        import asyncio
+        import httpx
+        from benchmarks.replay import compare, replay
+        
+        def fail(request):
+            raise RuntimeError("boom")
+        
+        records = [{"ts": 0.0, "method": "GET", "path": "/api/categories", "query": "",
+                    "status": 200, "duration_ms": 1.0}]
+        
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(fail), base_url="http://replay") as replay_client:
+                return await replay(replay_client, records, speed=0, concurrency=1)
+        
+        results, _ = asyncio.run(run())
+        assert results[0]["status"] is None
+        assert results[0]["error"] == "RuntimeError: boom"
+        assert compare(records, results)["status_mismatches"][0]["replayed"] is None
+    
+    def test_copy_database_decompresses_snapshots(self, tmp_path):
+        """Test that a gzip-compressed backup snapshot is decompressed before copying"""
+        import gzip
+        import shutil
+        import sqlite3
+        from benchmarks.replay import copy_database
+        
+        source = tmp_path / "snap shot.db"
+        connection = sqlite3.connect(source)
+        connection.execute("CREATE TABLE t (x INTEGER)")
+        connection.execute("INSERT INTO t VALUES (42)")
+        connection.commit()
+        connection.close()
+        snapshot = tmp_path / "home_finance-20251225T103000123456.db.gz"
+        with open(source, "rb") as raw, gzip.open(snapshot, "wb") as compressed:
+            shutil.copyfileobj(raw, compressed)
+        
+        target = tmp_path / "replay" / "replay.db"
+        target.parent.mkdir()
+        copy_database(str(snapshot), target)
+        
+        connection = sqlite3.connect(target)
+        assert connection.execute("SELECT x FROM t").fetchall() == [(42,)]
+        connection.close()
+
+
+class TestConditionalGet:
+    """Test ETags, 304 responses and poll interval hints"""
+    
+    @pytest.fixture(autouse=True)
+    def reset_activity(self):
+        write_activity.reset()
+        yield
+        write_activity.reset()
+    
+    def test_not_modified_until_data_changes(self, client):
+        """Test that a matching If-None-Match gets an empty 304 until a write changes the summary"""
+        first = client.get("/api/summary?month=2025-12")
+        etag = first.headers["etag"]
+        assert first.headers["cache-control"] == "no-cache"
+        
+        cached = client.get("/api/summary?month=2025-12", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+        
+        client.post("/api/expenses", json={"date": "2025-12-01", "category": "food", "amount": 1000})
+        changed = client.get("/api/summary?month=2025-12", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+        assert changed.json()["total_spent"] == 1000
+    
+    def test_weak_and_listed_validators_match(self, client):
+        """Test weak comparison against a list of ETags"""
+        etag = client.get("/api/categories").headers["etag"]
+        response = client.get("/api/categories", headers={"If-None-Match": f'"other", W/{etag}'})
+        assert response.status_code == 304
+    
+    def test_errors_and_admin_not_tagged(self, client):
+        """Test that error responses and admin endpoints carry no ETag"""
+        assert "etag" not in client.get("/api/summary?month=invalid").headers
+        with patch.object(config_module.settings, 'admin_token', "secret"):
+            assert "etag" not in client.get("/api/admin/memory", headers={"X-Admin-Token": "secret"}).headers
+    
+    def test_poll_hint_after_write(self, client):
+        """Test that X-Poll-Interval is sent only within the window after a successful write"""
+        assert "x-poll-interval" not in client.get("/api/summary?month=2025-12").headers
+        
+        client.post("/api/expenses", json={"date": "2025-12-01", "category": "food", "amount": -1})
+        assert "x-poll-interval" not in client.get("/api/summary?month=2025-12").headers
+        
+        client.post("/api/expenses", json={"date": "2025-12-01", "category": "food", "amount": 1000})
+        response = client.get("/api/summary?month=2025-12")
+        assert response.headers["x-poll-interval"] == str(config_module.settings.poll_hint_interval)
+        
+        with patch.object(config_module.settings, 'poll_hint_window', 0.0):
+            assert "x-poll-interval" not in client.get("/api/summary?month=2025-12").headers
+
+
+class TestBackupEndpoints:
+    """Test backup admin API endpoints"""
+    
+    def test_admin_disabled_without_token(self, client):
+        """Test that admin endpoints are disabled when no token is configured"""
+        with patch.object(config_module.settings, 'admin_token', None):
+            response = client.get("/api/admin/backups")
+        assert response.status_code == 403
+    
+    def test_admin_rejects_wrong_token(self, client):
+        """Test that a wrong admin token is rejected"""
+        with patch.object(config_module.settings, 'admin_token', "secret"):
+            response = client.get("/api/admin/backups", headers={"X-Admin-Token": "wrong"})
+        assert response.status_code == 401
+    
+    def test_create_list_and_restore_backup(self, client, tmp_path):
+        """Test the backup lifecycle through the API"""
+        headers = {"X-Admin-Token": "secret"}
+        client.post("/api/expenses", json={"date": "2025-12-01", "category": "food", "amount": 1000})
+        
+        with patch.object(config_module.settings, 'admin_token', "secret"), \
+                patch.object(config_module.settings, 'backup_dir', str(tmp_path)):
+            response = client.post("/api/admin/backups", headers=headers)
+            assert response.status_code == 201
+            name = response.json()["name"]
+            assert response.json()["bytes_copied"] > 0
+            
+            client.post("/api/expenses", json={"date": "2025-12-02", "category": "food", "amount": 2000})
+            
+            response = client.get("/api/admin/backups", headers=headers)
+            assert name in [b["name"] for b in response.json()]
+            
+            response = client.post(f"/api/admin/backups/{name}/restore", headers=headers)
+            assert response.status_code == 200
+        
+        response = client.get("/api/expenses?month=2025-12")
+        assert [e["amount"] for e in response.json()] == [1000]
+    
+    def test_restore_unknown_backup(self, client, tmp_path):
+        """Test that restoring an unknown snapshot returns 400"""
+        with patch.object(config_module.settings, 'admin_token', "secret"), \
+                patch.object(config_module.settings, 'backup_dir', str(tmp_path)):
+            response = client.post(
+                "/api/admin/backups/missing.db.gz/restore",
+                headers={"X-Admin-Token": "secret"}
+            )
+        assert response.status_code == 400
+
+
+class TestIdempotencyKeys:
+    """Test Idempotency-Key handling on write endpoints"""
+    
+    @pytest.fixture(autouse=True)
+    def clear_store(self):
+        idempotency_store.clear()
+        yield
+        idempotency_store.clear()
+    
+    def test_expense_replay_returns_original_response(self, client):
+        """Test that a retried expense POST is recorded only once"""
+        headers = {"Idempotency-Key": "expense-1"}
+        payload = {"date": "2025-12-01", "category": "food", "amount": 1500}
+        
+        first = client.post("/api/expenses", json=payload, headers=headers)
+        second = client.post("/api/expenses", json=payload, headers=headers)
+        
+        assert first.status_code == 201
+        assert second.status_code == 201
+        assert second.json() == first.json()
+        assert second.headers["Idempotent-Replayed"] == "true"
+        assert len(client.get("/api/expenses?month=2025-12").json()) == 1
+    
+    def test_without_key_each_request_is_applied(self, client):
+        """Test that requests without a key are not deduplicated"""
+        payload = {"date": "2025-12-01", "category": "food", "amount": 1500}
+        client.post("/api/expenses", json=payload)
+        client.post("/api/expenses", json=payload)
+        assert len(client.get("/api/expenses?month=2025-12").json()) == 2
+    
+    def test_key_reused_with_different_payload(self, client):
+        """Test that reusing a key for a different request returns 422"""
+        headers = {"Idempotency-Key": "expense-2"}
+        client.post("/api/expenses", json={"date": "2025-12-01", "category": "food", "amount": 1500}, headers=headers)
+        response = client.post(
+            "/api/expenses",
+            json={"date": "2025-12-01", "category": "food", "amount": 9999},
+            headers=headers
+        )
+        assert response.status_code == 422
+    
+    def test_failed_request_releases_key(self, client):
+        """Test that a key is not consumed by a request that failed"""
+        headers = {"Idempotency-Key": "budget-1"}
+        with patch("app.services.monthly_budget.MonthlyBudgetService.register_budget", side_effect=ValueError("boom")):
+            response = client.post(
+                "/api/monthly-budgets",
+                json={"month": "2025-12", "category_id": "food", "amount": 50000},
+                headers=headers
+            )
+        assert response.status_code == 400
+        
+        response = client.post(
+            "/api/monthly-budgets",
+            json={"month": "2025-12", "category_id": "food", "amount": 50000},
+            headers=headers
+        )
+        assert response.status_code == 201
+        assert "Idempotent-Replayed" not in response.headers
+    
+    def test_keys_are_scoped_per_endpoint(self, client):
+        """Test that the same key on different endpoints does not collide"""
+        headers = {"Idempotency-Key": "shared"}
+        response = client.post("/api/budgets", json={"month": "2025-12", "category": "food", "amount": 30000}, headers=headers)
+        assert response.status_code == 201
+        response = client.post("/api/expenses", json={"date": "2025-12-01", "category": "food", "amount": 1500}, headers=headers)
+        assert response.status_code == 201
+        assert "Idempotent-Replayed" not in response.headers
+    
+    def test_replay_survives_restart(self, client):
+        """Test that a key is still replayed after the in-memory store was lost"""
+        headers = {"Idempotency-Key": "expense-restart"}
+        payload = {"date": "2025-12-01", "category": "food", "amount": 1500}
+        first = client.post("/api/expenses", json=payload, headers=headers)
+        
+        idempotency_store.clear()  # what a backend restart does
+        second = client.post("/api/expenses", json=payload, headers=headers)
+        
+        assert second.status_code == 201
+        assert second.json() == first.json()
+        assert second.headers["Idempotent-Replayed"] == "true"
+        assert len(client.get("/api/expenses?month=2025-12").json()) == 1
+        
+        idempotency_store.clear()
+        response = client.post("/api/expenses", json={**payload, "amount": 9999}, headers=headers)
+        assert response.status_code == 422
+    
+    def test_expired_record_is_not_replayed(self, client):
+        """Test that stored responses are not replayed after the TTL"""
+        headers = {"Idempotency-Key": "expense-expired"}
+        payload = {"date": "2025-12-01", "category": "food", "amount": 1500}
+        client.post("/api/expenses", json=payload, headers=headers)
+        idempotency_store.clear()
+        
+        with patch("app.idempotency.time.time", return_value=10 ** 12):
+            response = client.post("/api/expenses", json=payload, headers=headers)
+        
+        assert "Idempotent-Replayed" not in response.headers
+        assert len(client.get("/api/expenses?month=2025-12").json()) == 2
+    
+    def test_store_ttl_and_capacity(self):
+        """Test that entries expire after the TTL and the oldest are evicted first"""
+        store = IdempotencyStore(ttl_seconds=60, max_entries=2)
+        for key in ("a", "b", "c"):
+            assert store.begin("scope", key, b"fp") is None
+            store.complete("scope", key, 201, b"{}")
+        assert len(store) == 2
+        assert store.begin("scope", "a", b"fp") is None
+        
+        with patch("app.idempotency.time.monotonic", return_value=10 ** 9):
+            assert store.begin("scope", "c", b"fp") is None
+        assert len(store) == 1
+    
+    def test_in_flight_key_conflicts(self):
+        """Test that a key whose request is still running returns 409"""
+        store = IdempotencyStore()
+        store.begin("scope", "key", b"fp")
+        with pytest.raises(HTTPException) as exc_info:
+            store.begin("scope", "key", b"fp")
+        assert exc_info.value.status_code == 409
 
 
 class TestSummaryEndpoint:
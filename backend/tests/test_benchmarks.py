@@ -0,0 +1,70 @@
+"""Benchmark harness tests: dataset generation, regression detection and replay comparison"""
+
+from benchmarks.dataset import generate_expenses, month_starts
+from benchmarks.micro import BENCHMARKS, DatasetSpec, compare, run_suite
+from benchmarks import replay
+
+
+class TestDataset:
+    """Test the synthetic household generator"""
+    
+    def test_generation_is_deterministic(self):
+        """Test that the same seed produces the same rows"""
+        first = list(generate_expenses("2025-12", years=1, expenses_per_day=3, seed=7))
+        second = list(generate_expenses("2025-12", years=1, expenses_per_day=3, seed=7))
+        assert first == second
+        assert {row["month"] for row in first} == {d.strftime("%Y-%m") for d in month_starts("2025-12", 12)}
+    
+    def test_month_starts_crosses_years(self):
+        """Test that month ranges run oldest first across a year boundary"""
+        assert [d.strftime("%Y-%m") for d in month_starts("2025-02", 3)] == ["2024-12", "2025-01", "2025-02"]
+
+
+class TestMicroBenchmarks:
+    """Test the micro-benchmark runner and baseline comparison"""
+    
+    def test_suite_runs_every_benchmark(self, tmp_path):
+        """Test that every benchmark runs against a small generated dataset"""
+        results = run_suite({"tiny": DatasetSpec(200, 1)}, tmp_path, min_time=0.0)
+        assert set(results["tiny"]) == set(BENCHMARKS)
+        assert all(r["median_ms"] > 0 for r in results["tiny"].values())
+    
+    def test_compare_flags_regressions_beyond_tolerance(self):
+        """Test that only slowdowns beyond the tolerance count as regressions"""
+        results = {"1k": {"fast": {"median_ms": 1.1}, "slow": {"median_ms": 1.5}, "new": {"median_ms": 9.0}}}
+        baselines = {"1k": {"fast": {"median_ms": 1.0}, "slow": {"median_ms": 1.0}}}
+        
+        rows = {name: (baseline, regressed) for _, name, _, baseline, _, regressed in compare(results, baselines, 0.2)}
+        assert rows == {"fast": (1.0, False), "slow": (1.0, True), "new": (None, False)}
+
+
+class TestReplay:
+    """Test capture loading and the replay comparison"""
+    
+    def test_load_capture_merges_rotated_files_in_order(self, tmp_path):
+        """Test that rotated files are merged by start time and unusable lines skipped"""
+        (tmp_path / "requests.jsonl.1").write_text('{"ts": 1.0, "method": "GET"}\n{"ts": 3.0, "method": "GET"}\n')
+        (tmp_path / "requests.jsonl").write_text(
+            '{"ts": 2.0, "method": "GET"}\n{"ts": 4.0, "method": "POST", "body_truncated": true}\n{"ts": 5'
+        )
+        records, skipped = replay.load_capture([str(tmp_path / "requests.jsonl"), str(tmp_path / "requests.jsonl.1")])
+        assert [r["ts"] for r in records] == [1.0, 2.0, 3.0]
+        assert skipped == 2
+    
+    def test_compare_separates_reads_after_writes(self):
+        """Test that differing reads are flagged by whether a write preceded them"""
+        def record(ts, method, status, sha=None):
+            return {"ts": ts, "method": method, "path": "/api/expenses", "query": "", "route": "/api/expenses",
+                    "status": status, "duration_ms": 5.0, "response_sha256": sha}
+        records = [record(1, "GET", 200, "a"), record(2, "POST", 201), record(3, "GET", 200, "b"), record(4, "GET", 200, "c")]
+        results = [
+            {"status": 200, "latency": 0.004, "sha256": "x"},
+            {"status": 201, "latency": 0.006, "sha256": ""},
+            {"status": 200, "latency": 0.004, "sha256": "y"},
+            {"status": 500, "latency": 0.004, "sha256": "c"},
+        ]
+        report = replay.compare(records, results)
+        
+        assert [m["after_write"] for m in report["body_mismatches"]] == [False, True]
+        assert [m["replayed"] for m in report["status_mismatches"]] == [500]
+        assert report["routes"]["GET /api/expenses"]["requests"] == 3
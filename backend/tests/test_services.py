@@ -1,13 +1,30 @@
 """Service layer tests"""
 
+import io
+import sqlite3
+import threading
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+import app.config as config_module
+from app.database import Base
 
 from app.services.budget import BudgetService
 from app.services.expense import ExpenseService
 from app.services.summary import SummaryService
 from app.services.category import CategoryService
 from app.services.monthly_budget import MonthlyBudgetService
+from app.services.anomaly import AnomalyService
+from app.services.csv_import import CsvImportService
+from app.services.backup import BackupService
+from app.services.archive import ArchiveService
+from app.repositories.expense import ExpenseRepository
+from app.write_queue import WriteQueue, get_write_queue
 from app.schemas.budget import BudgetCreate
 from app.schemas.expense import ExpenseCreate
 from app.schemas.category import MonthlyBudgetCreateSchema
@@ -197,6 +214,80 @@ class TestExpenseService:
         assert all(e.month == "2025-12" and e.category == "食費" for e in results)
 
 
+class TestWriteQueue:
+    """Test the group-commit write queue behind ExpenseRepository.create_expense"""
+    
+    def test_concurrent_inserts_are_group_committed(self, test_db):
+        """Test that concurrent inserts from many threads share commits"""
+        engine = test_db.get_bind()
+        write_queue = get_write_queue(engine)
+        write_queue.max_delay = 0.02
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        
+        def insert_many(worker):
+            db = SessionLocal()
+            try:
+                repository = ExpenseRepository(db)
+                return [
+                    repository.create_expense(date(2025, 12, 1 + i), "food", worker * 100 + i).id
+                    for i in range(10)
+                ]
+            finally:
+                db.close()
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            ids = [row_id for result in executor.map(insert_many, range(8)) for row_id in result]
+        
+        assert len(set(ids)) == 80
+        assert len(ExpenseRepository(test_db).get_by_month("2025-12")) == 80
+        assert write_queue.rows == 80
+        assert write_queue.commits < 80
+    
+    def test_create_expense_returns_persisted_row(self, test_db):
+        """Test that the repository returns the committed row"""
+        expense = ExpenseRepository(test_db).create_expense(date(2025, 12, 25), "food", 1200, "lunch")
+        assert expense.id is not None
+        assert expense.month == "2025-12"
+        assert expense.created_at is not None
+    
+    def test_retries_while_database_is_locked(self, tmp_path):
+        """Test that lock contention is retried with backoff instead of failing"""
+        path = tmp_path / "locked.db"
+        engine = create_engine(f"sqlite:///{path}", connect_args={"timeout": 0})
+        Base.metadata.create_all(bind=engine)
+        write_queue = WriteQueue(engine, max_delay=0, max_retries=8, retry_backoff=0.02)
+        
+        blocker = sqlite3.connect(path, check_same_thread=False)
+        blocker.execute("BEGIN IMMEDIATE")
+        threading.Timer(0.15, blocker.rollback).start()
+        try:
+            row_id = write_queue.submit({
+                "date": date(2025, 12, 1), "month": "2025-12", "category": "food", "amount": 100, "memo": None
+            })
+        finally:
+            blocker.close()
+            engine.dispose()
+        
+        assert row_id == 1
+        assert write_queue.retries >= 1
+    
+    def test_failing_row_does_not_fail_its_batch(self, test_db):
+        """Test that one invalid row only fails its own caller"""
+        write_queue = WriteQueue(test_db.get_bind(), max_delay=0.05)
+        rows = [
+            {"date": date(2025, 12, 1), "month": "2025-12", "category": "food", "amount": amount, "memo": None}
+            for amount in (100, -1, 300)
+        ]
+        
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(write_queue.submit, row) for row in rows]
+        
+        assert futures[0].result() is not None
+        assert futures[2].result() is not None
+        with pytest.raises(IntegrityError):
+            futures[1].result()
+
+
 class TestSummaryService:
     """Test SummaryService"""
     
@@ -674,3 +765,486 @@ class TestMonthlyBudgetService:
         
         # Total should be 325,856 yen
         assert total == 325856
+
+
+class TestAnomalyService:
+    """Test AnomalyService"""
+    
+    def _register_daily(self, test_db, category, amounts, start_day=1, month="2025-11"):
+        """Register one expense per day starting at start_day"""
+        service = ExpenseService(test_db)
+        for offset, amount in enumerate(amounts):
+            service.register_expense(ExpenseCreate(
+                date=f"{month}-{start_day + offset:02d}",
+                category=category,
+                amount=amount
+            ))
+    
+    def test_detect_no_data(self, test_db):
+        """Test detection on a month without expenses"""
+        service = AnomalyService(test_db)
+        report = service.detect_anomalies("2025-12")
+        
+        assert report.month == "2025-12"
+        assert report.anomalies == []
+    
+    def test_detect_unusual_day(self, test_db):
+        """Test that a spike against the trailing window is flagged"""
+        # Regular food spending in November
+        self._register_daily(test_db, "food", [1000, 1200, 900, 1100, 1000, 1050, 950, 1000])
+        # Normal day and a spike in December
+        self._register_daily(test_db, "food", [1100, 9000], month="2025-12")
+        
+        service = AnomalyService(test_db)
+        report = service.detect_anomalies("2025-12")
+        
+        assert len(report.anomalies) == 1
+        anomaly = report.anomalies[0]
+        assert anomaly.date == "2025-12-02"
+        assert anomaly.category == "food"
+        assert anomaly.amount == 9000
+        assert anomaly.score > report.threshold
+    
+    def test_detect_duplicated_charge(self, test_db):
+        """Test that a duplicated charge doubles the daily total and is flagged"""
+        self._register_daily(test_db, "communication", [5000] * 6, month="2025-11")
+        # The same charge recorded twice on one day
+        self._register_daily(test_db, "communication", [5000], start_day=10, month="2025-12")
+        self._register_daily(test_db, "communication", [5000], start_day=10, month="2025-12")
+        
+        service = AnomalyService(test_db, window_days=60)
+        report = service.detect_anomalies("2025-12")
+        
+        assert [a.amount for a in report.anomalies] == [10000]
+    
+    def test_detect_requires_min_history(self, test_db):
+        """Test that categories without enough history are not scored"""
+        self._register_daily(test_db, "food", [1000, 50000], month="2025-12")
+        
+        service = AnomalyService(test_db)
+        report = service.detect_anomalies("2025-12")
+        
+        assert report.anomalies == []
+    
+    def test_register_expense_flags_anomaly(self, test_db):
+        """Test that a newly registered expense is checked against its history"""
+        self._register_daily(test_db, "food", [1000, 1200, 900, 1100, 1000])
+        
+        service = ExpenseService(test_db)
+        normal = service.register_expense(ExpenseCreate(date="2025-11-20", category="food", amount=1100))
+        unusual = service.register_expense(ExpenseCreate(date="2025-11-21", category="food", amount=30000))
+        
+        assert normal.is_anomaly is False
+        assert unusual.is_anomaly is True
+        assert unusual.anomaly_score > 3.5
+    
+    def test_register_expense_without_history(self, test_db):
+        """Test that the first expenses of a category are never flagged"""
+        service = ExpenseService(test_db)
+        result = service.register_expense(ExpenseCreate(date="2025-11-01", category="food", amount=99999))
+        
+        assert result.is_anomaly is False
+        assert result.anomaly_score is None
+
+
+class TestCsvImportService:
+    """Test CsvImportService"""
+    
+    def _import(self, test_db, text, encoding="utf-8", **kwargs):
+        """Run an import of the given CSV text"""
+        CategoryService(test_db).initialize_default_categories()
+        service = CsvImportService(test_db, chunk_size=2)
+        return service.import_csv(io.BytesIO(text.encode(encoding)), **kwargs)
+    
+    def test_import_default_profile(self, test_db):
+        """Test importing rows with the default column names"""
+        csv_text = (
+            "date,category,amount,memo\n"
+            "2025-12-01,food,1200,スーパー\n"
+            "2025-12-02,食費,800,\n"
+            "2025-12-03,daily_goods,\"1,500\",ドラッグストア\n"
+        )
+        report = self._import(test_db, csv_text)
+        
+        assert report.total_rows == 3
+        assert report.imported == 3
+        assert report.error_count == 0
+        
+        expenses = ExpenseService(test_db).get_expenses_by_month("2025-12")
+        assert sorted(e.amount for e in expenses) == [800, 1200, 1500]
+        assert {e.category for e in expenses} == {"food", "daily_goods"}
+    
+    def test_import_card_profile_shift_jis_with_rules(self, test_db):
+        """Test the card profile with Shift_JIS input and keyword category rules"""
+        csv_text = (
+            "利用日,利用店名・商品名,利用金額\n"
+            "2025/12/01,ローソン 渋谷店,￥540\n"
+            "2025/12/02,ＥＮＥＯＳ,\"4,000\"\n"
+            "2025/12/03,不明な店,1000\n"
+        )
+        report = self._import(test_db, csv_text, encoding="cp932", profile="card_jp", default_category="special")
+        
+        assert report.imported == 3
+        categories = {e.memo: e.category for e in ExpenseService(test_db).get_expenses_by_month("2025-12")}
+        assert categories["ローソン 渋谷店"] == "food"
+        assert categories["ＥＮＥＯＳ"] == "transportation"
+        assert categories["不明な店"] == "special"
+    
+    def test_import_reports_row_errors(self, test_db):
+        """Test that invalid rows are reported with their line numbers"""
+        csv_text = (
+            "date,category,amount\n"
+            "2025-13-01,food,100\n"
+            "2025-12-01,food,abc\n"
+            "2025-12-01,unknown,100\n"
+            "2025-12-01,food,-100\n"
+            "2025-12-02,food,100\n"
+        )
+        report = self._import(test_db, csv_text)
+        
+        assert report.total_rows == 5
+        assert report.imported == 1
+        assert report.error_count == 4
+        assert [e.line for e in report.errors] == [2, 3, 4, 5]
+    
+    def test_import_rejects_non_finite_and_huge_amounts(self, test_db):
+        """Test that infinite, NaN and out-of-range amounts are row errors, not failures"""
+        csv_text = (
+            "date,category,amount\n"
+            "2025-12-01,food,Infinity\n"
+            "2025-12-02,food,inf\n"
+            "2025-12-03,food,NaN\n"
+            "2025-12-04,food,1e30\n"
+            "2025-12-05,food,1234567890123456789012345\n"
+            "2025-12-06,food,9223372036854775807\n"
+        )
+        report = self._import(test_db, csv_text)
+        
+        assert report.imported == 1
+        assert report.error_count == 5
+        assert [e.line for e in report.errors] == [2, 3, 4, 5, 6]
+        assert report.errors[0].message.startswith("Invalid amount")
+        assert report.errors[3].message.startswith("Amount out of range")
+        assert [e.amount for e in ExpenseService(test_db).get_expenses_by_month("2025-12")] == [2 ** 63 - 1]
+    
+    def test_import_dry_run(self, test_db):
+        """Test that dry-run validates without writing"""
+        csv_text = "date,category,amount\n2025-12-01,food,100\n2025-12-02,food,200\n"
+        report = self._import(test_db, csv_text, dry_run=True)
+        
+        assert report.dry_run is True
+        assert report.imported == 2
+        assert ExpenseService(test_db).get_expenses_by_month("2025-12") == []
+    
+    def test_import_skips_duplicates(self, test_db):
+        """Test that re-importing the same statement does not duplicate expenses"""
+        csv_text = (
+            "date,category,amount,memo\n"
+            "2025-12-01,food,500,コーヒー\n"
+            "2025-12-01,food,500,コーヒー\n"
+            "2025-12-02,food,800,ランチ\n"
+        )
+        first = self._import(test_db, csv_text)
+        second = self._import(test_db, csv_text)
+        
+        # Identical rows within one statement are both kept
+        assert first.imported == 3
+        assert second.imported == 0
+        assert second.duplicates == 3
+        assert len(ExpenseService(test_db).get_expenses_by_month("2025-12")) == 3
+    
+    def test_import_missing_columns(self, test_db):
+        """Test that a header without the required columns is rejected"""
+        with pytest.raises(ValueError):
+            self._import(test_db, "foo,bar\n1,2\n")
+    
+    def test_import_unknown_profile(self, test_db):
+        """Test that an unknown profile is rejected"""
+        with pytest.raises(ValueError):
+            self._import(test_db, "date,amount\n", profile="unknown")
+
+
+class TestBackupService:
+    """Test BackupService"""
+    
+    def test_create_and_list_backup(self, test_db, tmp_path):
+        """Test taking a snapshot and listing it"""
+        ExpenseService(test_db).register_expense(ExpenseCreate(date="2025-12-01", category="food", amount=1000))
+        service = BackupService(test_db, backup_dir=str(tmp_path), pages_per_step=1, step_sleep=0)
+        
+        result = service.create_backup()
+        
+        assert result.pages_copied > 0
+        assert result.bytes_copied > 0
+        assert result.size_bytes > 0
+        assert result.duration_seconds >= 0
+        assert [b.name for b in service.list_backups()] == [result.name]
+    
+    def test_backup_rotation(self, test_db, tmp_path):
+        """Test that only the newest snapshots are kept"""
+        service = BackupService(test_db, backup_dir=str(tmp_path), keep=2, step_sleep=0)
+        
+        names = [service.create_backup().name for _ in range(3)]
+        
+        assert [b.name for b in service.list_backups()] == [names[2], names[1]]
+    
+    def test_restore_backup(self, test_db, tmp_path):
+        """Test that restoring brings back the snapshot content"""
+        expense_service = ExpenseService(test_db)
+        expense_service.register_expense(ExpenseCreate(date="2025-12-01", category="food", amount=1000))
+        service = BackupService(test_db, backup_dir=str(tmp_path), step_sleep=0)
+        snapshot = service.create_backup()
+        
+        expense_service.register_expense(ExpenseCreate(date="2025-12-02", category="food", amount=2000))
+        test_db.close()
+        
+        result = service.restore_backup(snapshot.name)
+        
+        assert result.bytes_copied > 0
+        assert result.safety_backup is not None
+        amounts = [e.amount for e in expense_service.get_expenses_by_month("2025-12")]
+        assert amounts == [1000]
+    
+    def test_restore_unknown_backup(self, test_db, tmp_path):
+        """Test that restoring an unknown snapshot is rejected"""
+        service = BackupService(test_db, backup_dir=str(tmp_path))
+        
+        with pytest.raises(ValueError):
+            service.restore_backup("../home_finance.db")
+
+
+class TestArchiveService:
+    """Test ArchiveService and transparent reads of archived years"""
+    
+    @pytest.fixture
+    def archive_dir(self, tmp_path):
+        """Point the archive directory at a temporary path"""
+        with patch.object(config_module.settings, 'archive_dir', str(tmp_path)):
+            yield tmp_path
+    
+    def _seed(self, test_db):
+        """Register expenses in an old year and in the current year"""
+        service = ExpenseService(test_db)
+        current_year = datetime.now().year
+        service.register_expense(ExpenseCreate(date="2020-03-01", category="food", amount=1000, memo="old"))
+        service.register_expense(ExpenseCreate(date="2020-03-15", category="food", amount=2000))
+        service.register_expense(ExpenseCreate(date="2021-07-01", category="medical", amount=500))
+        service.register_expense(ExpenseCreate(date=f"{current_year}-01-10", category="food", amount=3000))
+        return service
+    
+    def test_archive_closed_years(self, test_db, archive_dir):
+        """Test that old years are moved out of the hot table"""
+        self._seed(test_db)
+        
+        result = ArchiveService(test_db, keep_years=1).archive_closed_years()
+        
+        assert [(a.year, a.rows) for a in result.archived] == [(2020, 2), (2021, 1)]
+        assert (archive_dir / "expenses_2020.db").exists()
+        from app.models.expense import Expense as ExpenseModel
+        assert test_db.query(ExpenseModel).count() == 1
+        
+        archives = ArchiveService(test_db).list_archives()
+        assert [(a.year, a.rows) for a in archives] == [(2020, 2), (2021, 1)]
+    
+    def test_list_archives_in_directory_needing_uri_quoting(self, test_db, tmp_path):
+        """Test that archive files are listed from a directory whose name contains URI characters"""
+        self._seed(test_db)
+        directory = tmp_path / "cold?storage#1"
+        with patch.object(config_module.settings, 'archive_dir', str(directory)):
+            ArchiveService(test_db, keep_years=1).archive_closed_years()
+            
+            assert [(a.year, a.rows) for a in ArchiveService(test_db).list_archives()] == [(2020, 2), (2021, 1)]
+    
+    def test_archive_refuses_more_files_than_attachable(self, test_db, archive_dir):
+        """Test that archiving stops with a clear error before exceeding the attach limit"""
+        from app import archive
+        self._seed(test_db)
+        for year in range(2020 - archive.MAX_ATTACHED_ARCHIVES + 1, 2020):
+            sqlite3.connect(archive_dir / f"expenses_{year}.db").close()
+        
+        with pytest.raises(ValueError, match="would exceed"):
+            ArchiveService(test_db, keep_years=1).archive_closed_years()
+        assert not (archive_dir / "expenses_2020.db").exists()
+        from app.models.expense import Expense as ExpenseModel
+        assert test_db.query(ExpenseModel).count() == 4
+    
+    def test_attach_refused_inside_transaction(self, test_db, archive_dir):
+        """Test that the union view is reported unavailable when archives cannot be attached mid-transaction"""
+        from app import archive
+        from app.models.expense import Expense as ExpenseModel
+        self._seed(test_db)
+        ArchiveService(test_db, keep_years=1).archive_closed_years()
+        
+        test_db.add(ExpenseModel(date=date(2025, 1, 1), month="2025-01", category="food", amount=1))
+        test_db.flush()
+        
+        assert archive.ensure_attached(test_db, [2020, 2021]) is False
+        test_db.rollback()
+        assert archive.ensure_attached(test_db, [2020, 2021]) is True
+    
+    def test_archived_months_still_readable(self, test_db, archive_dir):
+        """Test that repository queries over archived months work transparently"""
+        service = self._seed(test_db)
+        ArchiveService(test_db, keep_years=1).archive_closed_years()
+        
+        march = service.get_expenses_by_month("2020-03")
+        assert sorted(e.amount for e in march) == [1000, 2000]
+        assert [e.memo for e in march if e.amount == 1000] == ["old"]
+        
+        food = service.get_expenses_by_category("food")
+        assert sorted(e.amount for e in food) == [1000, 2000, 3000]
+        
+        assert service.get_expenses_summary_by_category("2021-07") == {"medical": 500}
+        assert service.get_expense_by_id(march[0].id) is not None
+        
+        summary = SummaryService(test_db).calculate_summary("2020-03")
+        assert summary.total_spent == 3000
+    
+    def test_archived_expense_is_read_only(self, test_db, archive_dir):
+        """Test that archived expenses cannot be deleted"""
+        service = self._seed(test_db)
+        old_id = service.get_expenses_by_month("2021-07")[0].id
+        ArchiveService(test_db, keep_years=1).archive_closed_years()
+        
+        with pytest.raises(ValueError):
+            service.delete_expense(old_id)
+        assert service.delete_expense(99999) is False
+    
+    def test_paging_and_bulk_delete_over_archived_years(self, test_db, archive_dir):
+        """Test that pages include archived expenses and bulk deletes keep them"""
+        service = self._seed(test_db)
+        current_id = service.get_expenses_by_category("food")[-1].id
+        old_id = service.get_expenses_by_month("2021-07")[0].id
+        ArchiveService(test_db, keep_years=1).archive_closed_years()
+        
+        page = service.get_expense_page(category="food", sort="amount", descending=False, limit=2)
+        assert page.total == 3
+        assert [e.amount for e in page.items] == [1000, 2000]
+        
+        result = service.delete_expenses([current_id, old_id, 99999])
+        assert result.deleted == [current_id]
+        assert result.archived == [old_id]
+        assert result.not_found == [99999]
+        assert service.get_expense_by_id(old_id) is not None
+    
+    def test_archived_ids_are_not_reused(self, test_db, archive_dir):
+        """Test that a new expense never gets the ID of an archived one"""
+        service = ExpenseService(test_db)
+        current_year = datetime.now().year
+        service.register_expense(ExpenseCreate(date=f"{current_year}-01-10", category="food", amount=3000))
+        archived_id = service.register_expense(ExpenseCreate(date="2020-03-01", category="food", amount=1000)).id
+        ArchiveService(test_db, keep_years=1).archive_closed_years()
+        
+        new_id = service.register_expense(ExpenseCreate(date=f"{current_year}-01-11", category="food", amount=500)).id
+        assert new_id > archived_id
+        
+        page = service.get_expense_page(category="food", sort="amount", descending=False)
+        assert page.total == 3
+        assert [e.amount for e in page.items] == [500, 1000, 3000]
+        
+        result = service.delete_expenses([archived_id, new_id])
+        assert result.deleted == [new_id]
+        assert result.archived == [archived_id]
+        assert service.get_expense_by_id(archived_id).amount == 1000
+    
+    def test_migrate_expenses_autoincrement(self, test_db, archive_dir):
+        """Test that a pre-AUTOINCREMENT expenses table is rebuilt above the archived IDs"""
+        from app.database import migrate_expenses_autoincrement
+        service = ExpenseService(test_db)
+        current_year = datetime.now().year
+        service.register_expense(ExpenseCreate(date=f"{current_year}-01-10", category="food", amount=3000))
+        archived_id = service.register_expense(ExpenseCreate(date="2020-03-01", category="food", amount=1000)).id
+        ArchiveService(test_db, keep_years=1).archive_closed_years()
+        
+        # Recreate the table the way SCHEMA_VERSION 1 defined it (no AUTOINCREMENT)
+        engine = test_db.get_bind()
+        with engine.begin() as connection:
+            connection.exec_driver_sql("ALTER TABLE expenses RENAME TO expenses_v1")
+            for index in ("ix_expenses_month", "ix_expenses_category", "ix_expenses_date"):
+                connection.exec_driver_sql(f"DROP INDEX {index}")
+            connection.exec_driver_sql(
+                "CREATE TABLE expenses (id INTEGER NOT NULL PRIMARY KEY, date DATE NOT NULL, "
+                "month VARCHAR(7) NOT NULL, category VARCHAR(50) NOT NULL, amount INTEGER NOT NULL, "
+                "memo TEXT, created_at DATETIME DEFAULT (CURRENT_TIMESTAMP) NOT NULL)"
+            )
+            connection.exec_driver_sql("INSERT INTO expenses SELECT * FROM expenses_v1")
+            connection.exec_driver_sql("DROP TABLE expenses_v1")
+        test_db.close()
+        
+        assert migrate_expenses_autoincrement(engine) is True
+        assert migrate_expenses_autoincrement(engine) is False
+        
+        new_expense = service.register_expense(ExpenseCreate(date=f"{current_year}-01-11", category="food", amount=500))
+        assert new_expense.id > archived_id
+        assert service.get_expense_page(category="food").total == 3
+    
+    def test_archive_rows_already_in_archive_file(self, test_db, archive_dir):
+        """Test that rows the archive file already holds do not abort the move"""
+        self._seed(test_db)
+        hot = sqlite3.connect("./test_home_finance.db")
+        rows = hot.execute("SELECT * FROM expenses WHERE month LIKE '2020-%' ORDER BY id").fetchall()
+        ArchiveService(test_db, keep_years=1).archive_closed_years()
+        
+        # Bring the archived rows back into the hot table, as a restored
+        # pre-archive snapshot would, one of them with a different amount
+        with hot:
+            hot.execute("INSERT INTO expenses VALUES (?, ?, ?, ?, ?, ?, ?)", rows[0])
+            hot.execute("INSERT INTO expenses VALUES (?, ?, ?, ?, ?, 'edited', ?)", rows[1][:5] + rows[1][6:])
+        hot.close()
+        
+        result = ArchiveService(test_db, keep_years=1).archive_closed_years()
+        
+        assert [(a.year, a.rows, a.conflicts) for a in result.archived] == [(2020, 1, [rows[1][0]])]
+        from app.models.expense import Expense as ExpenseModel
+        assert [e.id for e in test_db.query(ExpenseModel).filter(ExpenseModel.month.like("2020-%"))] == [rows[1][0]]
+        assert [(a.year, a.rows) for a in ArchiveService(test_db).list_archives()] == [(2020, 2), (2021, 1)]
+    
+    def test_restore_pre_archive_backup(self, test_db, archive_dir):
+        """Test that restoring a snapshot taken before archiving does not duplicate archived expenses"""
+        service = self._seed(test_db)
+        backup_service = BackupService(test_db, backup_dir=str(archive_dir / "backups"), step_sleep=0)
+        snapshot = backup_service.create_backup()
+        # Created after the snapshot and archived: its ID must not be handed out again
+        late_id = service.register_expense(ExpenseCreate(date="2021-08-01", category="food", amount=800)).id
+        ArchiveService(test_db, keep_years=1).archive_closed_years()
+        test_db.close()
+        
+        result = backup_service.restore_backup(snapshot.name)
+        
+        assert result.archived_rows_removed == 3
+        food = service.get_expense_page(category="food", sort="amount", descending=False)
+        assert [e.amount for e in food.items] == [800, 1000, 2000, 3000]
+        current_year = datetime.now().year
+        new_id = service.register_expense(ExpenseCreate(date=f"{current_year}-01-11", category="food", amount=1)).id
+        assert new_id > late_id
+        assert ArchiveService(test_db, keep_years=1).archive_closed_years().archived == []
+    
+    def test_restore_backup_conflicting_with_archive(self, test_db, archive_dir):
+        """Test that a snapshot holding different expenses under archived IDs is refused"""
+        self._seed(test_db)
+        backup_service = BackupService(test_db, backup_dir=str(archive_dir / "backups"), step_sleep=0)
+        snapshot = backup_service.create_backup()
+        ArchiveService(test_db, keep_years=1).archive_closed_years()
+        archived = sqlite3.connect(archive_dir / "expenses_2020.db")
+        with archived:
+            archived.execute("UPDATE expenses SET amount = amount + 1")
+        archived.close()
+        test_db.close()
+        
+        with pytest.raises(ValueError, match="archived"):
+            backup_service.restore_backup(snapshot.name)
+        assert [b.name for b in backup_service.list_backups()] == [snapshot.name]
+    
+    def test_archive_appends_late_entries(self, test_db, archive_dir):
+        """Test that back-dated entries are appended to an existing archive"""
+        service = self._seed(test_db)
+        archive_service = ArchiveService(test_db, keep_years=1)
+        archive_service.archive_closed_years()
+        
+        service.register_expense(ExpenseCreate(date="2020-12-31", category="food", amount=700))
+        assert sorted(e.amount for e in service.get_expenses_by_month("2020-12")) == [700]
+        
+        result = archive_service.archive_closed_years()
+        
+        assert [(a.year, a.rows) for a in result.archived] == [(2020, 1)]
+        assert sorted(e.amount for e in service.get_expenses_by_month("2020-12")) == [700]
@@ -0,0 +1,152 @@
+"""Startup tests: schema-version short-circuit and cold start time"""
+
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import app.database as database_module
+from app.database import Base, SCHEMA_VERSION, init_db
+from app.models import Category, MonthlyBudget, SchemaVersion
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Upper bound for importing the app and initializing a fresh database in a new interpreter
+STARTUP_BUDGET_SECONDS = float(os.environ.get("STARTUP_BUDGET_SECONDS", "5.0"))
+
+# Optional subsystems that must stay off the startup path
+LAZY_MODULES = ["app.services.csv_import", "app.services.backup", "app.services.archive"]
+
+COLD_START_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+from app.database import init_db
+imported = time.perf_counter()
+init_db()
+finished = time.perf_counter()
+print(json.dumps({
+    "imports": imported - started,
+    "init_db": finished - imported,
+    "total": finished - started,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+
+@pytest.fixture
+def startup_db(tmp_path):
+    """Point app.database at an empty database file"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'startup.db'}", connect_args={"check_same_thread": False})
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with patch.object(database_module, "engine", engine), \
+            patch.object(database_module, "SessionLocal", SessionLocal):
+        yield engine, SessionLocal
+    engine.dispose()
+
+
+def count_statements(engine):
+    """Attach a counter of executed SQL statements to an engine"""
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+class TestInitDb:
+    """Test init_db with the schema_version table"""
+
+    def test_cold_init_creates_schema_and_seeds(self, startup_db):
+        """Test that the first start creates tables, seeds data and records the version"""
+        engine, SessionLocal = startup_db
+        init_db()
+
+        db = SessionLocal()
+        try:
+            state = db.get(SchemaVersion, 1)
+            assert state.version == SCHEMA_VERSION
+            assert state.seeded_month == datetime.now().strftime("%Y-%m")
+            assert db.query(Category).count() > 0
+            assert db.query(MonthlyBudget).filter(MonthlyBudget.month == state.seeded_month).count() > 0
+        finally:
+            db.close()
+
+    def test_warm_restart_is_single_read(self, startup_db):
+        """Test that a restart with an up-to-date schema executes one statement"""
+        engine, _ = startup_db
+        init_db()
+
+        statements = count_statements(engine)
+        with patch.object(Base.metadata, "create_all") as create_all:
+            init_db()
+
+        assert len(statements) == 1
+        assert "schema_version" in statements[0]
+        create_all.assert_not_called()
+
+    def test_new_month_seeds_budgets_without_create_all(self, startup_db):
+        """Test that a restart in a new month only seeds that month's budgets"""
+        engine, SessionLocal = startup_db
+        init_db()
+        db = SessionLocal()
+        db.query(MonthlyBudget).delete()
+        db.get(SchemaVersion, 1).seeded_month = "2000-01"
+        db.commit()
+        db.close()
+
+        with patch.object(Base.metadata, "create_all") as create_all:
+            init_db()
+
+        create_all.assert_not_called()
+        db = SessionLocal()
+        try:
+            current_month = datetime.now().strftime("%Y-%m")
+            assert db.get(SchemaVersion, 1).seeded_month == current_month
+            assert db.query(MonthlyBudget).filter(MonthlyBudget.month == current_month).count() > 0
+        finally:
+            db.close()
+
+    def test_version_bump_runs_create_all(self, startup_db):
+        """Test that a newer schema version runs create_all again"""
+        init_db()
+        with patch.object(database_module, "SCHEMA_VERSION", SCHEMA_VERSION + 1), \
+                patch.object(Base.metadata, "create_all") as create_all:
+            init_db()
+        create_all.assert_called_once()
+
+
+class TestColdStart:
+    """Test startup time on a cold interpreter"""
+
+    def run_cold_start(self, database_path):
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{database_path}", LOG_LEVEL="WARNING")
+        result = subprocess.run(
+            [sys.executable, "-c", COLD_START_SCRIPT],
+            cwd=BACKEND_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=60
+        )
+        assert result.returncode == 0, result.stderr
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def test_startup_within_budget(self, tmp_path):
+        """Test that import plus database initialization stays under the startup budget"""
+        cold = self.run_cold_start(tmp_path / "cold.db")
+        warm = self.run_cold_start(tmp_path / "cold.db")
+
+        assert cold["total"] < STARTUP_BUDGET_SECONDS, cold
+        assert warm["total"] < STARTUP_BUDGET_SECONDS, warm
+        assert warm["init_db"] < cold["init_db"]
+
+    def test_optional_subsystems_not_imported(self, tmp_path):
+        """Test that CSV import and admin services are not loaded at startup"""
+        result = self.run_cold_start(tmp_path / "lazy.db")
+        assert result["loaded"] == []
@@ -1,11 +1,21 @@
 """Backend API client with error handling and retry logic"""
 
+import contextvars
+import hashlib
+import json
+import threading
 import time
-from typing import Optional, Dict, Any, List
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Callable, Tuple, NamedTuple, Iterator
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from app.cache import ResponseCache
+from app.circuit import CircuitBreaker
 from app.config import settings
+from app.tracing import tracer
 
 
 class APIError(Exception):
@@ -17,10 +27,29 @@ class APIError(Exception):
         super().__init__(self.message)
 
 
+class CircuitOpenError(APIError):
+    """Raised without contacting the backend while the circuit breaker is open"""
+
+
+class Fetched(NamedTuple):
+    """Decoded GET response with its version and the server's poll interval hint"""
+    data: Any
+    version: str  # ETag, or a hash of the body if the server sent none
+    poll_interval: Optional[float]  # X-Poll-Interval header, if sent
+    fetched_at: float  # Unix time the backend last confirmed this data
+    stale: bool = False  # True if the backend is unreachable and this is the last known good response
+
+
 class APIClient:
     """Client for interacting with the backend API"""
     
-    def __init__(self, base_url: Optional[str] = None, timeout: int = 10, max_retries: int = 3):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        timeout: int = 10,
+        max_retries: int = 3,
+        max_workers: Optional[int] = None
+    ):
         """
         Initialize API client
         
@@ -28,29 +57,135 @@ class APIClient:
             base_url: Base URL for the API (defaults to settings.backend_url)
             timeout: Request timeout in seconds
             max_retries: Maximum number of retry attempts
+            max_workers: Requests run in parallel by gather() (defaults to settings.api_max_concurrency)
         """
         self.base_url = (base_url or settings.backend_url).rstrip('/')
         self.timeout = timeout
+        self.max_workers = max_workers or settings.api_max_concurrency
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        
+        # GET responses, shared by every session using this client (the global one is process-wide)
+        self.cache = ResponseCache(settings.api_cache_max_entries)
+        # Last successful response per URL: validators for conditional GETs, and
+        # the last known good data while the backend is unreachable
+        self._last_good = ResponseCache(settings.api_cache_max_entries)
         
-        # Configure session with retry logic
-        self.session = requests.Session()
+        # Fails calls fast after consecutive backend failures (shared like the cache)
+        self.breaker = CircuitBreaker(settings.circuit_failure_threshold, settings.circuit_reset_timeout)
+        
+        # One transport shared by every thread: urllib3's connection pool is
+        # thread-safe and keeps connections alive across Streamlit script runs
         retry_strategy = Retry(
             total=max_retries,
             backoff_factor=1,
             status_forcelist=[429, 500, 502, 503, 504],
             allowed_methods=["HEAD", "GET", "OPTIONS", "POST", "PUT", "DELETE"]
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
+        # At least one pooled connection per gather() worker, so parallel calls never wait for a socket
+        self.adapter = HTTPAdapter(
+            max_retries=retry_strategy,
+            pool_connections=settings.api_pool_connections,
+            pool_maxsize=max(settings.api_pool_maxsize, self.max_workers),
+            pool_block=settings.api_pool_block
+        )
+        # requests.Session (cookies, headers, adapter mounts) is not thread-safe, so
+        # each thread (session script run, gather() worker) gets its own
+        self._local = threading.local()
+    
+    @property
+    def session(self) -> requests.Session:
+        """The calling thread's requests session, mounted on the shared transport"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("http://", self.adapter)
+            session.mount("https://", self.adapter)
+            self._local.session = session
+        return session
+    
+    def gather(self, *calls: Callable[[], Any], return_exceptions: bool = False) -> List[Any]:
+        """
+        Run independent API calls in parallel and return their results in call order
+        
+        The calls share this client's connection pool, so a page waits for its
+        slowest request instead of the sum of all of them. Client spans of the
+        calls stay under the caller's current span.
+        
+            stats, categories = api_client.gather(
+                lambda: api_client.get_expense_statistics(month),
+                api_client.get_categories,
+            )
+        
+        Args:
+            *calls: Functions without arguments, e.g. bound methods or lambdas
+            return_exceptions: Return exceptions in place of results instead of raising
+        
+        Returns:
+            List with the result of each call
+        
+        Raises:
+            Exception: The first failed call's exception (in call order), after all calls finished,
+                unless return_exceptions is set
+        """
+        if len(calls) <= 1 or threading.current_thread().name.startswith("api-client"):
+            # Nothing to overlap, or already on a worker (waiting on the pool could deadlock)
+            futures = None
+        else:
+            executor = self._get_executor()
+            futures = [executor.submit(contextvars.copy_context().run, call) for call in calls]
+        
+        results: List[Any] = []
+        for index, call in enumerate(calls):
+            try:
+                results.append(futures[index].result() if futures else call())
+            except Exception as e:
+                results.append(e)
+        
+        if not return_exceptions:
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+        return results
     
-    def _request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+    @contextmanager
+    def prefetching(self) -> Iterator[None]:
+        """
+        Cache the GET responses of this thread for at least settings.prefetch_ttl
+        
+        Used by the prefetcher: a response fetched ahead of time must still be
+        cached when the user gets to it, even for endpoints with short TTLs.
+        """
+        self._local.prefetching = True
+        try:
+            yield
+        finally:
+            self._local.prefetching = False
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create the gather() thread pool on first use"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="api-client")
+            return self._executor
+    
+    def _request(
+        self,
+        method: str,
+        endpoint: str,
+        idempotency_key: Optional[str] = None,
+        **kwargs
+    ) -> requests.Response:
         """
         Make HTTP request with error handling
         
+        Every POST carries an Idempotency-Key (generated unless given), which the
+        retry strategy resends unchanged, so a retried write is applied only once.
+        
         Args:
             method: HTTP method
             endpoint: API endpoint (without base URL)
+            idempotency_key: Idempotency-Key for POST requests (default: new UUID)
             **kwargs: Additional arguments for requests
         
         Returns:
@@ -61,44 +196,251 @@ class APIClient:
         """
         url = f"{self.base_url}{endpoint}"
         
-        try:
-            response = self.session.request(
-                method=method,
-                url=url,
-                timeout=self.timeout,
-                **kwargs
+        if not self.breaker.allow():
+            raise CircuitOpenError(
+                message=f"接続エラー: バックエンドが応答しません（{self.breaker.retry_in():.0f}秒後に再接続を試みます）",
+                detail=f"Circuit breaker open after {self.breaker.failures} consecutive failures"
             )
-            response.raise_for_status()
-            return response
-        except requests.exceptions.HTTPError as e:
-            # Extract error details from response
-            detail = None
-            try:
-                error_data = e.response.json()
-                detail = error_data.get("detail", str(e))
-            except:
-                detail = str(e)
+        
+        with tracer.span(f"{method} {endpoint}", kind="client") as span:
+            headers = dict(kwargs.pop("headers", None) or {})
+            if method == "POST":
+                headers.setdefault("Idempotency-Key", idempotency_key or str(uuid.uuid4()))
+            if span is not None:
+                # Retries reuse the header, so each attempt shows up under this span
+                headers["traceparent"] = span.traceparent
+            if headers:
+                kwargs["headers"] = headers
             
-            raise APIError(
-                message=f"HTTP error: {e.response.status_code}",
-                status_code=e.response.status_code,
-                detail=detail
-            )
-        except requests.exceptions.ConnectionError as e:
-            raise APIError(
-                message=f"接続エラー: バックエンドに接続できません ({self.base_url})",
-                detail=str(e)
-            )
-        except requests.exceptions.Timeout as e:
-            raise APIError(
-                message=f"タイムアウト: リクエストが{self.timeout}秒以内に完了しませんでした",
-                detail=str(e)
-            )
-        except requests.exceptions.RequestException as e:
-            raise APIError(
-                message=f"リクエストエラー: {str(e)}",
-                detail=str(e)
-            )
+            try:
+                response = self.session.request(
+                    method=method,
+                    url=url,
+                    timeout=self.timeout,
+                    **kwargs
+                )
+                self._record_response(span, response)
+                response.raise_for_status()
+                self.breaker.record_success()
+                return response
+            except requests.exceptions.HTTPError as e:
+                # Client errors come from a healthy backend; server errors count against it
+                if e.response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                
+                # Extract error details from response
+                detail = None
+                try:
+                    error_data = e.response.json()
+                    detail = error_data.get("detail", str(e))
+                except:
+                    detail = str(e)
+                
+                raise APIError(
+                    message=f"HTTP error: {e.response.status_code}",
+                    status_code=e.response.status_code,
+                    detail=detail
+                )
+            except requests.exceptions.ConnectionError as e:
+                self.breaker.record_failure()
+                raise APIError(
+                    message=f"接続エラー: バックエンドに接続できません ({self.base_url})",
+                    detail=str(e)
+                )
+            except requests.exceptions.Timeout as e:
+                self.breaker.record_failure()
+                raise APIError(
+                    message=f"タイムアウト: リクエストが{self.timeout}秒以内に完了しませんでした",
+                    detail=str(e)
+                )
+            except requests.exceptions.RequestException as e:
+                # Includes RetryError when 5xx responses exhausted the retries
+                self.breaker.record_failure()
+                raise APIError(
+                    message=f"リクエストエラー: {str(e)}",
+                    detail=str(e)
+                )
+    
+    @staticmethod
+    def _cache_ttl(endpoint: str) -> float:
+        """
+        Seconds a GET response of an endpoint is cached (0 = not cached)
+        
+        Args:
+            endpoint: API endpoint (without base URL)
+        
+        Returns:
+            TTL in seconds
+        """
+        if not settings.api_cache_enabled:
+            return 0.0
+        if endpoint.startswith("/api/categories"):
+            return settings.api_cache_ttl_categories
+        if endpoint.startswith("/api/summary"):
+            return settings.api_cache_ttl_summary
+        if endpoint.startswith(("/api/monthly-budgets", "/api/budgets")):
+            return settings.api_cache_ttl_budgets
+        if endpoint.startswith("/api/expenses"):
+            return settings.api_cache_ttl_expenses
+        return 0.0
+    
+    def _get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        GET an endpoint through the response cache
+        
+        Args:
+            endpoint: API endpoint (without base URL)
+            params: Query parameters
+        
+        Returns:
+            Decoded JSON response
+        
+        Raises:
+            APIError: If request fails
+        """
+        return self._fetch(endpoint, params).data
+    
+    def _fetch(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        allow_stale: bool = False
+    ) -> Fetched:
+        """
+        GET an endpoint through the response cache, revalidating expired entries
+        
+        The raw body is cached and decoded on every call, so callers may modify
+        the returned data without affecting other sessions.
+        
+        Args:
+            endpoint: API endpoint (without base URL)
+            params: Query parameters
+            allow_stale: Return the last known good response (marked stale) when the
+                backend is unreachable or failing, instead of raising
+        
+        Returns:
+            Decoded response with its version and poll interval hint
+        
+        Raises:
+            APIError: If request fails (and no stale response is allowed or available)
+        """
+        key: Tuple[str, Any] = (endpoint, tuple(sorted((params or {}).items())))
+        ttl = self._cache_ttl(endpoint)
+        if ttl > 0 and getattr(self._local, "prefetching", False):
+            ttl = max(ttl, settings.prefetch_ttl)
+        entry = self.cache.get(key) if ttl > 0 else None
+        if entry is None:
+            try:
+                entry = self._revalidate(endpoint, params, key)
+            except APIError as e:
+                backend_down = e.status_code is None or e.status_code >= 500
+                last_good = self._last_good.get(key) if allow_stale and backend_down else None
+                if last_good is None:
+                    raise
+                etag, last_modified, content, fetched_at = last_good
+                return Fetched(json.loads(content), self._version(etag, last_modified, content), None, fetched_at, True)
+            if ttl > 0:
+                self.cache.set(key, entry, ttl)
+        content, version, poll_interval, fetched_at = entry
+        return Fetched(json.loads(content), version, poll_interval, fetched_at)
+    
+    def _revalidate(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        key: Tuple[str, Any]
+    ) -> Tuple[bytes, str, Optional[float], float]:
+        """
+        Send a conditional GET with the validators of the last response for the URL
+        
+        A 304 Not Modified response reuses the stored body, so nothing is downloaded.
+        
+        Args:
+            endpoint: API endpoint (without base URL)
+            params: Query parameters
+            key: Cache key of the URL
+        
+        Returns:
+            Tuple of (body, version, poll interval hint, fetch time)
+        
+        Raises:
+            APIError: If request fails
+        """
+        stored = self._last_good.get(key)
+        headers = {}
+        if stored is not None:
+            etag, last_modified, _, _ = stored
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        
+        response = self._request("GET", endpoint, params=params, headers=headers)
+        if response.status_code == 304 and stored is not None:
+            content = stored[2]
+            etag = response.headers.get("ETag", stored[0])
+            last_modified = response.headers.get("Last-Modified", stored[1])
+        else:
+            content = response.content
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+        fetched_at = time.time()
+        self._last_good.set(key, (etag, last_modified, content, fetched_at), float("inf"))
+        
+        try:
+            poll_interval = float(response.headers["X-Poll-Interval"])
+        except (KeyError, ValueError):
+            poll_interval = None
+        return content, self._version(etag, last_modified, content), poll_interval, fetched_at
+    
+    @staticmethod
+    def _version(etag: Optional[str], last_modified: Optional[str], content: bytes) -> str:
+        """Version of a response: its ETag, else Last-Modified, else a hash of the body"""
+        return etag or last_modified or hashlib.blake2b(content, digest_size=16).hexdigest()
+    
+    def _write(self, method: str, endpoint: str, invalidates: Tuple[str, ...], **kwargs) -> Any:
+        """
+        Send a write request and drop the cached responses it affects
+        
+        The cache is also invalidated when the request fails, since a write that
+        timed out may still have been applied by the backend.
+        
+        Args:
+            method: HTTP method
+            endpoint: API endpoint (without base URL)
+            invalidates: Endpoint prefixes whose cached responses become stale
+            **kwargs: Arguments for _request
+        
+        Returns:
+            Decoded JSON response
+        
+        Raises:
+            APIError: If request fails
+        """
+        try:
+            return self._request(method, endpoint, **kwargs).json()
+        finally:
+            self.cache.invalidate(*invalidates)
+    
+    @staticmethod
+    def _record_response(span, response: requests.Response) -> None:
+        """
+        Add status, retry count and the backend's span to a client span
+        
+        Args:
+            span: Client span, or None when tracing is disabled
+            response: Final response
+        """
+        if span is None:
+            return
+        span.attributes["http.status_code"] = response.status_code
+        retries = getattr(getattr(response.raw, "retries", None), "history", None)
+        if retries:
+            span.attributes["http.retries"] = len(retries)
+        if "traceresponse" in response.headers:
+            span.attributes["server.span"] = response.headers["traceresponse"]
     
     def health_check(self) -> Dict[str, Any]:
         """Check API health"""
@@ -107,7 +449,13 @@ class APIClient:
     
     # Budget endpoints
     
-    def create_budget(self, month: str, category: str, amount: int) -> Dict[str, Any]:
+    def create_budget(
+        self,
+        month: str,
+        category: str,
+        amount: int,
+        idempotency_key: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Create or update budget
         
@@ -115,16 +463,18 @@ class APIClient:
             month: Month in YYYY-MM format
             category: Budget category
             amount: Budget amount in yen
+            idempotency_key: Optional Idempotency-Key (default: new UUID)
         
         Returns:
             Created/updated budget data
         """
-        response = self._request(
+        return self._write(
             "POST",
             "/api/budgets",
+            BUDGET_WRITES,
+            idempotency_key=idempotency_key,
             json={"month": month, "category": category, "amount": amount}
         )
-        return response.json()
     
     def get_budgets(self, month: Optional[str] = None) -> List[Dict[str, Any]]:
         """
@@ -137,8 +487,7 @@ class APIClient:
             List of budget data
         """
         params = {"month": month} if month else {}
-        response = self._request("GET", "/api/budgets", params=params)
-        return response.json()
+        return self._get("/api/budgets", params)
     
     def get_budget(self, budget_id: int) -> Dict[str, Any]:
         """
@@ -150,8 +499,7 @@ class APIClient:
         Returns:
             Budget data
         """
-        response = self._request("GET", f"/api/budgets/{budget_id}")
-        return response.json()
+        return self._get(f"/api/budgets/{budget_id}")
     
     def delete_budget(self, budget_id: int) -> Dict[str, Any]:
         """
@@ -163,8 +511,7 @@ class APIClient:
         Returns:
             Deletion confirmation
         """
-        response = self._request("DELETE", f"/api/budgets/{budget_id}")
-        return response.json()
+        return self._write("DELETE", f"/api/budgets/{budget_id}", BUDGET_WRITES)
     
     # Expense endpoints
     
@@ -173,7 +520,8 @@ class APIClient:
         date: str,
         category: str,
         amount: int,
-        memo: Optional[str] = None
+        memo: Optional[str] = None,
+        idempotency_key: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Create expense
@@ -183,6 +531,7 @@ class APIClient:
             category: Expense category
             amount: Expense amount in yen
             memo: Optional memo
+            idempotency_key: Optional Idempotency-Key (default: new UUID)
         
         Returns:
             Created expense data
@@ -195,8 +544,7 @@ class APIClient:
         if memo:
             data["memo"] = memo
         
-        response = self._request("POST", "/api/expenses", json=data)
-        return response.json()
+        return self._write("POST", "/api/expenses", EXPENSE_WRITES, idempotency_key=idempotency_key, json=data)
     
     def get_expenses(
         self,
@@ -219,8 +567,43 @@ class APIClient:
         if category:
             params["category"] = category
         
-        response = self._request("GET", "/api/expenses", params=params)
-        return response.json()
+        return self._get("/api/expenses", params)
+    
+    def get_expense_page(
+        self,
+        month: Optional[str] = None,
+        category: Optional[str] = None,
+        sort: str = "date",
+        descending: bool = True,
+        offset: int = 0,
+        limit: int = 50
+    ) -> Dict[str, Any]:
+        """
+        Get one page of expenses, optionally filtered by month and/or category
+        
+        Args:
+            month: Optional month filter in YYYY-MM format
+            category: Optional category filter
+            sort: Column to sort by (date, amount, category, created_at, id)
+            descending: Sort in descending order
+            offset: Number of expenses to skip
+            limit: Page size (at most 500)
+        
+        Returns:
+            Dictionary with items (expense data), total, offset and limit
+        """
+        params = {
+            "sort": sort,
+            "order": "desc" if descending else "asc",
+            "offset": offset,
+            "limit": limit
+        }
+        if month:
+            params["month"] = month
+        if category:
+            params["category"] = category
+        
+        return self._get("/api/expenses/page", params)
     
     def get_expense(self, expense_id: int) -> Dict[str, Any]:
         """
@@ -232,8 +615,7 @@ class APIClient:
         Returns:
             Expense data
         """
-        response = self._request("GET", f"/api/expenses/{expense_id}")
-        return response.json()
+        return self._get(f"/api/expenses/{expense_id}")
     
     def delete_expense(self, expense_id: int) -> Dict[str, Any]:
         """
@@ -245,8 +627,19 @@ class APIClient:
         Returns:
             Deletion confirmation
         """
-        response = self._request("DELETE", f"/api/expenses/{expense_id}")
-        return response.json()
+        return self._write("DELETE", f"/api/expenses/{expense_id}", EXPENSE_WRITES)
+    
+    def delete_expenses(self, expense_ids: List[int]) -> Dict[str, List[int]]:
+        """
+        Delete several expenses in one request
+        
+        Args:
+            expense_ids: Expense IDs (at most 500)
+        
+        Returns:
+            Dictionary with deleted, not_found and archived ID lists
+        """
+        return self._write("POST", "/api/expenses/bulk-delete", EXPENSE_WRITES, json={"ids": expense_ids})
     
     def get_expense_statistics(self, month: str) -> Dict[str, int]:
         """
@@ -258,24 +651,23 @@ class APIClient:
         Returns:
             Dictionary with category as key and total amount as value
         """
-        response = self._request("GET", f"/api/expenses/statistics/{month}")
-        return response.json()
+        return self._get(f"/api/expenses/statistics/{month}")
     
     # Category endpoints
     
-    def get_categories(self, category_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    def get_categories(self, category_type: Optional[str] = None, allow_stale: bool = False) -> List[Dict[str, Any]]:
         """
         Get all categories, optionally filtered by type
         
         Args:
             category_type: Optional category type filter (fixed, variable, lifestyle, event)
+            allow_stale: Return the last categories received while the backend is unreachable
         
         Returns:
             List of category data
         """
         params = {"type": category_type} if category_type else {}
-        response = self._request("GET", "/api/categories", params=params)
-        return response.json()
+        return self._fetch("/api/categories", params, allow_stale=allow_stale).data
     
     def get_category(self, category_id: str) -> Dict[str, Any]:
         """
@@ -287,12 +679,17 @@ class APIClient:
         Returns:
             Category data
         """
-        response = self._request("GET", f"/api/categories/{category_id}")
-        return response.json()
+        return self._get(f"/api/categories/{category_id}")
     
     # Monthly Budget endpoints
     
-    def create_monthly_budget(self, month: str, category_id: str, amount: int) -> Dict[str, Any]:
+    def create_monthly_budget(
+        self,
+        month: str,
+        category_id: str,
+        amount: int,
+        idempotency_key: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Create or update monthly budget
         
@@ -300,16 +697,18 @@ class APIClient:
             month: Month in YYYY-MM format
             category_id: Category ID
             amount: Budget amount in yen
+            idempotency_key: Optional Idempotency-Key (default: new UUID)
         
         Returns:
             Created/updated monthly budget data
         """
-        response = self._request(
+        return self._write(
             "POST",
             "/api/monthly-budgets",
+            BUDGET_WRITES,
+            idempotency_key=idempotency_key,
             json={"month": month, "category_id": category_id, "amount": amount}
         )
-        return response.json()
     
     def get_monthly_budgets(
         self,
@@ -330,8 +729,7 @@ class APIClient:
         if category_type:
             params["category_type"] = category_type
         
-        response = self._request("GET", "/api/monthly-budgets", params=params)
-        return response.json()
+        return self._get("/api/monthly-budgets", params)
     
     def get_monthly_budget(self, budget_id: int) -> Dict[str, Any]:
         """
@@ -343,8 +741,7 @@ class APIClient:
         Returns:
             Monthly budget data
         """
-        response = self._request("GET", f"/api/monthly-budgets/{budget_id}")
-        return response.json()
+        return self._get(f"/api/monthly-budgets/{budget_id}")
     
     def delete_monthly_budget(self, budget_id: int) -> Dict[str, Any]:
         """
@@ -356,8 +753,7 @@ class APIClient:
         Returns:
             Deletion confirmation
         """
-        response = self._request("DELETE", f"/api/monthly-budgets/{budget_id}")
-        return response.json()
+        return self._write("DELETE", f"/api/monthly-budgets/{budget_id}", BUDGET_WRITES)
     
     def get_monthly_budget_summary(self, month: str) -> Dict[str, Any]:
         """
@@ -369,8 +765,7 @@ class APIClient:
         Returns:
             Summary data with total budget amount
         """
-        response = self._request("GET", f"/api/monthly-budgets/summary/{month}")
-        return response.json()
+        return self._get(f"/api/monthly-budgets/summary/{month}")
     
     # Summary endpoint
     
@@ -385,8 +780,30 @@ class APIClient:
             Summary data including totals, remaining, usage rate, and status
         """
         params = {"month": month} if month else {}
-        response = self._request("GET", "/api/summary", params=params)
-        return response.json()
+        return self._get("/api/summary", params)
+    
+    def poll_summary(self, month: Optional[str] = None) -> Fetched:
+        """
+        Get monthly summary for a poller
+        
+        Args:
+            month: Optional month in YYYY-MM format (defaults to current month)
+        
+        Returns:
+            Summary data with its version (unchanged while the summary is the same)
+            and the server's poll interval hint; while the backend is unreachable,
+            the last known good summary marked stale
+        
+        Raises:
+            APIError: If request fails and no summary of the month was fetched before
+        """
+        params = {"month": month} if month else {}
+        return self._fetch("/api/summary", params, allow_stale=True)
+
+
+# Cached GET endpoints dropped after each kind of write
+EXPENSE_WRITES = ("/api/expenses", "/api/summary")
+BUDGET_WRITES = ("/api/monthly-budgets", "/api/budgets", "/api/summary")
 
 
 # Global API client instance
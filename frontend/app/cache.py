@@ -0,0 +1,104 @@
+"""Process-wide TTL/LRU cache of GET responses, shared by every Streamlit session"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class ResponseCache:
+    """
+    LRU cache whose entries also expire after a per-entry TTL
+
+    Keys are (endpoint, params) tuples, so invalidate() can drop every cached
+    response of an endpoint prefix after a write.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Entries kept; the least recently used are dropped first
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, Hashable]) -> Optional[Any]:
+        """
+        Get a cached value
+
+        Args:
+            key: (endpoint, params) tuple
+
+        Returns:
+            The value, or None if it is missing or expired
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Tuple[str, Hashable], value: Any, ttl: float) -> None:
+        """
+        Store a value
+
+        Args:
+            key: (endpoint, params) tuple
+            value: Value to cache
+            ttl: Seconds until the entry expires
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *prefixes: str) -> int:
+        """
+        Drop entries whose endpoint starts with any of the prefixes
+
+        Args:
+            *prefixes: Endpoint prefixes such as "/api/expenses"
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            stale = [key for key in self._entries if key[0].startswith(prefixes)]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the hit/miss counters
+
+        Returns:
+            Dictionary with hits, misses, hit_rate (0-1) and entries
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
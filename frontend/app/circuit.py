@@ -0,0 +1,87 @@
+"""Circuit breaker: fail fast while the backend is unreachable"""
+
+import threading
+import time
+from typing import Any, Dict
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Opens after consecutive failures and rejects calls until a timer expires
+
+    After reset_timeout seconds the breaker half-opens and lets a single trial
+    call through: its success closes the breaker, its failure opens it again
+    for another reset_timeout. Shared by every session using the same client.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 15.0):
+        """
+        Initialize the breaker
+
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds the breaker stays open before a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may be sent now
+
+        Returns:
+            True if the breaker is closed or this call is the half-open trial
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Record a call that reached a healthy backend"""
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a call that failed because of the backend (connection error, timeout, 5xx)"""
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def retry_in(self) -> float:
+        """Seconds until the open breaker lets a trial call through (0 if not open)"""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the breaker state
+
+        Returns:
+            Dictionary with state, consecutive failures and seconds until the next trial
+        """
+        retry_in = self.retry_in()
+        with self._lock:
+            return {"state": self.state, "failures": self.failures, "retry_in": retry_in}
@@ -1,6 +1,7 @@
 """Configuration management for the frontend application"""
 
 import os
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 
@@ -14,10 +15,47 @@ class Settings(BaseSettings):
     timezone: str = "Asia/Tokyo"
     
     # Auto refresh
-    auto_refresh_interval: int = 30  # seconds
+    auto_refresh_interval: int = 30  # seconds while the summary changes
+    auto_refresh_max_interval: int = 300  # longest interval reached by backing off while nothing changes
+    auto_refresh_backoff: float = 2.0  # interval multiplier after an unchanged poll
+    
+    # API client
+    api_max_concurrency: int = 4  # requests a page issues in parallel via APIClient.gather
+    api_pool_connections: int = 1  # per-host connection pools kept (the client talks to one backend)
+    api_pool_maxsize: int = 16  # keep-alive connections shared by all sessions and gather() workers
+    api_pool_block: bool = False  # wait for a free connection instead of opening a throwaway one
+    
+    # Response cache (GET responses shared by all sessions; writes invalidate affected endpoints)
+    api_cache_enabled: bool = True
+    api_cache_max_entries: int = 256
+    api_cache_ttl_categories: float = 300.0  # seconds
+    api_cache_ttl_budgets: float = 60.0
+    api_cache_ttl_expenses: float = 30.0
+    api_cache_ttl_summary: float = 10.0
+    
+    # Prefetching (adjacent months warmed in the background for instant month switching)
+    prefetch_enabled: bool = True
+    prefetch_workers: int = 2  # prefetch calls running at the same time, across all sessions
+    prefetch_ttl: float = 60.0  # seconds a prefetched response stays cached (at least the endpoint's TTL)
+    
+    # Outbox (expense entries that failed to send, resent in the background when the backend is back)
+    outbox_enabled: bool = True
+    outbox_path: str = "/tmp/home-finance/outbox.db"  # SQLite file; mount a volume to keep it across pod restarts
+    outbox_drain_interval: float = 10.0  # seconds between checks for pending entries
+    outbox_batch_size: int = 10  # entries resent in parallel per batch
+    
+    # Circuit breaker (fail fast while the backend is unreachable)
+    circuit_failure_threshold: int = 3  # consecutive failures that open the breaker
+    circuit_reset_timeout: float = 15.0  # seconds before a trial request is let through
     
     # Kiosk mode
     kiosk_mode: bool = False
+    kiosk_rotate_interval: int = 0  # seconds per slide when rotating months/categories (0 = no rotation)
+    kiosk_rotate_months: int = 3  # months rotated through, counting back from the current one
+    
+    # Tracing (traceparent sent to the backend; spans kept in memory and optionally in a JSONL file)
+    tracing_enabled: bool = False
+    tracing_jsonl_path: Optional[str] = None
     
     class Config:
         env_file = ".env"
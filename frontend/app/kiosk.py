@@ -0,0 +1,85 @@
+"""Kiosk rotation: cycle the summary and the category statistics through recent months"""
+
+import time
+from typing import List, Tuple
+
+import streamlit as st
+
+from app.config import settings
+from app.pages import dashboard, expense_statistics
+from app.prefetch import prefetch
+from app.utils.formatting import format_month, get_current_month, shift_month
+
+# Rotated pages and the session state key of their month input
+PAGES = {
+    "dashboard": (dashboard, "dashboard_month"),
+    "expense_statistics": (expense_statistics, "statistics_month"),
+}
+
+PAGE_LABELS = {"dashboard": "集計", "expense_statistics": "カテゴリ別支出"}
+
+
+def rotation_enabled() -> bool:
+    """Whether the kiosk rotates through slides"""
+    return settings.kiosk_mode and settings.kiosk_rotate_interval > 0
+
+
+def slides() -> List[Tuple[str, str]]:
+    """
+    Get the rotated slides
+
+    Returns:
+        (page, month) pairs: the summary and then the category statistics of
+        each month, from the current month back settings.kiosk_rotate_months months
+    """
+    current_month = get_current_month()
+    months = [shift_month(current_month, -n) for n in range(max(1, settings.kiosk_rotate_months))]
+    return [(page, month) for month in months for page in PAGES]
+
+
+def show_slide(index: int) -> None:
+    """
+    Switch the session to a slide (takes effect in the page rendered next)
+
+    Args:
+        index: Slide index, wrapped around the number of slides
+    """
+    rotation = slides()
+    index %= len(rotation)
+    page, month = rotation[index]
+    st.session_state.page = page
+    st.session_state[PAGES[page][1]] = month
+    st.session_state["kiosk_slide"] = index
+    st.session_state["kiosk_shown_at"] = time.monotonic()
+
+
+def start() -> None:
+    """Show the first slide when the session starts (call before page routing)"""
+    if "kiosk_slide" not in st.session_state:
+        show_slide(0)
+
+
+def render_rotation() -> None:
+    """
+    Prefetch the next slide and schedule the switch to it (call after page routing)
+
+    The next slide's data is requested in the background while the current one
+    is shown, so switching renders from the response cache without a spinner.
+    """
+    rotation = slides()
+    page, month = rotation[(st.session_state["kiosk_slide"] + 1) % len(rotation)]
+    prefetch(PAGES[page][0].prefetch_calls(month))
+    st.fragment(run_every=settings.kiosk_rotate_interval)(_advance)()
+
+
+def _advance() -> None:
+    """Fragment body: switch to the next slide once the current one was shown long enough"""
+    # The fragment also runs with the full run that showed the slide; only timer runs switch
+    elapsed = time.monotonic() - st.session_state["kiosk_shown_at"]
+    if elapsed >= settings.kiosk_rotate_interval * 0.9:
+        show_slide(st.session_state["kiosk_slide"] + 1)
+        st.rerun()
+
+    rotation = slides()
+    page, month = rotation[(st.session_state["kiosk_slide"] + 1) % len(rotation)]
+    st.caption(f"🔁 次: {format_month(month)} の{PAGE_LABELS[page]}")
@@ -1,7 +1,12 @@
 """Streamlit application entry point"""
 
 import streamlit as st
+from app.api_client import api_client
 from app.config import settings
+from app.prefetch import cancel_prefetch, prefetcher
+from app.outbox import drainer, outbox, PENDING, REJECTED
+from app.tracing import tracer
+from app import kiosk
 
 # Page configuration
 st.set_page_config(
@@ -35,6 +40,18 @@ if settings.kiosk_mode:
 if "page" not in st.session_state:
     st.session_state.page = "dashboard"
 
+# Rotating kiosk: start on the first slide (the rotation timer switches slides after routing)
+if kiosk.rotation_enabled():
+    kiosk.start()
+
+# Resend queued expense entries in the background (one thread per process)
+if settings.outbox_enabled:
+    drainer.start()
+
+# A full run means the session navigated or changed an input: drop the prefetches
+# queued for what it showed before (the page queues what it needs now)
+cancel_prefetch()
+
 # Sidebar navigation
 with st.sidebar:
     st.title("📊 ナビゲーション")
@@ -47,6 +64,8 @@ with st.sidebar:
     
     if st.button("💰 予算管理", use_container_width=True):
         st.session_state.page = "manage_budget"
+        # Opening the page reloads the budgets it keeps in session state
+        st.session_state.pop("budget_state", None)
     
     if st.button("📊 支出統計", use_container_width=True):
         st.session_state.page = "expense_statistics"
@@ -56,17 +75,57 @@ with st.sidebar:
     st.caption(f"Timezone: {settings.timezone}")
     if settings.kiosk_mode:
         st.caption("🖥️ Kioskモード")
+        if kiosk.rotation_enabled():
+            st.caption(f"🔁 {settings.kiosk_rotate_interval}秒ごとに表示を切り替え")
 
-# Page routing
-if st.session_state.page == "dashboard":
-    from app.pages import dashboard
-    dashboard.render()
-elif st.session_state.page == "add_expense":
-    from app.pages import add_expense
-    add_expense.render()
-elif st.session_state.page == "manage_budget":
-    from app.pages import manage_budget
-    manage_budget.render()
-elif st.session_state.page == "expense_statistics":
-    from app.pages import expense_statistics
-    expense_statistics.render()
+# Page routing (one trace per script run; API calls of the page become its child spans)
+with tracer.span(f"page:{st.session_state.page}") as page_span:
+    if st.session_state.page == "dashboard":
+        from app.pages import dashboard
+        dashboard.render()
+    elif st.session_state.page == "add_expense":
+        from app.pages import add_expense
+        add_expense.render()
+    elif st.session_state.page == "manage_budget":
+        from app.pages import manage_budget
+        manage_budget.render()
+    elif st.session_state.page == "expense_statistics":
+        from app.pages import expense_statistics
+        expense_statistics.render()
+    
+    if kiosk.rotation_enabled():
+        kiosk.render_rotation()
+
+# Outbox and debug captions (after routing, so they include this run)
+with st.sidebar:
+    if settings.outbox_enabled:
+        try:
+            pending_count = outbox.count(PENDING)
+            rejected_count = outbox.count(REJECTED)
+        except Exception as e:
+            st.caption(f"📮 送信待ちを確認できません: {e}")
+        else:
+            if pending_count:
+                st.caption(f"📮 送信待ち: {pending_count}件")
+            if rejected_count:
+                st.caption(f"⚠️ 登録できなかった支出: {rejected_count}件（支出追加ページで確認）")
+    if page_span is not None:
+        st.caption(f"🔎 Trace: `{page_span.trace_id}` ({page_span.duration * 1000:.0f} ms)")
+    breaker_stats = api_client.breaker.stats()
+    if breaker_stats["state"] != "closed":
+        st.caption(
+            f"🔌 Backend: {breaker_stats['state']} "
+            f"({breaker_stats['failures']} failures, retry in {breaker_stats['retry_in']:.0f}s)"
+        )
+    if settings.api_cache_enabled:
+        cache_stats = api_client.cache.stats()
+        st.caption(
+            f"🗄️ Cache: {cache_stats['hits']} hit / {cache_stats['misses']} miss "
+            f"({cache_stats['hit_rate']:.0%}, {cache_stats['entries']} entries)"
+        )
+    if settings.prefetch_enabled:
+        prefetch_stats = prefetcher.stats()
+        st.caption(
+            f"⏩ Prefetch: {prefetch_stats['completed']} done / {prefetch_stats['pending']} pending "
+            f"/ {prefetch_stats['cancelled']} cancelled"
+        )
@@ -0,0 +1,299 @@
+"""Persistent outbox: expense entries that could not be sent, resent when the backend is back"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from app.api_client import api_client, APIClient, APIError
+from app.config import settings
+
+PENDING = "pending"
+REJECTED = "rejected"
+
+# Statuses meaning the backend may accept the same request later
+RETRYABLE_STATUS_CODES = (409, 429)  # 409: the original attempt is still in progress
+
+
+def is_retryable(error: APIError) -> bool:
+    """
+    Check whether a failed write may succeed when sent again unchanged
+
+    Args:
+        error: Error raised by the API client
+
+    Returns:
+        True for connection errors, timeouts, an open circuit breaker, 5xx,
+        409 and 429; False for other client errors (the backend rejected the data)
+    """
+    return (
+        error.status_code is None
+        or error.status_code >= 500
+        or error.status_code in RETRYABLE_STATUS_CODES
+    )
+
+
+class OutboxEntry(NamedTuple):
+    """Queued create_expense call"""
+    id: int
+    idempotency_key: str
+    expense: Dict[str, Any]  # create_expense arguments (date, category, amount, memo)
+    created_at: float  # Unix time the entry was queued
+    attempts: int
+    status: str  # PENDING or REJECTED
+    last_error: Optional[str]
+
+
+class DrainResult(NamedTuple):
+    """Outcome of one drain"""
+    sent: int
+    rejected: int
+    remaining: int
+
+
+class Outbox:
+    """
+    SQLite-backed queue of create_expense calls
+
+    Each entry keeps the Idempotency-Key of the attempt that failed, so
+    resending it is applied at most once while the backend still remembers
+    the key. Entries the backend rejects (4xx) are kept as rejected for the
+    user to review instead of being retried or silently dropped.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the outbox (the database is created on first use)
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        # Held for a whole drain, so the drainer thread and the resend button never send the same entries
+        self._drain_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection, creating the database on first use"""
+        if not self._initialized:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._initialized:
+            with conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS outbox ("
+                    " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                    " idempotency_key TEXT NOT NULL UNIQUE,"
+                    " expense TEXT NOT NULL,"
+                    " created_at REAL NOT NULL,"
+                    " attempts INTEGER NOT NULL DEFAULT 0,"
+                    " status TEXT NOT NULL DEFAULT 'pending',"
+                    " last_error TEXT)"
+                )
+            self._initialized = True
+        return conn
+
+    def enqueue(self, expense: Dict[str, Any], idempotency_key: str, error: Optional[str] = None) -> None:
+        """
+        Queue a create_expense call (queuing the same key again is a no-op)
+
+        Args:
+            expense: create_expense arguments (date, category, amount, memo)
+            idempotency_key: Idempotency-Key of the failed attempt
+            error: Message of the failure
+        """
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO outbox (idempotency_key, expense, created_at, attempts, last_error)"
+                " VALUES (?, ?, ?, 1, ?)",
+                (idempotency_key, json.dumps(expense, ensure_ascii=False), time.time(), error)
+            )
+
+    def entries(self, status: str = PENDING, limit: Optional[int] = None) -> List[OutboxEntry]:
+        """
+        Get queued entries, oldest first
+
+        Args:
+            status: PENDING or REJECTED
+            limit: Maximum number of entries (default: all)
+
+        Returns:
+            List of entries
+        """
+        with self._lock, closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, idempotency_key, expense, created_at, attempts, status, last_error"
+                " FROM outbox WHERE status = ? ORDER BY id LIMIT ?",
+                (status, limit if limit is not None else -1)
+            ).fetchall()
+        return [OutboxEntry(row[0], row[1], json.loads(row[2]), *row[3:]) for row in rows]
+
+    def count(self, status: str = PENDING) -> int:
+        """
+        Count queued entries
+
+        Args:
+            status: PENDING or REJECTED
+
+        Returns:
+            Number of entries
+        """
+        with self._lock, closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM outbox WHERE status = ?", (status,)).fetchone()[0]
+
+    def remove(self, entry_id: int) -> None:
+        """Delete an entry (sent, or discarded by the user)"""
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM outbox WHERE id = ?", (entry_id,))
+
+    def record_failure(self, entry_id: int, error: str, rejected: bool = False) -> None:
+        """
+        Record a failed resend
+
+        Args:
+            entry_id: Entry ID
+            error: Message of the failure
+            rejected: Whether the backend rejected the data (stops resending)
+        """
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE outbox SET attempts = attempts + 1, last_error = ?, status = ? WHERE id = ?",
+                (error, REJECTED if rejected else PENDING, entry_id)
+            )
+
+    def drain(self, client: APIClient, batch_size: int = 10) -> DrainResult:
+        """
+        Resend pending entries in batches until the queue is empty or the backend fails again
+
+        The entries of a batch are sent in parallel through client.gather.
+        A drain started while another one runs waits for it and then sends
+        whatever is still pending.
+
+        Args:
+            client: API client to send with
+            batch_size: Entries per batch
+
+        Returns:
+            Numbers of entries sent, rejected and still pending
+        """
+        with self._drain_lock:
+            return self._drain(client, batch_size)
+
+    def _drain(self, client: APIClient, batch_size: int) -> DrainResult:
+        """Body of drain (called with the drain lock held)"""
+        sent = rejected = 0
+        while True:
+            batch = self.entries(PENDING, batch_size)
+            if not batch:
+                break
+            results = client.gather(
+                *[
+                    lambda entry=entry: client.create_expense(**entry.expense, idempotency_key=entry.idempotency_key)
+                    for entry in batch
+                ],
+                return_exceptions=True
+            )
+            backend_failed = False
+            for entry, result in zip(batch, results):
+                if not isinstance(result, Exception):
+                    self.remove(entry.id)
+                    sent += 1
+                elif isinstance(result, APIError) and is_retryable(result):
+                    self.record_failure(entry.id, result.message)
+                    backend_failed = True
+                else:
+                    detail = getattr(result, "detail", None) or str(result)
+                    self.record_failure(entry.id, f"{getattr(result, 'message', result)}: {detail}", rejected=True)
+                    rejected += 1
+            if backend_failed:
+                break
+        return DrainResult(sent, rejected, self.count(PENDING))
+
+
+class OutboxDrainer:
+    """
+    Background thread draining the outbox whenever the backend is healthy
+
+    Every interval the thread checks for pending entries and, if there are
+    any, calls the backend's health check (which goes through the circuit
+    breaker, so a down backend costs nothing while the breaker is open)
+    before draining.
+    """
+
+    def __init__(self, outbox: Outbox, client: APIClient, interval: float = 10.0, batch_size: int = 10):
+        """
+        Initialize the drainer
+
+        Args:
+            outbox: Outbox to drain
+            client: API client to send with
+            interval: Seconds between checks
+            batch_size: Entries sent per batch
+        """
+        self.outbox = outbox
+        self.client = client
+        self.interval = interval
+        self.batch_size = batch_size
+        self.last_result: Optional[DrainResult] = None
+        self.last_error: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the thread (no-op if it is running)"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="outbox-drain", daemon=True)
+                self._thread.start()
+
+    def wake(self) -> None:
+        """Check for pending entries now instead of at the next interval"""
+        self._wake.set()
+
+    def stop(self) -> None:
+        """Stop the thread after its current drain"""
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self) -> None:
+        """Thread body"""
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if not self._stop.is_set():
+                self.drain_once()
+
+    def drain_once(self) -> Optional[DrainResult]:
+        """
+        Drain the outbox if it has pending entries and the backend is healthy
+
+        Returns:
+            Outcome of the drain, or None if nothing was sent
+        """
+        try:
+            if self.outbox.count(PENDING) == 0:
+                return None
+            self.client.health_check()
+            self.last_result = self.outbox.drain(self.client, self.batch_size)
+            self.last_error = None
+            return self.last_result
+        except APIError as e:
+            self.last_error = e.message
+        except (sqlite3.Error, OSError) as e:
+            self.last_error = f"outbox: {e}"
+        return None
+
+
+# Global outbox and its drainer (started by the app on first run)
+outbox = Outbox(settings.outbox_path)
+drainer = OutboxDrainer(outbox, api_client, settings.outbox_drain_interval, settings.outbox_batch_size)
@@ -1,8 +1,13 @@
 """Add expense page - form to add new expenses"""
 
 import streamlit as st
-from datetime import date
+import sqlite3
+import uuid
+from datetime import date, datetime
+import pytz
 from app.api_client import api_client, APIError
+from app.config import settings
+from app.outbox import drainer, is_retryable, outbox, PENDING, REJECTED
 from app.utils.validation import (
     validate_date,
     validate_amount,
@@ -24,7 +29,8 @@ def render():
         # Get categories from API
         try:
             from app.api_client import api_client
-            categories_data = api_client.get_categories()
+            # The last categories received keep the form usable while the backend is unreachable
+            categories_data = api_client.get_categories(allow_stale=True)
             # Create mapping from ID to name for display
             category_options = {cat["id"]: cat["name"] for cat in categories_data if cat.get("is_active", True)}
             category_ids = sorted(category_options.keys())
@@ -103,15 +109,17 @@ def render():
                 for error in errors:
                     st.error(f"❌ {error}")
             else:
-                # Submit to API
+                # Submit to API (a failed entry is queued with the same Idempotency-Key)
+                expense = {
+                    "date": date_str,
+                    "category": category_id,
+                    "amount": amount,
+                    "memo": memo if memo else None
+                }
+                idempotency_key = str(uuid.uuid4())
                 try:
                     with st.spinner("登録中..."):
-                        result = api_client.create_expense(
-                            date=date_str,
-                            category=category_id,
-                            amount=amount,
-                            memo=memo if memo else None
-                        )
+                        result = api_client.create_expense(**expense, idempotency_key=idempotency_key)
                     
                     st.success(f"✅ 支出を登録しました！（ID: {result['id']}）")
                     st.balloons()
@@ -124,21 +132,27 @@ def render():
                     st.info("💡 ダッシュボードで集計を確認できます")
                 
                 except APIError as e:
-                    st.error(f"❌ 登録に失敗しました: {e.message}")
-                    if e.detail:
-                        st.error(f"詳細: {e.detail}")
+                    if settings.outbox_enabled and is_retryable(e) and queue_expense(expense, idempotency_key, e):
+                        st.warning("📮 バックエンドに接続できないため、送信待ちに保存しました。接続が回復すると自動で登録されます")
+                        st.caption(f"理由: {e.message}")
+                    else:
+                        st.error(f"❌ 登録に失敗しました: {e.message}")
+                        if e.detail:
+                            st.error(f"詳細: {e.detail}")
                 
                 except Exception as e:
                     st.error(f"❌ 予期しないエラーが発生しました: {str(e)}")
     
+    if settings.outbox_enabled:
+        render_outbox()
+    
     # Display recent expenses
     st.divider()
     st.markdown("### 📋 最近の支出")
     
     try:
         with st.spinner("読み込み中..."):
-            expenses = api_client.get_expenses()
-            categories_data = api_client.get_categories()
+            expenses, categories_data = api_client.gather(api_client.get_expenses, api_client.get_categories)
         
         # Create mapping from ID to name
         category_map = {cat["id"]: cat["name"] for cat in categories_data}
@@ -184,3 +198,69 @@ def render():
     except Exception as e:
         st.warning(f"⚠️ 予期しないエラーが発生しました: {str(e)}")
 
+
+
+def queue_expense(expense: dict, idempotency_key: str, error: APIError) -> bool:
+    """
+    Save an expense that could not be sent to the outbox
+    
+    Args:
+        expense: create_expense arguments
+        idempotency_key: Idempotency-Key of the failed attempt
+        error: Error of the failed attempt
+    
+    Returns:
+        True if the expense was queued
+    """
+    try:
+        outbox.enqueue(expense, idempotency_key, error.message)
+        return True
+    except (sqlite3.Error, OSError) as e:
+        st.error(f"❌ 送信待ちへの保存に失敗しました: {str(e)}")
+        return False
+
+
+def render_outbox():
+    """Show the expenses waiting in the outbox and those the backend rejected"""
+    try:
+        pending = outbox.entries(PENDING)
+        rejected = outbox.entries(REJECTED)
+    except (sqlite3.Error, OSError) as e:
+        st.warning(f"⚠️ 送信待ちの読み込みに失敗しました: {str(e)}")
+        return
+    
+    if pending:
+        st.info(f"📮 送信待ち: {len(pending)}件（バックエンドへの接続が回復すると自動で登録されます）")
+        with st.expander("送信待ちの支出"):
+            for entry in pending:
+                render_outbox_entry(entry)
+            if st.button("📤 今すぐ再送", key="outbox_resend"):
+                result = drainer.drain_once()
+                if result is None:
+                    st.error(f"❌ 再送できませんでした: {drainer.last_error or '送信待ちはありません'}")
+                else:
+                    st.rerun()
+    
+    if rejected:
+        st.warning(f"⚠️ バックエンドに受け付けられなかった支出: {len(rejected)}件")
+        for entry in rejected:
+            col1, col2 = st.columns([5, 1])
+            with col1:
+                render_outbox_entry(entry)
+            with col2:
+                if st.button("🗑️", key=f"outbox_discard_{entry.id}", help="破棄"):
+                    outbox.remove(entry.id)
+                    st.rerun()
+
+
+def render_outbox_entry(entry):
+    """
+    Show one outbox entry
+    
+    Args:
+        entry: OutboxEntry to show
+    """
+    expense = entry.expense
+    queued_at = datetime.fromtimestamp(entry.created_at, pytz.timezone(settings.timezone)).strftime("%m/%d %H:%M")
+    st.text(f"{expense['date']}  {expense['category']}  ¥{expense['amount']:,}  {expense.get('memo') or ''}")
+    st.caption(f"保存: {queued_at}・送信試行: {entry.attempts}回・{entry.last_error or ''}")
@@ -3,24 +3,31 @@
 import streamlit as st
 import time
 from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Optional
+import pytz
 from app.api_client import api_client, APIError
 from app.components.summary_card import render_summary_card
 from app.components.status_card import render_status_card
-from app.utils.formatting import format_month, get_current_month
+from app.utils.formatting import format_age, format_month, get_current_month, shift_month
 from app.config import settings
+from app.polling import AdaptivePoller
+from app.prefetch import prefetch
+from app.tracing import tracer
 
 
 def render():
     """Render the dashboard page"""
     st.title("🏠 ダッシュボード")
     
-    # Month selector
+    # Month selector (read from session state by the summary fragment)
     col1, col2 = st.columns([3, 1])
     with col1:
         current_month = get_current_month()
+        # Seeded through session state, which the kiosk rotation also sets
+        st.session_state.setdefault("dashboard_month", current_month)
         selected_month = st.text_input(
             "表示月",
-            value=current_month,
+            key="dashboard_month",
             help="YYYY-MM形式で入力してください（例: 2025-12）"
         )
     
@@ -28,56 +35,136 @@ def render():
         st.write("")  # Spacing
         st.write("")  # Spacing
         if st.button("🔄 更新", use_container_width=True):
+            # An explicit refresh skips the cached summary and the poll schedule
+            api_client.cache.invalidate("/api/summary")
+            st.session_state.pop("summary_state", None)
             st.rerun()
     
     st.divider()
     
-    # Fetch and display summary
-    try:
-        # Show loading spinner
-        with st.spinner("データを読み込み中..."):
-            summary = api_client.get_summary(month=selected_month if selected_month else None)
-        
-        # Display month header
-        display_month = selected_month if selected_month else current_month
-        st.markdown(f"## {format_month(display_month)} の集計")
-        
-        # Render summary card
-        render_summary_card(summary)
-        
-        st.divider()
-        
-        # Render status card
-        render_status_card(summary)
-        
-        # Auto-refresh functionality
-        if settings.auto_refresh_interval > 0:
-            st.caption(f"⏱️ {settings.auto_refresh_interval}秒ごとに自動更新")
+    # Display month header
+    display_month = selected_month if selected_month else current_month
+    st.markdown(f"## {format_month(display_month)} の集計")
+    
+    # The fragment timer can only be (re)scheduled by a full run, so the
+    # interval it runs at is remembered for render_summary to compare against
+    interval = None
+    if settings.auto_refresh_interval > 0:
+        interval = get_poller().interval
+        st.caption(
+            f"⏱️ 自動更新: {interval:.0f}秒ごと"
+            f"（変化がなければ最大{settings.auto_refresh_max_interval}秒まで間隔を延長）"
+        )
+    st.session_state["summary_timer_interval"] = interval
+    
+    st.fragment(run_every=interval)(render_summary)()
+
+
+def get_poller() -> AdaptivePoller:
+    """Get this session's summary poller"""
+    if "summary_poller" not in st.session_state:
+        st.session_state["summary_poller"] = AdaptivePoller(
+            base_interval=settings.auto_refresh_interval,
+            max_interval=settings.auto_refresh_max_interval,
+            backoff=settings.auto_refresh_backoff
+        )
+    return st.session_state["summary_poller"]
+
+
+def prefetch_calls(month: Optional[str]) -> Dict[Hashable, Callable[[], Any]]:
+    """
+    Calls that warm the response cache for showing a month on this page
+    
+    Args:
+        month: Month in YYYY-MM format (None for no calls)
+    
+    Returns:
+        Functions without arguments by prefetch key
+    """
+    if not month:
+        return {}
+    return {("summary", month): lambda: api_client.get_summary(month=month)}
+
+
+def render_summary():
+    """
+    Poll and render the summary cards
+    
+    Runs as a fragment: on each timer tick Streamlit reruns only this function.
+    The summary is requested only when the poller says it is due, with
+    If-None-Match, and an unchanged version keeps the summary already held in
+    session state. Unchanged polls back off the interval, changes and
+    X-Poll-Interval hints bring it back; a new interval triggers one full run
+    to reschedule the timer. While the backend is unreachable the last known
+    good summary is shown with its age, and polling follows the circuit
+    breaker's reset timeout. After each successful poll the previous and next
+    months are prefetched in the background.
+    """
+    poller = get_poller()
+    month = st.session_state.get("dashboard_month") or None
+    state = st.session_state.setdefault("summary_state", {})
+    
+    # Timer reruns skip main.py, so each one gets its own trace
+    with tracer.span("fragment:summary"):
+        try:
+            tz = pytz.timezone(settings.timezone)
+            if "summary" not in state or state.get("month") != month or poller.due():
+                # Show loading spinner
+                with st.spinner("データを読み込み中..."):
+                    fetched = api_client.poll_summary(month=month)
+                changed = fetched.version != state.get("version") or state.get("month") != month
+                if fetched.stale:
+                    # Poll again when the circuit breaker lets a trial request through
+                    poller.record(False, settings.circuit_reset_timeout)
+                else:
+                    poller.record(changed, fetched.poll_interval)
+                if changed:
+                    state.update(
+                        summary=fetched.data,
+                        version=fetched.version,
+                        month=month,
+                        updated_at=datetime.fromtimestamp(fetched.fetched_at, tz)
+                    )
+                state["checked_at"] = datetime.now(tz)
+                state["stale_since"] = fetched.fetched_at if fetched.stale else None
+                if not fetched.stale:
+                    # Switching to the previous or next month then shows cached data without a spinner
+                    shown_month = month or get_current_month()
+                    prefetch({
+                        **prefetch_calls(shift_month(shown_month, -1)),
+                        **prefetch_calls(shift_month(shown_month, 1))
+                    })
             
-            # Use a placeholder for countdown
-            placeholder = st.empty()
+            if state.get("stale_since"):
+                st.warning(
+                    f"⚠️ バックエンドに接続できないため、{format_age(time.time() - state['stale_since'])}前の"
+                    f"データを表示しています（再接続を試行中）"
+                )
             
-            # Countdown and auto-refresh
-            for remaining in range(settings.auto_refresh_interval, 0, -1):
-                placeholder.caption(f"次の更新まで: {remaining}秒")
-                time.sleep(1)
+            # Render summary card
+            render_summary_card(state["summary"])
             
-            # Trigger rerun
-            st.rerun()
-    
-    except APIError as e:
-        st.error(f"❌ エラーが発生しました: {e.message}")
-        if e.detail:
-            st.error(f"詳細: {e.detail}")
+            st.divider()
+            
+            # Render status card
+            render_status_card(state["summary"])
+            
+            st.caption(f"最終更新: {state['updated_at']:%H:%M:%S}（確認: {state['checked_at']:%H:%M:%S}）")
+            
+            timer_interval = st.session_state.get("summary_timer_interval")
+            if timer_interval is not None and timer_interval != poller.interval:
+                st.rerun()
         
-        # Show retry button
-        if st.button("🔄 再試行"):
-            st.rerun()
-    
-    except Exception as e:
-        st.error(f"❌ 予期しないエラーが発生しました: {str(e)}")
+        except APIError as e:
+            st.error(f"❌ エラーが発生しました: {e.message}")
+            if e.detail:
+                st.error(f"詳細: {e.detail}")
+            
+            # Clicking a button inside the fragment reruns just the fragment
+            st.button("🔄 再試行", key="retry_summary")
         
-        # Show retry button
-        if st.button("🔄 再試行"):
-            st.rerun()
-
+        except Exception as e:
+            st.error(f"❌ 予期しないエラーが発生しました: {str(e)}")
+            
+            # Clicking a button inside the fragment reruns just the fragment
+            st.button("🔄 再試行", key="retry_summary")
@@ -1,11 +1,19 @@
 """Expense statistics page - view expense statistics by category"""
 
+import math
 import streamlit as st
+from typing import Any, Callable, Dict, Hashable, Optional
 from app.api_client import api_client, APIError
 from app.utils.validation import validate_month
-from app.utils.formatting import get_current_month, format_month, format_currency
+from app.utils.formatting import get_current_month, format_month, format_currency, shift_month
+from app.prefetch import prefetch
 import pandas as pd
 
+# Expense table: selectable page sizes and sort columns (each page is fetched on its own)
+PAGE_SIZES = [25, 50, 100]
+DEFAULT_PAGE_SIZE = 50
+SORT_COLUMNS = {"date": "日付", "amount": "金額", "category": "カテゴリ", "created_at": "登録日時"}
+
 
 def render():
     """Render the expense statistics page"""
@@ -15,9 +23,11 @@ def render():
     
     # Month selection
     current_month = get_current_month()
+    # Seeded through session state, which the kiosk rotation also sets
+    st.session_state.setdefault("statistics_month", current_month)
     selected_month = st.text_input(
         "対象月 *",
-        value=current_month,
+        key="statistics_month",
         help="YYYY-MM形式で入力してください（例: 2025-12）"
     )
     
@@ -29,19 +39,30 @@ def render():
     
     st.markdown(f"### {format_month(selected_month)} の支出統計")
     
-    # Load data
-    try:
-        with st.spinner("データを読み込み中..."):
-            # Get expense statistics
-            expense_stats = api_client.get_expense_statistics(selected_month)
-            # Get categories for name mapping
-            categories_data = api_client.get_categories()
-    except APIError as e:
-        st.error(f"❌ データの取得に失敗しました: {e.message}")
-        return
-    except Exception as e:
-        st.error(f"❌ 予期しないエラーが発生しました: {str(e)}")
-        return
+    # Load statistics, categories (for name mapping) and the shown page of expenses
+    # in parallel; the table fragment gets the page from the response cache
+    page_query = expense_page_query(selected_month)
+    with st.spinner("データを読み込み中..."):
+        expense_stats, categories_data, _ = api_client.gather(
+            lambda: api_client.get_expense_statistics(selected_month),
+            api_client.get_categories,
+            lambda: api_client.get_expense_page(**page_query),
+            return_exceptions=True
+        )
+    
+    for result in (expense_stats, categories_data):
+        if isinstance(result, APIError):
+            st.error(f"❌ データの取得に失敗しました: {result.message}")
+            return
+        if isinstance(result, Exception):
+            st.error(f"❌ 予期しないエラーが発生しました: {str(result)}")
+            return
+    
+    # Warm the cache for the previous and next months while this one renders
+    prefetch({
+        **prefetch_calls(shift_month(selected_month, -1)),
+        **prefetch_calls(shift_month(selected_month, 1))
+    })
     
     # Create category mapping
     category_map = {cat["id"]: cat["name"] for cat in categories_data}
@@ -115,12 +136,104 @@ def render():
     
     st.divider()
     
-    # Display expenses by category
-    st.markdown("#### 📝 カテゴリ別支出詳細")
+    # Display expenses a page at a time
+    st.markdown("#### 📝 支出一覧")
+    st.fragment(render_expense_table)()
+
+
+def expense_page_query(month: str) -> Dict[str, Any]:
+    """
+    Arguments of get_expense_page for the table's current filter, sort and page
+    
+    Args:
+        month: Month in YYYY-MM format
+    
+    Returns:
+        Keyword arguments for api_client.get_expense_page
+    """
+    state = st.session_state
+    page_size = state.get("expense_table_page_size", DEFAULT_PAGE_SIZE)
+    page = state.get("expense_table_page", 1) if state.get("expense_table_month") == month else 1
+    return {
+        "month": month,
+        "category": state.get("expense_table_category"),
+        "sort": state.get("expense_table_sort", "date"),
+        "descending": state.get("expense_table_descending", True),
+        "offset": (page - 1) * page_size,
+        "limit": page_size
+    }
+
+
+def go_to_page(page: int):
+    """Widget callback: show another page of the table"""
+    st.session_state["expense_table_page"] = page
+
+
+def render_expense_table():
+    """
+    Render one page of the month's expenses, with multi-row selection for deleting
+    
+    Runs as a fragment: paging, sorting and selecting rerun only this function.
+    Only the shown page is fetched (sorted and filtered by the backend) and
+    drawn as a single dataframe, so the cost does not grow with the number
+    of expenses in the month.
+    """
+    month = st.session_state["statistics_month"]
+    if st.session_state.get("expense_table_month") != month:
+        st.session_state["expense_table_month"] = month
+        go_to_page(1)
+    
+    flash = st.session_state.pop("expense_table_flash", None)
+    if flash:
+        st.success(flash)
     
     try:
-        with st.spinner("支出詳細を読み込み中..."):
-            all_expenses = api_client.get_expenses(month=selected_month)
+        categories_data = api_client.get_categories(allow_stale=True)
+        category_map = {cat["id"]: cat["name"] for cat in categories_data}
+        
+        # Filter and sort controls (a change starts again from the first page)
+        col1, col2, col3, col4 = st.columns([2, 2, 1, 1])
+        with col1:
+            st.selectbox(
+                "カテゴリ",
+                options=[None] + sorted(category_map),
+                format_func=lambda c: "すべて" if c is None else category_map.get(c, c),
+                key="expense_table_category",
+                on_change=go_to_page,
+                args=(1,)
+            )
+        with col2:
+            st.selectbox(
+                "並び替え",
+                options=list(SORT_COLUMNS),
+                format_func=SORT_COLUMNS.get,
+                key="expense_table_sort",
+                on_change=go_to_page,
+                args=(1,)
+            )
+        with col3:
+            st.toggle("降順", value=True, key="expense_table_descending", on_change=go_to_page, args=(1,))
+        with col4:
+            st.selectbox(
+                "表示件数",
+                options=PAGE_SIZES,
+                index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE),
+                key="expense_table_page_size",
+                on_change=go_to_page,
+                args=(1,)
+            )
+        
+        query = expense_page_query(month)
+        result = api_client.get_expense_page(**query)
+        page_count = max(1, math.ceil(result["total"] / query["limit"]))
+        page = query["offset"] // query["limit"] + 1
+        if page > page_count:
+            # Deletes shortened the list: show its last page instead
+            go_to_page(page_count)
+            query = expense_page_query(month)
+            result = api_client.get_expense_page(**query)
+            page = page_count
+    
     except APIError as e:
         st.warning(f"⚠️ 支出詳細の取得に失敗しました: {e.message}")
         return
@@ -128,48 +241,70 @@ def render():
         st.warning(f"⚠️ 予期しないエラーが発生しました: {str(e)}")
         return
     
-    # Group expenses by category
-    expenses_by_category = {}
-    for expense in all_expenses:
-        category_id = expense["category"]
-        if category_id not in expenses_by_category:
-            expenses_by_category[category_id] = []
-        expenses_by_category[category_id].append(expense)
+    if not result["items"]:
+        st.info("📭 条件に一致する支出はありません")
+        return
     
-    # Display expenses for each category
-    for category_id in sorted(expenses_by_category.keys()):
-        category_name = category_map.get(category_id, category_id)
-        category_total = expense_stats.get(category_id, 0)
-        
-        with st.expander(f"🏷️ {category_name} (¥{category_total:,})"):
-            expenses = expenses_by_category[category_id]
-            
-            # Sort by date (most recent first)
-            expenses_sorted = sorted(expenses, key=lambda x: x["date"], reverse=True)
-            
-            for expense in expenses_sorted:
-                col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
-                
-                with col1:
-                    st.text(expense["date"])
-                
-                with col2:
-                    st.text(f"¥{expense['amount']:,}")
-                
-                with col3:
-                    st.caption(f"ID: {expense['id']}")
-                
-                with col4:
-                    if st.button("🗑️", key=f"delete_expense_{expense['id']}", help="削除"):
-                        try:
-                            api_client.delete_expense(expense["id"])
-                            st.success("削除しました")
-                            st.rerun()
-                        except APIError as e:
-                            st.error(f"削除に失敗しました: {e.message}")
-                
-                if expense.get("memo"):
-                    st.caption(f"📝 {expense['memo']}")
-                
-                st.divider()
+    df = pd.DataFrame([
+        {
+            "ID": expense["id"],
+            "日付": expense["date"],
+            "カテゴリ": category_map.get(expense["category"], expense["category"]),
+            "金額": expense["amount"],
+            "メモ": expense.get("memo") or ""
+        }
+        for expense in result["items"]
+    ])
+    
+    # Keyed by the query, so the selection is cleared when another page is shown
+    event = st.dataframe(
+        df,
+        use_container_width=True,
+        hide_index=True,
+        column_config={"金額": st.column_config.NumberColumn(format="¥%d")},
+        on_select="rerun",
+        selection_mode="multi-row",
+        key="expense_table_" + "_".join(str(value) for value in query.values())
+    )
+    
+    # Pager
+    col1, col2, col3 = st.columns([1, 3, 1])
+    with col1:
+        st.button("◀ 前へ", key="expense_table_prev", disabled=page <= 1, on_click=go_to_page, args=(page - 1,))
+    with col2:
+        st.caption(f"{page} / {page_count} ページ（全{result['total']}件）")
+    with col3:
+        st.button("次へ ▶", key="expense_table_next", disabled=page >= page_count, on_click=go_to_page, args=(page + 1,))
+    
+    selected_ids = [int(df.iloc[row]["ID"]) for row in event.selection.rows]
+    if selected_ids and st.button(f"🗑️ 選択した{len(selected_ids)}件を削除", type="primary", key="expense_table_delete"):
+        try:
+            deleted = api_client.delete_expenses(selected_ids)
+        except APIError as e:
+            st.error(f"削除に失敗しました: {e.message}")
+            return
+        message = f"{len(deleted['deleted'])}件削除しました"
+        if deleted["archived"]:
+            message += f"（アーカイブ済みの{len(deleted['archived'])}件は削除できません）"
+        st.session_state["expense_table_flash"] = message
+        # Full run: the totals and charts above change too
+        st.rerun()
+
 
+def prefetch_calls(month: Optional[str]) -> Dict[Hashable, Callable[[], Any]]:
+    """
+    Calls that warm the response cache for showing a month on this page
+    
+    Args:
+        month: Month in YYYY-MM format (None for no calls)
+    
+    Returns:
+        Functions without arguments by prefetch key
+    """
+    if not month:
+        return {}
+    return {
+        ("expense_statistics", month): lambda: api_client.get_expense_statistics(month),
+        ("expense_page", month): lambda: api_client.get_expense_page(month=month, limit=DEFAULT_PAGE_SIZE),
+        "categories": api_client.get_categories,
+    }
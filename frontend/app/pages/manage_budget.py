@@ -1,6 +1,7 @@
 """Manage budget page - form to set monthly budgets"""
 
 import streamlit as st
+from typing import Dict, List, Optional, Tuple
 from app.api_client import api_client, APIError
 from app.utils.validation import validate_month
 from app.utils.formatting import get_current_month, format_month, format_currency
@@ -28,11 +29,16 @@ def render():
     
     st.markdown(f"### {format_month(selected_month)} の予算設定")
     
-    # Load categories and existing budgets
+    # Load categories and existing budgets; the budgets are kept in session state
+    # per month and updated from the save responses instead of being fetched again
+    budget_state = st.session_state.get("budget_state")
+    budgets_loaded = budget_state is not None and budget_state["month"] == selected_month
+    calls = [api_client.get_categories]
+    if not budgets_loaded:
+        calls.append(lambda: api_client.get_monthly_budgets(month=selected_month))
     try:
         with st.spinner("カテゴリーと既存予算を読み込み中..."):
-            categories_data = api_client.get_categories()
-            monthly_budgets = api_client.get_monthly_budgets(month=selected_month)
+            categories_data, *monthly_budgets = api_client.gather(*calls)
     except APIError as e:
         st.error(f"❌ データの取得に失敗しました: {e.message}")
         return
@@ -40,9 +46,13 @@ def render():
         st.error(f"❌ 予期しないエラーが発生しました: {str(e)}")
         return
     
+    if not budgets_loaded:
+        budget_state = {"month": selected_month, "budgets": {b["category_id"]: b for b in monthly_budgets[0]}}
+        st.session_state["budget_state"] = budget_state
+    
     # Create mapping from category ID to name and existing budgets
     category_map = {cat["id"]: cat["name"] for cat in categories_data if cat.get("is_active", True)}
-    existing_budgets = {b["category_id"]: b for b in monthly_budgets}
+    existing_budgets = budget_state["budgets"]
     
     # Display total budget if exists
     if existing_budgets:
@@ -86,52 +96,29 @@ def render():
     col1, col2 = st.columns(2)
     
     with col1:
-        if st.button("💾 予算を保存", use_container_width=True, type="primary"):
-            # Validate and save budgets
-            errors = []
-            success_count = 0
-            
-            for category_id, amount in budget_inputs.items():
-                # Skip if amount is 0 and no existing budget
-                if amount == 0 and category_id not in existing_budgets:
-                    continue
-                
-                # Save budget
-                try:
-                    with st.spinner(f"{category_map[category_id]}を保存中..."):
-                        result = api_client.create_monthly_budget(
-                            month=selected_month,
-                            category_id=category_id,
-                            amount=amount
-                        )
-                    success_count += 1
-                
-                except APIError as e:
-                    errors.append(f"{category_map[category_id]}: {e.message}")
-                
-                except Exception as e:
-                    errors.append(f"{category_map[category_id]}: {str(e)}")
-            
-            # Display results
-            if errors:
-                st.error("❌ 一部の予算の保存に失敗しました:")
-                for error in errors:
-                    st.error(error)
-            
-            if success_count > 0:
-                st.success(f"✅ {success_count}件の予算を保存しました！")
-                st.balloons()
-                
-                # Suggest next action
-                st.info("💡 ダッシュボードで集計を確認できます")
-                
-                # Reload page to show updated budgets
-                st.rerun()
+        # Saving runs as the button's callback, so the rerun it triggers already
+        # renders the saved amounts (no second rerun, no refetch)
+        st.button(
+            "💾 予算を保存",
+            use_container_width=True,
+            type="primary",
+            on_click=save_budgets,
+            args=(selected_month, category_map)
+        )
     
     with col2:
         if st.button("🔄 リセット", use_container_width=True):
+            # Discard unsaved inputs and reload the budgets from the backend
+            st.session_state.pop("budget_state", None)
+            for category_id in category_map:
+                st.session_state.pop(f"budget_{category_id}", None)
             st.rerun()
     
+    # Display the results of the save that triggered this run
+    report = st.session_state.pop("budget_save_report", None)
+    if report is not None:
+        render_save_report(report)
+    
     # Display existing budgets in detail
     if existing_budgets:
         st.divider()
@@ -157,6 +144,7 @@ def render():
                     if st.button("🗑️", key=f"delete_budget_{budget['id']}", help="削除"):
                         try:
                             api_client.delete_monthly_budget(budget["id"])
+                            existing_budgets.pop(category_id, None)
                             st.success("削除しました")
                             st.rerun()
                         except APIError as e:
@@ -164,3 +152,94 @@ def render():
                 
                 st.divider()
 
+
+def changed_budgets(inputs: Dict[str, int], existing_budgets: Dict[str, Dict]) -> Dict[str, int]:
+    """
+    Get the budgets whose input differs from the saved amount
+    
+    Args:
+        inputs: Entered amount by category ID
+        existing_budgets: Saved budget by category ID (a missing budget counts as 0)
+    
+    Returns:
+        Amount to save by category ID
+    """
+    return {
+        category_id: amount
+        for category_id, amount in inputs.items()
+        if amount != existing_budgets.get(category_id, {}).get("amount", 0)
+    }
+
+
+def save_budgets(month: str, category_map: Dict[str, str]) -> None:
+    """
+    Save the changed budgets (callback of the save button)
+    
+    The changed categories are sent in parallel through api_client.gather, whose
+    pool is bounded by settings.api_max_concurrency. Saved budgets are written
+    into the session's budgets and a per-category report is left for the next
+    render; a failed category keeps its input so it can be saved again.
+    
+    Args:
+        month: Month in YYYY-MM format
+        category_map: Category name by ID of the shown inputs
+    """
+    budgets = st.session_state["budget_state"]["budgets"]
+    changes = changed_budgets(
+        {category_id: st.session_state[f"budget_{category_id}"] for category_id in category_map},
+        budgets
+    )
+    
+    results = api_client.gather(
+        *[
+            lambda category_id=category_id, amount=amount: api_client.create_monthly_budget(
+                month=month,
+                category_id=category_id,
+                amount=amount
+            )
+            for category_id, amount in changes.items()
+        ],
+        return_exceptions=True
+    )
+    
+    report = []
+    for (category_id, amount), result in zip(changes.items(), results):
+        previous = budgets.get(category_id, {}).get("amount", 0)
+        if isinstance(result, APIError):
+            error = result.message
+        elif isinstance(result, Exception):
+            error = str(result)
+        else:
+            budgets[category_id] = {**budgets.get(category_id, {}), **result}
+            error = None
+        report.append((category_map[category_id], previous, amount, error))
+    st.session_state["budget_save_report"] = report
+
+
+def render_save_report(report: List[Tuple[str, int, int, Optional[str]]]) -> None:
+    """
+    Display the per-category results of a save
+    
+    Args:
+        report: (category name, previous amount, new amount, error or None) per changed category
+    """
+    if not report:
+        st.info("ℹ️ 変更された予算はありません")
+        return
+    
+    saved = [entry for entry in report if entry[3] is None]
+    failed = [entry for entry in report if entry[3] is not None]
+    
+    if failed:
+        st.error("❌ 一部の予算の保存に失敗しました:")
+        for name, previous, amount, error in failed:
+            st.error(f"{name}: {format_currency(previous)} → {format_currency(amount)}（{error}）")
+    
+    if saved:
+        st.success(f"✅ {len(saved)}件の予算を保存しました！")
+        for name, previous, amount, _ in saved:
+            st.markdown(f"- {name}: {format_currency(previous)} → **{format_currency(amount)}**")
+        st.balloons()
+        
+        # Suggest next action
+        st.info("💡 ダッシュボードで集計を確認できます")
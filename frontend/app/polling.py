@@ -0,0 +1,61 @@
+"""Adaptive poll scheduling: back off while data is unchanged, snap back on changes"""
+
+import time
+from typing import Optional
+
+
+class AdaptivePoller:
+    """
+    Decides how long to wait before the next poll
+
+    Starts at the base interval and multiplies it by the backoff factor after
+    every poll that returned unchanged data, up to the maximum. A change
+    snaps it back to the base interval, and a server hint (X-Poll-Interval)
+    overrides both while the server keeps sending it.
+    """
+
+    def __init__(self, base_interval: float, max_interval: float, backoff: float = 2.0):
+        """
+        Initialize the poller
+
+        Args:
+            base_interval: Seconds between polls while data changes
+            max_interval: Longest interval reached by backing off
+            backoff: Factor applied to the interval after an unchanged poll
+        """
+        self.base_interval = base_interval
+        self.max_interval = max(max_interval, base_interval)
+        self.backoff = backoff
+        self.interval = base_interval
+        self.next_due = 0.0
+
+    def due(self, now: Optional[float] = None) -> bool:
+        """
+        Whether the next poll is due
+
+        A timer firing up to 10% of the interval early still counts, so a
+        periodic timer with the same interval never skips a poll.
+        """
+        now = now if now is not None else time.monotonic()
+        return now >= self.next_due - self.interval * 0.1
+
+    def record(self, changed: bool, hint: Optional[float] = None, now: Optional[float] = None) -> float:
+        """
+        Record the outcome of a poll and schedule the next one
+
+        Args:
+            changed: Whether the poll returned different data than the previous one
+            hint: Interval suggested by the server, if any
+            now: Current monotonic time (default: time.monotonic())
+
+        Returns:
+            Seconds until the next poll
+        """
+        if hint is not None and hint > 0:
+            self.interval = min(hint, self.max_interval)
+        elif changed:
+            self.interval = self.base_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        self.next_due = (now if now is not None else time.monotonic()) + self.interval
+        return self.interval
@@ -0,0 +1,160 @@
+"""Background prefetching: warm the response cache with data a session is likely to show next"""
+
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import streamlit as st
+
+from app.api_client import api_client, APIClient
+from app.circuit import CLOSED
+from app.config import settings
+
+
+class Prefetcher:
+    """
+    Runs API calls on a small thread pool so their responses are cached before they are needed
+
+    Calls are grouped by owner (one per Streamlit session). A call whose key is
+    already queued or running is not submitted again, and cancel() drops an
+    owner's queued calls when the session navigates elsewhere; calls already
+    running finish and keep their cached response. Errors are ignored: the
+    page fetches the data itself (and reports errors) if the prefetch failed.
+    """
+
+    def __init__(self, client: APIClient, max_workers: int = 2):
+        """
+        Initialize the prefetcher
+
+        Args:
+            client: API client whose cache is warmed
+            max_workers: Calls run at the same time, across all sessions
+        """
+        self.client = client
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[str, Dict[Hashable, Future]] = {}
+        # Reentrant: a done callback runs in the submitting thread if the call already finished
+        self._lock = threading.RLock()
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    def schedule(self, owner: str, calls: Dict[Hashable, Callable[[], Any]]) -> int:
+        """
+        Queue calls for an owner
+
+        Args:
+            owner: Session the calls are made for
+            calls: Functions without arguments by key, e.g. {("summary", "2025-11"): lambda: ...}
+
+        Returns:
+            Number of calls queued (calls already queued or running are skipped)
+        """
+        if not settings.prefetch_enabled or not settings.api_cache_enabled:
+            return 0
+        if self.client.breaker.state != CLOSED:
+            # Leave the half-open trial request to a call someone is waiting for
+            return 0
+
+        queued = 0
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="prefetch")
+            pending = self._pending.setdefault(owner, {})
+            for key, call in calls.items():
+                if key in pending and not pending[key].done():
+                    continue
+                future = self._executor.submit(self._run, call)
+                pending[key] = future
+                future.add_done_callback(lambda f, owner=owner, key=key: self._forget(owner, key, f))
+                queued += 1
+        return queued
+
+    def cancel(self, owner: str) -> int:
+        """
+        Drop an owner's queued calls
+
+        Args:
+            owner: Session whose calls are dropped
+
+        Returns:
+            Number of calls cancelled before they started
+        """
+        with self._lock:
+            futures = list(self._pending.get(owner, {}).values())
+        cancelled = sum(1 for future in futures if future.cancel())
+        with self._lock:
+            self.cancelled += cancelled
+        return cancelled
+
+    def _run(self, call: Callable[[], Any]) -> None:
+        """Run a call with prefetch cache lifetimes"""
+        try:
+            with self.client.prefetching():
+                call()
+        except Exception:
+            with self._lock:
+                self.failed += 1
+        else:
+            with self._lock:
+                self.completed += 1
+
+    def _forget(self, owner: str, key: Hashable, future: Future) -> None:
+        """Remove a finished or cancelled call from the pending calls"""
+        with self._lock:
+            pending = self._pending.get(owner)
+            if pending is not None and pending.get(key) is future:
+                del pending[key]
+                if not pending:
+                    del self._pending[owner]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the prefetch counters
+
+        Returns:
+            Dictionary with pending, completed, failed and cancelled calls
+        """
+        with self._lock:
+            return {
+                "pending": sum(len(pending) for pending in self._pending.values()),
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+            }
+
+
+# Global prefetcher, warming the global API client's cache
+prefetcher = Prefetcher(api_client, settings.prefetch_workers)
+
+
+def session_owner() -> str:
+    """Prefetch owner of the current Streamlit session"""
+    if "prefetch_owner" not in st.session_state:
+        st.session_state["prefetch_owner"] = uuid.uuid4().hex
+    return st.session_state["prefetch_owner"]
+
+
+def prefetch(calls: Dict[Hashable, Callable[[], Any]]) -> int:
+    """
+    Prefetch calls for the current session
+
+    Args:
+        calls: Functions without arguments by key
+
+    Returns:
+        Number of calls queued
+    """
+    return prefetcher.schedule(session_owner(), calls)
+
+
+def cancel_prefetch() -> int:
+    """
+    Drop the current session's queued prefetches (called when the session navigates)
+
+    Returns:
+        Number of calls cancelled
+    """
+    return prefetcher.cancel(session_owner())
@@ -0,0 +1,145 @@
+"""Client-side tracing: W3C traceparent propagation and locally exported spans"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional
+from app.config import settings
+
+
+class Span:
+    """One timed operation of a trace"""
+
+    def __init__(self, name: str, trace_id: Optional[str] = None, parent_id: Optional[str] = None, kind: str = "internal"):
+        """
+        Start a span
+
+        Args:
+            name: Operation name
+            trace_id: Trace to join (default: start a new trace)
+            parent_id: Span ID of the parent, if any
+            kind: "client" for API calls, "internal" otherwise
+        """
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_time = time.time()
+        self._started = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.status = "ok"
+        self.attributes: Dict[str, Any] = {}
+
+    @property
+    def traceparent(self) -> str:
+        """W3C traceparent header value identifying this span"""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time": self.start_time,
+            "duration_ms": round((self.duration or 0.0) * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+# Span of the operation in progress (one per Streamlit script run)
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """
+    Creates spans while settings.tracing_enabled is set.
+
+    Finished spans are kept in a small ring buffer (shown in the sidebar) and,
+    if settings.tracing_jsonl_path is set, appended to a JSONL file. Backend
+    spans of the same trace are viewed at the backend's /debug/traces.
+    """
+
+    def __init__(self, capacity: int = 500):
+        """
+        Initialize the tracer
+
+        Args:
+            capacity: Finished spans kept in memory
+        """
+        self.spans: Deque[Span] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.tracing_enabled
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal") -> Iterator[Optional[Span]]:
+        """
+        Trace a block, as a child of the current span or as a new trace
+
+        Args:
+            name: Operation name
+            kind: Span kind
+
+        Yields:
+            The span, or None when tracing is disabled
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        parent = current_span.get()
+        span = Span(
+            name,
+            trace_id=parent.trace_id if parent else None,
+            parent_id=parent.span_id if parent else None,
+            kind=kind
+        )
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.attributes["error"] = type(e).__name__
+            raise
+        finally:
+            current_span.reset(token)
+            span.duration = time.perf_counter() - span._started
+            self._export(span)
+
+    def _export(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+            if settings.tracing_jsonl_path:
+                try:
+                    with open(settings.tracing_jsonl_path, "a", encoding="utf-8") as output:
+                        output.write(json.dumps(span.as_dict(), default=str) + "\n")
+                except OSError:
+                    pass
+
+    def trace(self, trace_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the buffered spans of one trace in start order
+
+        Args:
+            trace_id: Trace ID
+
+        Returns:
+            List of span dictionaries
+        """
+        with self._lock:
+            spans = [span for span in self.spans if span.trace_id == trace_id]
+        return [span.as_dict() for span in sorted(spans, key=lambda s: s.start_time)]
+
+
+# Global tracer instance
+tracer = Tracer()
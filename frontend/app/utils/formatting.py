@@ -126,6 +126,24 @@ def parse_month(month_str: str) -> Optional[tuple[int, int]]:
         return None
 
 
+def shift_month(month_str: str, months: int) -> Optional[str]:
+    """
+    Shift a month in YYYY-MM format
+    
+    Args:
+        month_str: Month string
+        months: Months to add (negative for earlier months)
+    
+    Returns:
+        Shifted month string (e.g., "2025-12" + 1 -> "2026-01") or None if invalid
+    """
+    parsed = parse_month(month_str)
+    if parsed is None or not 1 <= parsed[1] <= 12:
+        return None
+    index = parsed[0] * 12 + parsed[1] - 1 + months
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
 def format_days_remaining(days: int) -> str:
     """
     Format remaining days
@@ -154,3 +172,22 @@ def format_per_day_budget(amount: Optional[float]) -> str:
     if amount is None:
         return "-"
     return f"{format_currency(int(amount))}/日"
+
+
+def format_age(seconds: float) -> str:
+    """
+    Format the age of data
+    
+    Args:
+        seconds: Age in seconds
+    
+    Returns:
+        Formatted string (e.g., "45秒", "12分", "3時間5分")
+    """
+    seconds = max(0, int(seconds))
+    if seconds < 60:
+        return f"{seconds}秒"
+    minutes = seconds // 60
+    if minutes < 60:
+        return f"{minutes}分"
+    return f"{minutes // 60}時間{minutes % 60}分"
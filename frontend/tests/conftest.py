@@ -0,0 +1,82 @@
+"""Pytest configuration and fixtures"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+
+class FakeBackendHandler(BaseHTTPRequestHandler):
+    """
+    Answers every GET with its path and query as JSON over keep-alive connections,
+    and every POST with its body and the server's post_status
+    """
+    
+    protocol_version = "HTTP/1.1"
+    
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        body = json.dumps({"path": url.path, "query": parse_qs(url.query)}).encode()
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.traceparents.append(self.headers.get("traceparent"))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.server.post_delay)
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.posts.append((self.path, self.headers.get("Idempotency-Key"), json.loads(body)))
+            status = self.server.post_status
+        response = json.dumps({"id": len(self.server.posts), **json.loads(body)}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fake_backend():
+    """
+    Local HTTP/1.1 server standing in for the backend
+    
+    The server counts the TCP connections it accepted (`connections`) and the
+    requests it answered (`requests`), records the traceparent header of each
+    GET in `traceparents` and each POST as (path, Idempotency-Key, body) in
+    `posts`, and answers POSTs with `post_status` after `post_delay` seconds;
+    its URL is in `url`.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeBackendHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.requests = 0
+    server.traceparents = []
+    server.posts = []
+    server.post_status = 201
+    server.post_delay = 0.0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
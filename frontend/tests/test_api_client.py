@@ -0,0 +1,175 @@
+"""API client tests"""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+import app.config as config_module
+from app.api_client import APIClient, APIError
+from app.tracing import tracer
+
+
+THREADS = 32
+REQUESTS_PER_THREAD = 25
+
+
+class TestAPIClientConcurrency:
+    """Test APIClient shared by many threads (one per Streamlit session script run)"""
+    
+    @pytest.fixture(autouse=True)
+    def uncached(self):
+        # Every call must reach the server
+        with patch.object(config_module.settings, "api_cache_enabled", False):
+            yield
+    
+    def test_each_thread_gets_own_session(self, fake_backend):
+        """Test threads get separate sessions mounted on the shared transport"""
+        client = APIClient(base_url=fake_backend.url)
+        start = threading.Barrier(4)
+        
+        def get_session(_):
+            start.wait()
+            return client.session
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            sessions = list(executor.map(get_session, range(4)))
+        
+        assert len({id(session) for session in sessions}) == 4
+        assert client.session is client.session
+        for session in sessions + [client.session]:
+            assert session.get_adapter(fake_backend.url) is client.adapter
+    
+    def test_hammer_from_many_threads(self, fake_backend):
+        """Test concurrent calls get their own responses over a bounded set of kept-alive connections"""
+        with patch.object(config_module.settings, "api_pool_maxsize", 8), \
+             patch.object(config_module.settings, "api_pool_block", True):
+            client = APIClient(base_url=fake_backend.url, max_workers=2)
+        start = threading.Barrier(THREADS)
+        
+        def hammer(worker: int) -> int:
+            start.wait()
+            mismatches = 0
+            for n in range(REQUESTS_PER_THREAD):
+                category_type = f"w{worker}-{n}"
+                data = client.get_categories(category_type=category_type)
+                if data != {"path": "/api/categories", "query": {"type": [category_type]}}:
+                    mismatches += 1
+            return mismatches
+        
+        with ThreadPoolExecutor(max_workers=THREADS) as executor:
+            mismatches = list(executor.map(hammer, range(THREADS)))
+        
+        assert mismatches == [0] * THREADS
+        assert fake_backend.requests == THREADS * REQUESTS_PER_THREAD
+        # A blocking pool of 8 never opens more than 8 connections, however many threads call
+        assert fake_backend.connections <= 8
+        assert client.breaker.stats()["state"] == "closed"
+    
+    def test_connections_reused_across_threads(self, fake_backend):
+        """Test a thread started later reuses a connection opened by an earlier one (keep-alive)"""
+        client = APIClient(base_url=fake_backend.url)
+        for n in range(5):
+            thread = threading.Thread(target=client.get_categories, kwargs={"category_type": str(n)})
+            thread.start()
+            thread.join()
+        
+        assert fake_backend.requests == 5
+        assert fake_backend.connections == 1
+
+
+class TestGather:
+    """Test APIClient.gather running independent calls in parallel"""
+    
+    @pytest.fixture(autouse=True)
+    def uncached(self):
+        with patch.object(config_module.settings, "api_cache_enabled", False):
+            yield
+    
+    def test_results_in_call_order(self):
+        """Test results come back in call order, not completion order"""
+        client = APIClient(base_url="http://unused", max_workers=4)
+        
+        def after(delay, value):
+            def call():
+                time.sleep(delay)
+                return value
+            return call
+        
+        assert client.gather(after(0.06, "a"), after(0.0, "b"), after(0.03, "c")) == ["a", "b", "c"]
+    
+    def test_first_exception_raised_after_all_calls(self):
+        """Test the first failure in call order is raised once every call has finished"""
+        client = APIClient(base_url="http://unused", max_workers=4)
+        finished = []
+        
+        def fail(message, delay=0.0):
+            def call():
+                time.sleep(delay)
+                finished.append(message)
+                raise APIError(message)
+            return call
+        
+        def slow():
+            time.sleep(0.05)
+            finished.append("slow")
+            return "slow"
+        
+        with pytest.raises(APIError, match="first"):
+            client.gather(fail("first", 0.02), fail("second"), slow)
+        assert sorted(finished) == ["first", "second", "slow"]
+    
+    def test_return_exceptions(self):
+        """Test exceptions take the place of results instead of being raised"""
+        client = APIClient(base_url="http://unused", max_workers=4)
+        error = APIError("boom")
+        
+        def fail():
+            raise error
+        
+        assert client.gather(lambda: 1, fail, lambda: 3, return_exceptions=True) == [1, error, 3]
+    
+    def test_concurrency_bounded_by_setting(self):
+        """Test no more than settings.api_max_concurrency calls run at once"""
+        with patch.object(config_module.settings, "api_max_concurrency", 3):
+            client = APIClient(base_url="http://unused")
+        lock = threading.Lock()
+        active = {"now": 0, "peak": 0}
+        
+        def call():
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.02)
+            with lock:
+                active["now"] -= 1
+            return threading.current_thread().name
+        
+        names = client.gather(*[call] * 12)
+        
+        assert active["peak"] == 3
+        assert all(name.startswith("api-client") for name in names)
+        assert len(set(names)) == 3
+    
+    def test_context_propagated_to_workers(self):
+        """Test context variables set by the caller are visible inside the calls"""
+        client = APIClient(base_url="http://unused", max_workers=2)
+        page = contextvars.ContextVar("page", default=None)
+        page.set("dashboard")
+        
+        assert client.gather(page.get, page.get) == ["dashboard", "dashboard"]
+    
+    def test_traceparent_propagated_to_workers(self, fake_backend):
+        """Test parallel calls send traceparents of client spans under the caller's span"""
+        client = APIClient(base_url=fake_backend.url, max_workers=2)
+        with patch.object(config_module.settings, "tracing_enabled", True), tracer.span("page") as page:
+            client.gather(client.get_categories, lambda: client.get_expenses(month="2025-12"))
+        
+        assert len(fake_backend.traceparents) == 2
+        assert all(header.split("-")[1] == page.trace_id for header in fake_backend.traceparents)
+        client_spans = {span.span_id: span for span in tracer.spans if span.kind == "client"}
+        sent = [header.split("-")[2] for header in fake_backend.traceparents]
+        assert all(client_spans[span_id].parent_id == page.span_id for span_id in sent)
@@ -0,0 +1,76 @@
+"""Response cache tests"""
+
+from unittest.mock import patch
+
+from app.cache import ResponseCache
+
+
+class TestResponseCache:
+    """Test the TTL/LRU response cache"""
+    
+    def test_hit_and_miss_counters(self):
+        """Test stored values are returned and lookups are counted"""
+        cache = ResponseCache()
+        assert cache.get(("/api/summary", ())) is None
+        cache.set(("/api/summary", ()), {"total": 1}, ttl=60)
+        
+        assert cache.get(("/api/summary", ())) == {"total": 1}
+        assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1}
+    
+    def test_entries_expire_after_ttl(self):
+        """Test an entry is dropped once its TTL has passed"""
+        cache = ResponseCache()
+        with patch("app.cache.time.monotonic", return_value=100.0):
+            cache.set(("/api/summary", ()), "short", ttl=5)
+            cache.set(("/api/categories", ()), "long", ttl=60)
+        
+        with patch("app.cache.time.monotonic", return_value=104.9):
+            assert cache.get(("/api/summary", ())) == "short"
+        with patch("app.cache.time.monotonic", return_value=105.0):
+            assert cache.get(("/api/summary", ())) is None
+            assert cache.get(("/api/categories", ())) == "long"
+        assert cache.stats()["entries"] == 1
+    
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test the entry not read for the longest time is dropped when the cache is full"""
+        cache = ResponseCache(max_entries=2)
+        cache.set(("/a", ()), 1, ttl=60)
+        cache.set(("/b", ()), 2, ttl=60)
+        cache.get(("/a", ()))
+        cache.set(("/c", ()), 3, ttl=60)
+        
+        assert cache.get(("/b", ())) is None
+        assert cache.get(("/a", ())) == 1
+        assert cache.get(("/c", ())) == 3
+    
+    def test_setting_an_existing_key_refreshes_it(self):
+        """Test overwriting an entry replaces its value and makes it most recently used"""
+        cache = ResponseCache(max_entries=2)
+        cache.set(("/a", ()), 1, ttl=60)
+        cache.set(("/b", ()), 2, ttl=60)
+        cache.set(("/a", ()), 10, ttl=60)
+        cache.set(("/c", ()), 3, ttl=60)
+        
+        assert cache.get(("/a", ())) == 10
+        assert cache.get(("/b", ())) is None
+    
+    def test_invalidate_by_endpoint_prefix(self):
+        """Test invalidate drops every entry under the given prefixes and nothing else"""
+        cache = ResponseCache()
+        cache.set(("/api/expenses", (("month", "2025-12"),)), [], ttl=60)
+        cache.set(("/api/expenses/page", (("limit", 50),)), {}, ttl=60)
+        cache.set(("/api/summary", ()), {}, ttl=60)
+        cache.set(("/api/categories", ()), [], ttl=60)
+        
+        assert cache.invalidate("/api/expenses", "/api/summary") == 3
+        assert cache.get(("/api/categories", ())) == []
+        assert cache.stats()["entries"] == 1
+    
+    def test_clear_resets_counters(self):
+        """Test clear drops every entry and the hit/miss counters"""
+        cache = ResponseCache()
+        cache.set(("/a", ()), 1, ttl=60)
+        cache.get(("/a", ()))
+        cache.clear()
+        
+        assert cache.stats() == {"hits": 0, "misses": 0, "hit_rate": 0.0, "entries": 0}
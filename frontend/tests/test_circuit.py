@@ -0,0 +1,93 @@
+"""Circuit breaker tests"""
+
+from unittest.mock import patch
+
+from app.circuit import CircuitBreaker, CLOSED, HALF_OPEN, OPEN
+
+
+def at(seconds: float):
+    """Freeze the breaker's clock"""
+    return patch("app.circuit.time.monotonic", return_value=seconds)
+
+
+class TestCircuitBreaker:
+    """Test the circuit breaker state machine"""
+    
+    def test_opens_after_consecutive_failures(self):
+        """Test the breaker opens at the threshold and then rejects calls"""
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=15)
+        with at(0.0):
+            breaker.record_failure()
+            breaker.record_failure()
+            assert breaker.state == CLOSED
+            assert breaker.allow()
+            breaker.record_failure()
+            
+            assert breaker.state == OPEN
+            assert not breaker.allow()
+    
+    def test_success_resets_the_failure_count(self):
+        """Test only consecutive failures count towards the threshold"""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=15)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        
+        assert breaker.state == CLOSED
+        assert breaker.failures == 1
+    
+    def test_half_open_lets_a_single_trial_through(self):
+        """Test that after the timeout exactly one call is allowed until it reports back"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=15)
+        with at(0.0):
+            breaker.record_failure()
+        
+        with at(14.9):
+            assert not breaker.allow()
+        with at(15.0):
+            assert breaker.allow()
+            assert breaker.state == HALF_OPEN
+            assert not breaker.allow()
+            assert not breaker.allow()
+    
+    def test_trial_success_closes(self):
+        """Test a successful trial closes the breaker"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=15)
+        with at(0.0):
+            breaker.record_failure()
+        with at(15.0):
+            assert breaker.allow()
+            breaker.record_success()
+            
+            assert breaker.state == CLOSED
+            assert breaker.allow()
+            assert breaker.allow()
+    
+    def test_trial_failure_reopens_for_another_timeout(self):
+        """Test a failed trial opens the breaker again, even below the threshold"""
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=15)
+        with at(0.0):
+            for _ in range(3):
+                breaker.record_failure()
+        with at(20.0):
+            assert breaker.allow()
+            breaker.record_failure()
+            assert breaker.state == OPEN
+            assert not breaker.allow()
+        
+        with at(34.9):
+            assert not breaker.allow()
+        with at(35.0):
+            assert breaker.allow()
+    
+    def test_stats_report_time_until_the_trial(self):
+        """Test retry_in counts down while open and is 0 otherwise"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=15)
+        assert breaker.stats() == {"state": CLOSED, "failures": 0, "retry_in": 0.0}
+        with at(0.0):
+            breaker.record_failure()
+        
+        with at(10.0):
+            assert breaker.stats() == {"state": OPEN, "failures": 1, "retry_in": 5.0}
+        with at(30.0):
+            assert breaker.retry_in() == 0.0
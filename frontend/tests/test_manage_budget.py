@@ -0,0 +1,58 @@
+"""Budget management page tests"""
+
+from unittest.mock import MagicMock, patch
+
+from app.api_client import APIError
+from app.pages import manage_budget
+from app.pages.manage_budget import changed_budgets, save_budgets
+
+
+class TestChangedBudgets:
+    """Test the selection of budgets to save"""
+    
+    def test_only_changed_amounts_are_returned(self):
+        """Test inputs equal to the saved amount are left out"""
+        existing = {"food": {"category_id": "food", "amount": 30000}, "daily": {"category_id": "daily", "amount": 5000}}
+        
+        assert changed_budgets({"food": 30000, "daily": 8000}, existing) == {"daily": 8000}
+    
+    def test_missing_budget_counts_as_zero(self):
+        """Test a category without a saved budget is changed only by a non-zero input"""
+        assert changed_budgets({"medical": 0, "hobby": 1000}, {}) == {"hobby": 1000}
+
+
+class TestSaveBudgets:
+    """Test saving the changed budgets in parallel"""
+    
+    def test_failed_category_is_reported_and_not_stored(self):
+        """Test saved budgets are merged into budget_state while a failed one keeps its previous amount"""
+        state = {
+            "budget_state": {
+                "month": "2025-12",
+                "budgets": {"food": {"id": 1, "category_id": "food", "amount": 30000}},
+            },
+            "budget_food": 35000,
+            "budget_daily": 8000,
+            "budget_medical": 2000,
+        }
+        
+        def create_monthly_budget(month, category_id, amount):
+            if category_id == "daily":
+                raise APIError("HTTP error: 500")
+            return {"id": 2, "month": month, "category_id": category_id, "amount": amount}
+        
+        fake_st = MagicMock(session_state=state)
+        with patch.object(manage_budget, "st", fake_st), \
+             patch.object(manage_budget.api_client, "create_monthly_budget", side_effect=create_monthly_budget):
+            save_budgets("2025-12", {"food": "食費", "daily": "日用品", "medical": "医療費"})
+        
+        budgets = state["budget_state"]["budgets"]
+        assert budgets["food"]["amount"] == 35000
+        assert budgets["medical"] == {"id": 2, "month": "2025-12", "category_id": "medical", "amount": 2000}
+        assert "daily" not in budgets
+        assert state["budget_daily"] == 8000
+        assert state["budget_save_report"] == [
+            ("食費", 30000, 35000, None),
+            ("日用品", 0, 8000, "HTTP error: 500"),
+            ("医療費", 0, 2000, None),
+        ]
@@ -0,0 +1,126 @@
+"""Outbox tests"""
+
+import threading
+from unittest.mock import patch
+
+import pytest
+
+import app.config as config_module
+from app.api_client import APIClient, APIError, CircuitOpenError
+from app.outbox import Outbox, OutboxDrainer, is_retryable, PENDING, REJECTED
+
+
+def make_expense(amount: int) -> dict:
+    return {"date": "2025-12-01", "category": "food", "amount": amount, "memo": None}
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    return Outbox(str(tmp_path / "outbox" / "outbox.db"))
+
+
+@pytest.fixture
+def client(fake_backend):
+    # No urllib3 retries: a 503 fails at once instead of after the backoff
+    with patch.object(config_module.settings, "api_cache_enabled", False):
+        yield APIClient(base_url=fake_backend.url, max_retries=0)
+
+
+class TestOutbox:
+    """Test the persistent outbox and its drain"""
+    
+    def test_entries_persist_and_keys_are_unique(self, outbox):
+        """Test entries survive reopening the file and a key is queued once"""
+        outbox.enqueue(make_expense(100), "key-1", "接続エラー")
+        outbox.enqueue(make_expense(100), "key-1", "接続エラー")
+        outbox.enqueue(make_expense(200), "key-2")
+        
+        reopened = Outbox(outbox.path)
+        entries = reopened.entries(PENDING)
+        assert [entry.idempotency_key for entry in entries] == ["key-1", "key-2"]
+        assert entries[0].expense == make_expense(100)
+        assert entries[0].attempts == 1
+        assert entries[0].last_error == "接続エラー"
+        assert reopened.count(PENDING) == 2
+    
+    def test_drain_resends_with_original_keys_in_batches(self, outbox, client, fake_backend):
+        """Test every pending entry is sent once with its Idempotency-Key and removed"""
+        for n in range(25):
+            outbox.enqueue(make_expense(n), f"key-{n}")
+        
+        result = outbox.drain(client, batch_size=10)
+        
+        assert result == (25, 0, 0)
+        assert outbox.count(PENDING) == 0
+        assert sorted(key for _, key, _ in fake_backend.posts) == sorted(f"key-{n}" for n in range(25))
+        assert all(path == "/api/expenses" for path, _, _ in fake_backend.posts)
+    
+    def test_drain_stops_when_backend_fails(self, outbox, client, fake_backend):
+        """Test a 5xx keeps the entries pending and stops after the failing batch"""
+        for n in range(5):
+            outbox.enqueue(make_expense(n), f"key-{n}")
+        fake_backend.post_status = 503
+        
+        result = outbox.drain(client, batch_size=2)
+        
+        assert result == (0, 0, 5)
+        assert len(fake_backend.posts) == 2
+        assert [entry.attempts for entry in outbox.entries(PENDING)] == [2, 2, 1, 1, 1]
+    
+    def test_drain_keeps_rejected_entries(self, outbox, client, fake_backend):
+        """Test entries the backend rejects are kept as rejected instead of being resent"""
+        outbox.enqueue(make_expense(100), "key-1")
+        fake_backend.post_status = 422
+        
+        result = outbox.drain(client)
+        
+        assert result == (0, 1, 0)
+        rejected = outbox.entries(REJECTED)
+        assert [entry.idempotency_key for entry in rejected] == ["key-1"]
+        assert "422" in rejected[0].last_error
+        assert outbox.drain(client) == (0, 0, 0)
+        assert len(fake_backend.posts) == 1
+    
+    def test_concurrent_drains_send_each_entry_once(self, outbox, client, fake_backend):
+        """Test a drain started while another one runs (e.g. the resend button) does not resend its entries"""
+        for n in range(10):
+            outbox.enqueue(make_expense(n), f"key-{n}")
+        fake_backend.post_delay = 0.05
+        barrier = threading.Barrier(2)
+        results = []
+        
+        def drain():
+            barrier.wait()
+            results.append(outbox.drain(client, batch_size=5))
+        
+        threads = [threading.Thread(target=drain) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert sorted(key for _, key, _ in fake_backend.posts) == sorted(f"key-{n}" for n in range(10))
+        assert sum(result.sent for result in results) == 10
+        assert outbox.count(PENDING) == 0
+    
+    def test_drainer_waits_for_healthy_backend(self, outbox, client, fake_backend):
+        """Test the drainer sends nothing while the backend is down and drains once it is back"""
+        outbox.enqueue(make_expense(100), "key-1")
+        drainer = OutboxDrainer(outbox, client)
+        
+        with patch.object(client, "health_check", side_effect=CircuitOpenError("接続エラー")):
+            assert drainer.drain_once() is None
+        assert drainer.last_error == "接続エラー"
+        assert fake_backend.posts == []
+        
+        assert drainer.drain_once() == (1, 0, 0)
+        assert drainer.last_error is None
+        assert outbox.count(PENDING) == 0
+    
+    def test_is_retryable(self):
+        """Test which failures are queued for a resend"""
+        assert is_retryable(APIError("接続エラー"))
+        assert is_retryable(APIError("HTTP error: 503", status_code=503))
+        assert is_retryable(APIError("HTTP error: 409", status_code=409))
+        assert not is_retryable(APIError("HTTP error: 422", status_code=422))
+        assert not is_retryable(APIError("HTTP error: 400", status_code=400))
@@ -0,0 +1,51 @@
+"""Adaptive poller tests"""
+
+from app.polling import AdaptivePoller
+
+
+class TestAdaptivePoller:
+    """Test the poll interval backoff"""
+    
+    def test_unchanged_polls_back_off_up_to_the_maximum(self):
+        """Test the interval grows by the backoff factor and stops at the maximum"""
+        poller = AdaptivePoller(base_interval=30, max_interval=300, backoff=2.0)
+        
+        intervals = [poller.record(changed=False, now=0.0) for _ in range(5)]
+        
+        assert intervals == [60, 120, 240, 300, 300]
+    
+    def test_change_snaps_back_to_the_base_interval(self):
+        """Test a changed poll resets the interval"""
+        poller = AdaptivePoller(base_interval=30, max_interval=300)
+        poller.record(changed=False, now=0.0)
+        poller.record(changed=False, now=0.0)
+        
+        assert poller.record(changed=True, now=0.0) == 30
+    
+    def test_server_hint_overrides_the_backoff(self):
+        """Test an X-Poll-Interval hint wins over both rules and is capped at the maximum"""
+        poller = AdaptivePoller(base_interval=30, max_interval=300)
+        poller.record(changed=False, now=0.0)
+        
+        assert poller.record(changed=False, hint=5, now=0.0) == 5
+        assert poller.record(changed=True, hint=1000, now=0.0) == 300
+        # Without the hint the backoff continues from the hinted interval
+        assert poller.record(changed=False, hint=None, now=0.0) == 300
+        assert poller.record(changed=False, hint=0, now=0.0) == 300
+    
+    def test_due_after_the_interval_with_early_tolerance(self):
+        """Test the next poll is due after the interval, allowing a timer 10% early"""
+        poller = AdaptivePoller(base_interval=30, max_interval=300)
+        assert poller.due(now=0.0)
+        
+        poller.record(changed=True, now=100.0)
+        
+        assert not poller.due(now=120.0)
+        assert poller.due(now=127.0)
+        assert poller.due(now=130.0)
+    
+    def test_maximum_is_never_below_the_base_interval(self):
+        """Test a maximum smaller than the base interval is raised to it"""
+        poller = AdaptivePoller(base_interval=60, max_interval=30)
+        
+        assert poller.record(changed=False, now=0.0) == 60
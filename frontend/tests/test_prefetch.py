@@ -0,0 +1,119 @@
+"""Prefetcher tests"""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+import app.config as config_module
+from app.api_client import APIClient
+from app.circuit import OPEN
+from app.prefetch import Prefetcher
+
+
+@pytest.fixture
+def client(fake_backend):
+    with patch.object(config_module.settings, "api_cache_enabled", True), \
+         patch.object(config_module.settings, "prefetch_enabled", True):
+        yield APIClient(base_url=fake_backend.url, max_retries=0)
+
+
+@pytest.fixture
+def gate():
+    # Holds prefetch calls until the test sets it; always released so workers never hang
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def wait_idle(prefetcher: Prefetcher, timeout: float = 5.0) -> None:
+    """Wait until the prefetcher has no queued or running calls"""
+    deadline = time.monotonic() + timeout
+    while prefetcher.stats()["pending"]:
+        assert time.monotonic() < deadline, "prefetch calls did not finish"
+        time.sleep(0.01)
+
+
+class TestPrefetcher:
+    """Test the background prefetcher warming the response cache"""
+    
+    def test_duplicate_keys_are_skipped(self, client, fake_backend, gate):
+        """Test a key already queued or running is not submitted again, but can be once it finished"""
+        prefetcher = Prefetcher(client, max_workers=1)
+        
+        def blocked():
+            gate.wait()
+            client.get_categories()
+        
+        assert prefetcher.schedule("session", {"categories": blocked}) == 1
+        assert prefetcher.schedule("session", {"categories": blocked, "expenses": client.get_expenses}) == 1
+        gate.set()
+        wait_idle(prefetcher)
+        
+        assert fake_backend.requests == 2
+        assert prefetcher.schedule("session", {"categories": client.get_categories}) == 1
+        wait_idle(prefetcher)
+        assert prefetcher.stats() == {"pending": 0, "completed": 3, "failed": 0, "cancelled": 0}
+    
+    def test_cancel_drops_queued_calls(self, client, fake_backend, gate):
+        """Test cancel() drops an owner's queued calls while the running one finishes"""
+        prefetcher = Prefetcher(client, max_workers=1)
+        started = threading.Event()
+        
+        def blocked():
+            started.set()
+            gate.wait()
+            client.get_categories()
+        
+        prefetcher.schedule("session", {
+            "categories": blocked,
+            "november": lambda: client.get_expenses(month="2025-11"),
+            "october": lambda: client.get_expenses(month="2025-10"),
+        })
+        prefetcher.schedule("other", {"december": lambda: client.get_expenses(month="2025-12")})
+        assert started.wait(5)
+        
+        assert prefetcher.cancel("session") == 2
+        gate.set()
+        wait_idle(prefetcher)
+        
+        assert fake_backend.requests == 2
+        assert prefetcher.stats() == {"pending": 0, "completed": 2, "failed": 0, "cancelled": 2}
+    
+    def test_nothing_queued_unless_breaker_closed(self, client, fake_backend):
+        """Test no call is queued while the circuit breaker is open or half-open"""
+        prefetcher = Prefetcher(client)
+        for _ in range(client.breaker.failure_threshold):
+            client.breaker.record_failure()
+        assert client.breaker.state == OPEN
+        
+        assert prefetcher.schedule("session", {"categories": client.get_categories}) == 0
+        assert prefetcher.stats()["pending"] == 0
+        assert fake_backend.requests == 0
+    
+    def test_nothing_queued_when_disabled(self, client, fake_backend):
+        """Test no call is queued when prefetching or the response cache is disabled"""
+        prefetcher = Prefetcher(client)
+        with patch.object(config_module.settings, "prefetch_enabled", False):
+            assert prefetcher.schedule("session", {"categories": client.get_categories}) == 0
+        with patch.object(config_module.settings, "api_cache_enabled", False):
+            assert prefetcher.schedule("session", {"categories": client.get_categories}) == 0
+        assert fake_backend.requests == 0
+    
+    def test_prefetched_responses_cached_for_prefetch_ttl(self, client, fake_backend):
+        """Test prefetched responses outlive the endpoint's TTL while directly fetched ones do not"""
+        prefetcher = Prefetcher(client)
+        with patch.object(config_module.settings, "api_cache_ttl_expenses", 5.0), \
+             patch.object(config_module.settings, "prefetch_ttl", 60.0):
+            prefetcher.schedule("session", {"november": lambda: client.get_expenses(month="2025-11")})
+            wait_idle(prefetcher)
+            client.get_expenses(month="2025-12")
+            assert fake_backend.requests == 2
+            
+            later = time.monotonic() + 30
+            with patch("app.cache.time.monotonic", return_value=later):
+                client.get_expenses(month="2025-11")
+                assert fake_backend.requests == 2
+                client.get_expenses(month="2025-12")
+                assert fake_backend.requests == 3